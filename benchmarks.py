@@ -0,0 +1,1204 @@
+"""
+Performance benchmarks for the Minesweeper game engine.
+
+Each benchmark prints a small table of timings or memory figures and
+can be run on its own or all together from the command line.
+
+Functions:
+    benchmark_compact_memory: Peak RSS of CompactMinefieldLogic boards.
+    benchmark_reveal: Flood-fill reveals against label-based reveals.
+    benchmark_region_index: Region index build cost against click savings.
+    benchmark_batch_generation: Boards generated one by one or as a batch.
+    benchmark_cascade_frame: Frame time of a large cascade reveal.
+    benchmark_board_mount: Mount time of button and canvas boards.
+    benchmark_startup: Import times and time to the first frames.
+    benchmark_zygote: Session start latency with and without the zygote.
+    benchmark_solver: Solve times of the hint solver per difficulty.
+    benchmark_probabilities: Probability overlay updates, cached or not.
+    benchmark_chord: Chords played cell by cell or vectorized.
+    benchmark_board_codec: Size and speed of the board encoding.
+    benchmark_replay: Recording, summarizing and replaying game logs.
+    benchmark_leaderboard: Inserts and standings of a million results.
+    benchmark_result_writer: Game over latency with a slow leaderboard.
+
+Usage:
+    python benchmarks.py
+"""
+
+import asyncio
+import json
+import os
+import pty
+import select
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import leaderboard
+from configurations import GameMode, GameState, Move
+from game_components import GameOverScreen, MinefieldCanvas, MinefieldUI
+from game_logic import GameSession, MinefieldLogic
+from leaderboard import Leaderboard, ResultWriter, mode_name
+from replay import Replay, ReplayRecorder, summarize
+from run import GameScreen, MinesweeperApp
+from solver import MinefieldSolver, MineProbabilities
+
+REVEAL_BOARDS = {
+    'MEDIUM': (*GameMode.MEDIUM.value['grid_size'],
+               GameMode.MEDIUM.value['mine']),
+    'HARD': (*GameMode.HARD.value['grid_size'], GameMode.HARD.value['mine']),
+    '1000x1000': (1_000, 1_000, 150_000)
+}
+
+MOUNT_BOARD_SIZES = [(10, 10), (25, 16), (50, 50), (200, 200)]
+
+COMPACT_BOARD_SIZES = [
+    (100, 100),
+    (1_000, 1_000),
+    (5_000, 5_000),
+    (10_000, 10_000)
+]
+
+STARTUP_PROBE = """
+import asyncio
+from run import GameScreen, MinesweeperApp
+
+
+async def main():
+    app = MinesweeperApp()
+    async with app.run_test(size=(80, 24)) as pilot:
+        await pilot.pause()
+        print('menu', flush=True)
+        app.push_screen(GameScreen(game_mode='Easy', player_name='Bench'))
+        await pilot.pause()
+        print('game', flush=True)
+
+asyncio.run(main())
+"""
+
+FIRST_FRAME_MARKER = b'Minesweeper Game'
+
+COMPACT_MEMORY_PROBE = """
+import resource
+import sys
+import time
+import game_logic
+
+cols, rows, mines = map(int, sys.argv[1:4])
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+game = game_logic.CompactMinefieldLogic(cols, rows, mines, seed=0)
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(baseline, peak, game.nbytes, elapsed)
+"""
+
+
+def benchmark_compact_memory(density: float = 0.15) -> None:
+    """
+    Prints the peak RSS needed to generate CompactMinefieldLogic boards.
+
+    Every size runs in a fresh interpreter so the peaks do not leak
+    into each other; the import baseline is reported separately.
+
+    :param density: Fraction of cells holding a mine.
+    :type density: float
+    :return: None
+    """
+
+    print('CompactMinefieldLogic memory')
+    print(f'{"board":>15} {"planes MB":>10} {"B/cell":>7} '
+          f'{"baseline MB":>12} {"peak MB":>8} {"build s":>8}')
+
+    for cols, rows in COMPACT_BOARD_SIZES:
+        mines = int(cols * rows * density)
+        output = subprocess.run(
+            [sys.executable, '-c', COMPACT_MEMORY_PROBE,
+             str(cols), str(rows), str(mines)],
+            capture_output=True,
+            check=True,
+            text=True
+        ).stdout.split()
+        baseline, peak, nbytes = (int(value) for value in output[:3])
+        print(f'{f"{cols}x{rows}":>15} {nbytes / 2**20:>10.1f} '
+              f'{nbytes / (cols * rows):>7.3f} {baseline / 2**10:>12.1f} '
+              f'{peak / 2**10:>8.1f} {float(output[3]):>8.2f}')
+
+
+def _label_component(game: MinefieldLogic, position: tuple) -> np.ndarray:
+    """
+    Reveals a component the way MinefieldLogic did before flood fills.
+
+    :param game: The board to reveal on.
+    :type game: MinefieldLogic
+    :param position: Coordinates of the clicked cell.
+    :type position: tuple
+    :return: Array of revealed positions.
+    :rtype: np.ndarray
+    """
+
+    zeros = np.zeros_like(game.game_matrix, dtype=np.uint8)
+    component = np.argwhere(game.components == game.components[position])
+
+    for pos in component:
+        pos_start = np.clip(pos - 1, 0, [game.rows - 1, game.cols - 1])
+        pos_end = np.clip(pos + 1, 0, [game.rows - 1, game.cols - 1])
+        zeros[pos_start[0]:pos_end[0] + 1, pos_start[1]:pos_end[1] + 1] = 1
+
+    return np.argwhere(zeros)
+
+
+def benchmark_reveal(clicks: int = 50) -> None:
+    """
+    Prints per-click reveal times of the label and flood-fill paths.
+
+    Every board is clicked on the same random zero cells by both
+    paths; the one-off labeling cost is reported separately.
+
+    :param clicks: Number of zero cells clicked per board.
+    :type clicks: int
+    :return: None
+    """
+
+    print('Zero-cell reveal per click')
+    print(f'{"board":>10} {"label build ms":>15} {"label ms":>9} '
+          f'{"flood ms":>9} {"cells":>7}')
+
+    for name, (cols, rows, mines) in REVEAL_BOARDS.items():
+        np.random.seed(0)
+        game = MinefieldLogic(cols=cols, rows=rows, number_of_mines=mines,
+                              seed=0)
+        zeros = np.argwhere(game.game_matrix == 0)
+        targets = [
+            tuple(zeros[index])
+            for index in np.random.choice(len(zeros), clicks)
+        ]
+
+        start = time.perf_counter()
+        _ = game.components
+        label_build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for position in targets:
+            _label_component(game, position)
+        label_click = (time.perf_counter() - start) / clicks
+
+        cells = 0
+        start = time.perf_counter()
+        for position in targets:
+            game.revealed[:] = False
+            cells += len(game.reveal(position))
+        flood_click = (time.perf_counter() - start) / clicks
+
+        print(f'{name:>10} {label_build * 1e3:>15.3f} '
+              f'{label_click * 1e3:>9.3f} {flood_click * 1e3:>9.3f} '
+              f'{cells // clicks:>7}')
+
+
+def benchmark_region_index(clicks: int = 1_000) -> None:
+    """
+    Prints the region index build cost against its per-click savings.
+
+    Every click resets the revealed cells and reveals a random zero
+    cell, once by flood fill and once by index lookup. The break-even
+    column is the number of clicks after which building the index
+    paid for itself.
+
+    :param clicks: Number of zero cells clicked per board.
+    :type clicks: int
+    :return: None
+    """
+
+    print('Region index')
+    print(f'{"board":>10} {"build ms":>9} {"flood us":>9} '
+          f'{"index us":>9} {"break-even":>11}')
+
+    for name, (cols, rows, mines) in REVEAL_BOARDS.items():
+        np.random.seed(0)
+        game = MinefieldLogic(cols=cols, rows=rows, number_of_mines=mines,
+                              seed=0)
+        zeros = np.argwhere(game.game_matrix == 0)
+        targets = [
+            tuple(zeros[index])
+            for index in np.random.choice(len(zeros), clicks)
+        ]
+
+        timings = []
+        for build in (False, True):
+            start = time.perf_counter()
+            if build:
+                game.build_region_index()
+            build_time = time.perf_counter() - start
+
+            elapsed = 0
+            for position in targets:
+                game.revealed[:] = False
+                start = time.perf_counter()
+                game.reveal(position)
+                elapsed += time.perf_counter() - start
+            timings.append((build_time, elapsed / clicks))
+
+        (_, flood_click), (build_time, index_click) = timings
+        saving = flood_click - index_click
+        break_even = (
+            f'{build_time / saving:>11.0f}' if saving > 0 else f'{"never":>11}'
+        )
+        print(f'{name:>10} {build_time * 1e3:>9.3f} '
+              f'{flood_click * 1e6:>9.1f} {index_click * 1e6:>9.1f} '
+              f'{break_even}')
+
+
+def benchmark_batch_generation(count: int = 1_000) -> None:
+    """
+    Prints the time to generate and label boards singly or in a batch.
+
+    The single path constructs count MinefieldLogic boards and labels
+    each one; the batch path builds the same number of boards with
+    generate_batch and labels them with one label_batch call. Large
+    boards are capped at 10^8 cells per batch.
+
+    :param count: Number of boards generated per board size.
+    :type count: int
+    :return: None
+    """
+
+    print(f'Generating and labeling {count} boards')
+    print(f'{"board":>10} {"boards":>7} {"single ms":>10} '
+          f'{"batch ms":>9} {"speedup":>8}')
+
+    for name, (cols, rows, mines) in REVEAL_BOARDS.items():
+        boards = min(count, 100_000_000 // (cols * rows))
+
+        start = time.perf_counter()
+        for _ in range(boards):
+            _ = MinefieldLogic(cols, rows, mines).components
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        MinefieldLogic.label_batch(
+            MinefieldLogic.generate_batch(boards, cols, rows, mines)
+        )
+        batch = time.perf_counter() - start
+
+        print(f'{name:>10} {boards:>7} {single * 1e3:>10.1f} '
+              f'{batch * 1e3:>9.1f} {single / batch:>8.1f}')
+
+
+async def _measure_cascade_frames(batched: bool, repeats: int) -> list:
+    """
+    Measures frames of a cascade reveal covering a whole HARD board.
+
+    :param batched: Use set_buttons instead of one set_button per cell.
+    :type batched: bool
+    :param repeats: Number of boards to reveal.
+    :type repeats: int
+    :return: Pairs of (update time, time until repainted) in seconds.
+    :rtype: list
+    """
+
+    timings = []
+    app = MinesweeperApp()
+    async with app.run_test(size=(120, 40)) as pilot:
+        await pilot.pause()
+        for _ in range(repeats):
+            screen = GameScreen(game_mode='Hard', player_name='Bench')
+            app.push_screen(screen)
+            await pilot.pause()
+
+            board = screen.game_board
+            cells = range(len(board.children))
+
+            start = time.perf_counter()
+            if batched:
+                board.set_buttons(cells)
+            else:
+                for button_index in cells:
+                    board.set_button(button_index)
+            updated = time.perf_counter()
+            await pilot.pause()
+            timings.append((updated - start, time.perf_counter() - start))
+
+            app.pop_screen()
+            await pilot.pause()
+
+    return timings
+
+
+def benchmark_cascade_frame(repeats: int = 5) -> None:
+    """
+    Prints the frame time of a cascade revealing a whole HARD board.
+
+    Both the per-cell set_button path and the batched set_buttons
+    path reveal all 400 buttons; the update column is the time spent
+    changing the buttons and the frame column the time until the
+    screen was laid out and repainted.
+
+    :param repeats: Number of boards revealed per path.
+    :type repeats: int
+    :return: None
+    """
+
+    print('Cascade reveal of a HARD board (400 buttons)')
+    print(f'{"path":>12} {"update ms":>10} {"frame ms":>9}')
+
+    for batched in (False, True):
+        timings = asyncio.run(_measure_cascade_frames(batched, repeats))
+        update = sorted(timing[0] for timing in timings)[repeats // 2]
+        frame = sorted(timing[1] for timing in timings)[repeats // 2]
+        name = 'set_buttons' if batched else 'set_button'
+        print(f'{name:>12} {update * 1e3:>10.1f} {frame * 1e3:>9.1f}')
+
+
+async def _measure_board_mount(board_class: type, grid_size: tuple) -> tuple:
+    """
+    Measures how long a board takes to mount and how many widgets it has.
+
+    :param board_class: MinefieldUI or MinefieldCanvas.
+    :type board_class: type
+    :param grid_size: Dimensions of the board (cols, rows).
+    :type grid_size: tuple
+    :return: Mount time in seconds and the number of widgets mounted.
+    :rtype: tuple
+    """
+
+    app = MinesweeperApp()
+    async with app.run_test(size=(120, 40)) as pilot:
+        await pilot.pause()
+        start = time.perf_counter()
+        board = board_class(grid_size=grid_size, number_of_mine=1)
+        await app.screen.mount(board)
+        await pilot.pause()
+        elapsed = time.perf_counter() - start
+        widgets = len(list(board.walk_children(with_self=True)))
+
+    return elapsed, widgets
+
+
+def benchmark_board_mount(max_button_cells: int = 50 * 50) -> None:
+    """
+    Prints the mount time and widget count of both board renderers.
+
+    Button boards larger than max_button_cells are skipped.
+
+    :param max_button_cells: Largest board measured with buttons.
+    :type max_button_cells: int
+    :return: None
+    """
+
+    print('Board mount')
+    print(f'{"board":>9} {"renderer":>16} {"widgets":>8} {"mount ms":>9}')
+
+    for cols, rows in MOUNT_BOARD_SIZES:
+        for board_class in (MinefieldUI, MinefieldCanvas):
+            if board_class is MinefieldUI and cols * rows > max_button_cells:
+                continue
+
+            elapsed, widgets = asyncio.run(
+                _measure_board_mount(board_class, (cols, rows))
+            )
+            print(f'{f"{cols}x{rows}":>9} {board_class.__name__:>16} '
+                  f'{widgets:>8} {elapsed * 1e3:>9.1f}')
+
+
+def _import_times(module: str) -> dict:
+    """
+    Imports a module in a fresh interpreter under -X importtime.
+
+    :param module: Name of the module to import.
+    :type module: str
+    :return: Cumulative import time in microseconds of every module.
+    :rtype: dict
+    """
+
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        check=True,
+        text=True
+    ).stderr
+
+    times = {}
+    for line in stderr.splitlines()[1:]:
+        _, cumulative, name = line.split('|')
+        times.setdefault(name.strip(), int(cumulative))
+
+    return times
+
+
+def benchmark_startup(repeats: int = 5) -> None:
+    """
+    Prints what the game imports at startup and how long frames take.
+
+    The import table is the median cumulative -X importtime of the
+    main packages pulled in by run.py. The frame table is the median
+    time from spawning the interpreter until the main menu, and then
+    an Easy game screen, were composed and rendered headlessly.
+
+    :param repeats: Number of fresh interpreters measured.
+    :type repeats: int
+    :return: None
+    """
+
+    runs = [_import_times('run') for _ in range(repeats)]
+    print('Startup imports of run.py')
+    print(f'{"module":>16} {"import ms":>10}')
+    for module in ('textual', 'numpy', 'scipy.ndimage', 'game_logic', 'run'):
+        timings = sorted(times.get(module, 0) for times in runs)
+        print(f'{module:>16} {timings[repeats // 2] / 1e3:>10.1f}')
+
+    frames = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with subprocess.Popen(
+                [sys.executable, '-c', STARTUP_PROBE],
+                stdout=subprocess.PIPE,
+                text=True
+        ) as probe:
+            frames.append([
+                time.perf_counter() - start
+                for _ in probe.stdout
+            ])
+
+    print('Time to first frame')
+    print(f'{"screen":>16} {"ms":>10}')
+    for index, screen in enumerate(('main menu', 'game screen')):
+        timings = sorted(frame[index] for frame in frames)
+        print(f'{screen:>16} {timings[repeats // 2] * 1e3:>10.1f}')
+
+
+def _read_first_frame(read: callable, fd: int, timeout: float = 30) -> bool:
+    """
+    Reads a session's output until the main menu header was drawn.
+
+    :param read: Reads the next chunk of output, empty once closed.
+    :type read: callable
+    :param fd: File descriptor to wait on.
+    :type fd: int
+    :param timeout: Seconds to wait for the frame.
+    :type timeout: float
+    :return: True if the frame arrived, otherwise False.
+    :rtype: bool
+    """
+
+    output = b''
+    deadline = time.perf_counter() + timeout
+    while FIRST_FRAME_MARKER not in output:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            return False
+        try:
+            chunk = read()
+        except OSError:
+            return False
+        if not chunk:
+            return False
+        output += chunk
+
+    return True
+
+
+def _spawned_session() -> float:
+    """
+    Starts a game in a new interpreter, as the gateway used to.
+
+    :return: Seconds from spawning until the first frame.
+    :rtype: float
+    """
+
+    start = time.perf_counter()
+    pid, master = pty.fork()
+    if pid == 0:
+        os.execv(sys.executable, [sys.executable, 'run.py'])
+
+    try:
+        if not _read_first_frame(lambda: os.read(master, 65536), master):
+            raise RuntimeError('run.py did not draw its first frame')
+        return time.perf_counter() - start
+    finally:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        os.close(master)
+
+
+def _zygote_session(path: str) -> float:
+    """
+    Starts a game by connecting to a running zygote server.
+
+    :param path: Path of the zygote's Unix socket.
+    :type path: str
+    :return: Seconds from connecting until the first frame.
+    :rtype: float
+    """
+
+    start = time.perf_counter()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        conn.sendall(json.dumps({
+            'cols': 80,
+            'rows': 24,
+            'env': {'TERM': 'xterm-256color'}
+        }).encode() + b'\n')
+        if not _read_first_frame(lambda: conn.recv(65536), conn.fileno()):
+            raise RuntimeError('the zygote did not draw a first frame')
+        return time.perf_counter() - start
+
+
+def _measure_sessions(start_session: callable, sessions: int,
+                      clients: int) -> tuple:
+    """
+    Starts sessions from concurrent clients and times each of them.
+
+    :param start_session: Starts one session and returns its latency.
+    :type start_session: callable
+    :param sessions: Number of sessions started in total.
+    :type sessions: int
+    :param clients: Number of sessions started at the same time.
+    :type clients: int
+    :return: Sorted latencies in seconds and the sessions per second.
+    :rtype: tuple
+    """
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        latencies = sorted(executor.map(
+            lambda _: start_session(),
+            range(sessions)
+        ))
+
+    return latencies, sessions / (time.perf_counter() - start)
+
+
+def benchmark_zygote(sessions: int = 40, clients: int = 4) -> None:
+    """
+    Prints the session start latency with and without the zygote.
+
+    Every session is a terminal running the game until its main menu
+    was drawn. Without the zygote each one spawns a fresh run.py, as
+    the web gateway did; with it each one is forked by zygote.py from
+    its warm interpreter. Latency is measured from spawn or connect to
+    the first frame, throughput with clients sessions in flight.
+
+    :param sessions: Number of sessions started per mode.
+    :type sessions: int
+    :param clients: Number of sessions started at the same time.
+    :type clients: int
+    :return: None
+    """
+
+    path = os.path.join(tempfile.mkdtemp(), 'zygote.sock')
+    with subprocess.Popen([sys.executable, 'zygote.py', path]) as server:
+        while not os.path.exists(path):
+            time.sleep(0.05)
+
+        modes = {
+            'spawn run.py': _spawned_session,
+            'zygote': lambda: _zygote_session(path)
+        }
+        print(f'Session start ({sessions} sessions, {clients} clients)')
+        print(f'{"mode":>14} {"p50 ms":>8} {"p95 ms":>8} '
+              f'{"sessions/s":>11}')
+        try:
+            for name, start_session in modes.items():
+                latencies, rate = _measure_sessions(
+                    start_session,
+                    sessions,
+                    clients
+                )
+                p95 = latencies[min(len(latencies) - 1, sessions * 95 // 100)]
+                print(f'{name:>14} {latencies[sessions // 2] * 1e3:>8.1f} '
+                      f'{p95 * 1e3:>8.1f} {rate:>11.1f}')
+        finally:
+            server.kill()
+
+
+def benchmark_solver(games: int = 20) -> None:
+    """
+    Prints the time of every solve while the solver plays full games.
+
+    Each game opens on a random zero cell, then applies all the
+    solver's deductions after every solve and uncovers a random
+    covered cell when it is stuck. The won column counts games won,
+    guesses included.
+
+    :param games: Number of games played per difficulty.
+    :type games: int
+    :return: None
+    """
+
+    print('Solver per difficulty')
+    print(f'{"mode":>8} {"solves":>7} {"median ms":>10} {"p95 ms":>7} '
+          f'{"max ms":>7} {"won":>5}')
+
+    for mode in GameMode:
+        np.random.seed(0)
+        cols, rows = mode.value['grid_size']
+        timings, won = [], 0
+        for game in range(games):
+            session = GameSession(cols, rows, mode.value['mine'], seed=game)
+            zeros = np.argwhere(session.game.game_matrix == 0)
+            session.reveal(tuple(zeros[np.random.randint(len(zeros))]))
+
+            while not session.is_over:
+                start = time.perf_counter()
+                safe, mines = MinefieldSolver.from_session(session).solve()
+                timings.append(time.perf_counter() - start)
+
+                if not safe.any() and not mines.any():
+                    covered = [
+                        position for position in map(
+                            tuple,
+                            np.argwhere(~session.game.revealed).tolist()
+                        )
+                        if position not in session.placed_flags
+                    ]
+                    session.reveal(covered[np.random.randint(len(covered))])
+                    continue
+
+                for position in np.argwhere(mines).tolist():
+                    session.toggle_flag(position)
+                for position in np.argwhere(safe).tolist():
+                    session.reveal(position)
+            won += session.state is GameState.WON
+
+        timings = np.array(timings) * 1e3
+        print(f'{mode.name:>8} {len(timings):>7} '
+              f'{np.median(timings):>10.2f} '
+              f'{np.percentile(timings, 95):>7.2f} {timings.max():>7.2f} '
+              f'{won:>2}/{games:<2}')
+
+
+def benchmark_probabilities(games: int = 5) -> None:
+    """
+    Prints the time to update the mine probabilities after each move.
+
+    Every game opens on a random zero cell, then flags a certain mine
+    or uncovers the likeliest safe cell each move. After every move
+    the probabilities are computed by a tracker kept across the game,
+    which only enumerates the components near the move, and by a new
+    one that enumerates everything.
+
+    :param games: Number of games played per difficulty.
+    :type games: int
+    :return: None
+    """
+
+    print('Mine probabilities per move')
+    print(f'{"mode":>8} {"moves":>6} {"cached ms":>10} {"p95":>6} '
+          f'{"max":>6} {"scratch ms":>11} {"p95":>6} {"max":>6}')
+
+    for mode in GameMode:
+        np.random.seed(0)
+        cols, rows = mode.value['grid_size']
+        cached, scratch = [], []
+        for game in range(games):
+            session = GameSession(cols, rows, mode.value['mine'], seed=game)
+            probabilities = MineProbabilities()
+            zeros = np.argwhere(session.game.game_matrix == 0)
+            changed = session.reveal(
+                tuple(zeros[np.random.randint(len(zeros))])
+            )
+
+            while not session.is_over:
+                start = time.perf_counter()
+                chance = probabilities.update(
+                    MinefieldSolver.from_session(session),
+                    changed
+                )
+                cached.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                MineProbabilities().update(
+                    MinefieldSolver.from_session(session)
+                )
+                scratch.append(time.perf_counter() - start)
+
+                chance[session.game.revealed] = 2
+                for position in session.placed_flags:
+                    chance[position] = 2
+                if (chance == 1).any():
+                    changed = [tuple(np.argwhere(chance == 1)[0])]
+                    session.toggle_flag(changed[0])
+                else:
+                    changed = session.reveal(np.unravel_index(
+                        np.nanargmin(chance), chance.shape
+                    ))
+
+        cached = np.array(cached) * 1e3
+        scratch = np.array(scratch) * 1e3
+        print(f'{mode.name:>8} {len(cached):>6} '
+              f'{np.median(cached):>10.2f} '
+              f'{np.percentile(cached, 95):>6.2f} {cached.max():>6.2f} '
+              f'{np.median(scratch):>11.2f} '
+              f'{np.percentile(scratch, 95):>6.2f} {scratch.max():>6.2f}')
+
+
+def _chord_session(game: MinefieldLogic, vectorized: bool) -> GameSession:
+    """
+    Starts a session with every number uncovered and all mines but one
+    flagged, so most numbers can be chorded.
+
+    :param game: The board to play.
+    :type game: MinefieldLogic
+    :param vectorized: Whether the session chords vectorized.
+    :type vectorized: bool
+    :return: The session.
+    :rtype: GameSession
+    """
+
+    session = GameSession(game=game)
+    if not vectorized:
+        session.flagged = None
+    session.start()
+    for position in np.argwhere(game.game_matrix >= 9)[:-1].tolist():
+        session.toggle_flag(position)
+    numbers = (game.game_matrix > 0) & (game.game_matrix < 9)
+    game.revealed[numbers] = True
+    # pylint: disable=W0212
+    session._covered_safe -= int(np.count_nonzero(numbers))
+    game.components  # pylint: disable=W0104
+    return session
+
+
+def benchmark_chord(boards: int = 20) -> None:
+    """
+    Prints chord times of the cell by cell and vectorized chords.
+
+    Every number of a board is chorded once, then all of them in a
+    single chord_many, with the numbers uncovered and all mines but
+    one flagged. Zero regions are labeled beforehand, as the first
+    chord of a game would.
+
+    :param boards: Number of boards per difficulty.
+    :type boards: int
+    :return: None
+    """
+
+    print('Chords per difficulty')
+    print(f'{"mode":>8} {"chord":>10} {"median us":>10} {"p95 us":>8} '
+          f'{"all numbers ms":>15}')
+
+    for mode in GameMode:
+        cols, rows = mode.value['grid_size']
+        for vectorized in (False, True):
+            np.random.seed(0)
+            timings, chord_all = [], []
+            for board in range(boards):
+                game = MinefieldLogic(cols, rows, mode.value['mine'],
+                                      seed=board)
+                matrix = game.game_matrix.copy()
+                session = _chord_session(game, vectorized)
+                numbers = list(map(tuple, np.argwhere(
+                    (matrix > 0) & (matrix < 9)).tolist()))
+                for position in numbers:
+                    start = time.perf_counter()
+                    session.chord(position)
+                    timings.append(time.perf_counter() - start)
+
+                session = _chord_session(
+                    MinefieldLogic(game_matrix=matrix), vectorized
+                )
+                start = time.perf_counter()
+                session.chord_many(numbers)
+                chord_all.append(time.perf_counter() - start)
+
+            timings = np.array(timings) * 1e6
+            print(f'{mode.name:>8} '
+                  f'{"vector" if vectorized else "loop":>10} '
+                  f'{np.median(timings):>10.1f} '
+                  f'{np.percentile(timings, 95):>8.1f} '
+                  f'{np.median(chord_all) * 1e3:>15.2f}')
+
+
+def benchmark_board_codec(repeats: int = 2_000) -> None:
+    """
+    Prints the encoded size of a board of every difficulty and the
+    time to encode and decode it.
+
+    :param repeats: Number of encodes and decodes timed per board.
+    :type repeats: int
+    :return: None
+    """
+
+    print('Board encoding per difficulty')
+    print(f'{"mode":>8} {"bytes":>6} {"base64":>7} {"encode us":>10} '
+          f'{"decode us":>10}')
+
+    for mode in GameMode:
+        cols, rows = mode.value['grid_size']
+        game = MinefieldLogic(cols, rows, mode.value['mine'], seed=0)
+        text = game.encode()
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            game.encode()
+        encode = (time.perf_counter() - start) / repeats
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            MinefieldLogic.decode(text)
+        decode = (time.perf_counter() - start) / repeats
+
+        print(f'{mode.name:>8} {len(game.to_bytes()):>6} {len(text):>7} '
+              f'{encode * 1e6:>10.1f} {decode * 1e6:>10.1f}')
+
+
+def _record_game(path: str, seed: int) -> float:
+    """
+    Records a HARD game won by a player that knows the mines.
+
+    The player uncovers the safe cells in random order and flags
+    every mine, so a game takes about a hundred moves.
+
+    :param path: Path of the log file.
+    :type path: str
+    :param seed: Seed of the board and the player.
+    :type seed: int
+    :return: Time spent recording moves, in seconds.
+    :rtype: float
+    """
+
+    cols, rows = GameMode.HARD.value['grid_size']
+    session = GameSession(game=MinefieldLogic(
+        cols, rows, GameMode.HARD.value['mine'], deferred=True, seed=seed
+    ))
+    rng = np.random.default_rng(seed)
+    recording = 0.0
+    with ReplayRecorder(path, session.game) as recorder:
+        position = (int(rng.integers(rows)), int(rng.integers(cols)))
+        session.reveal(position)
+        moves = [(Move.REVEAL, position)]
+        cells = np.argwhere(session.game.game_matrix < 9)
+        mines = np.argwhere(session.game.game_matrix >= 9)
+        for position in cells[rng.permutation(len(cells))].tolist():
+            if not session.game.is_revealed(position):
+                session.reveal(position)
+                moves.append((Move.REVEAL, position))
+        for position in mines.tolist():
+            session.toggle_flag(position)
+            moves.append((Move.FLAG, position))
+
+        start = time.perf_counter()
+        for move, position in moves:
+            recorder.record(move, position)
+        recording += time.perf_counter() - start
+        return recording / len(moves)
+
+
+def _summarize_parsed(paths: list) -> int:
+    """
+    Counts the moves of logs by reading and unpacking every record,
+    as a baseline for summarize.
+
+    :param paths: Paths of the log files.
+    :type paths: list
+    :return: Number of moves.
+    :rtype: int
+    """
+
+    header = struct.Struct('<2sBBBHHIQ')
+    moves = 0
+    for path in paths:
+        with open(path, 'rb') as file:
+            data = file.read()
+        _, _, flags, _, rows, cols, _, _ = header.unpack_from(data)
+        offset = header.size + ((rows * cols + 7) // 8 if flags & 2 else 0)
+        moves += sum(1 for _ in struct.iter_unpack('<BHHI', data[offset:]))
+
+    return moves
+
+
+def benchmark_replay(games: int = 2_000) -> None:
+    """
+    Prints the cost of recording moves and of reading many logs.
+
+    :param games: Number of HARD games recorded.
+    :type games: int
+    :return: None
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, f'{game}.mlog')
+                 for game in range(games)]
+        record = np.median([
+            _record_game(path, game) for game, path in enumerate(paths)
+        ])
+        size = np.mean([os.path.getsize(path) for path in paths])
+
+        start = time.perf_counter()
+        stats = summarize(paths)
+        mapped = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _summarize_parsed(paths)
+        parsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        won = 0
+        for path in paths:
+            with Replay(path) as replay:
+                won += replay.play().state is GameState.WON
+        played = time.perf_counter() - start
+
+    moves = sum(stats[f'{move.name.lower()}s'] for move in Move)
+    print('Replay logs of HARD games')
+    print(f'  record per move      {record * 1e6:8.2f} us')
+    print(f'  log size per game    {size:8.0f} bytes '
+          f'({moves / games:.0f} moves)')
+    print(f'  summarize, mapped    {games / mapped:8,.0f} logs/s')
+    print(f'  summarize, parsed    {games / parsed:8,.0f} logs/s')
+    print(f'  replay, instant      {games / played:8,.0f} games/s '
+          f'({won}/{games} won)')
+
+
+def benchmark_leaderboard(
+        results: int = 1_000_000,
+        lookups: int = 1_000
+) -> None:
+    """
+    Prints the cost of storing results and of loading standings from
+    a leaderboard of many results.
+
+    :param results: Number of results stored.
+    :type results: int
+    :param lookups: Number of standings loaded.
+    :type lookups: int
+    :return: None
+    """
+
+    rng = np.random.default_rng(0)
+    modes = [mode_name(difficulty, no_guess)
+             for difficulty in ('Easy', 'Medium', 'Hard', 'Huge')
+             for no_guess in (False, True)]
+    players = [f'Player{number}' for number in range(100_000)]
+    rows = list(zip(
+        (players[i] for i in rng.integers(len(players), size=results)),
+        (modes[i] for i in rng.integers(len(modes), size=results)),
+        rng.lognormal(11.5, 0.6, size=results).astype(int).tolist(),
+        [0.0] * results
+    ))
+    queries = [
+        (modes[i], rows[j][0])
+        for i, j in zip(rng.integers(len(modes), size=lookups),
+                        rng.integers(results, size=lookups))
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        with Leaderboard(os.path.join(directory, 'results.db')) as board:
+            start = time.perf_counter()
+            for row in rows:
+                board.add(*row)
+            board.flush()
+            batched = (time.perf_counter() - start) / results
+
+            # One transaction per result, into the full leaderboard
+            board.batch_size = 1
+            start = time.perf_counter()
+            for row in rows[:1_000]:
+                board.add(*row)
+            single = (time.perf_counter() - start) / 1_000
+
+            standings = []
+            for game_mode, player in queries:
+                start = time.perf_counter()
+                board.standings(game_mode, player)
+                standings.append(time.perf_counter() - start)
+
+            # Baseline: rank by counting every faster result
+            # pylint: disable=W0212
+            counted = []
+            for game_mode, player in queries[:100]:
+                start = time.perf_counter()
+                board._db.execute(
+                    'SELECT COUNT(*) FROM results WHERE game_mode = ? '
+                    'AND time_ms < (SELECT MIN(time_ms) FROM results '
+                    'WHERE player = ? AND game_mode = ?)',
+                    (game_mode, player, game_mode)
+                ).fetchone()
+                counted.append(time.perf_counter() - start)
+
+    print(f'Leaderboard of {results:,} results')
+    print(f'  insert, one by one   {single * 1e6:8.1f} us/result')
+    print(f'  insert, batched      {batched * 1e6:8.1f} us/result')
+    print(f'  standings, median    {np.median(standings) * 1e6:8.1f} us')
+    print(f'  standings, p99       '
+          f'{np.percentile(standings, 99) * 1e6:8.1f} us')
+    print(f'  rank by COUNT        {np.median(counted) * 1e6:8.1f} us')
+
+
+class _SlowLeaderboard(Leaderboard):
+    """
+    Leaderboard stand-in whose writes wait like a slow disk.
+
+    Attributes:
+        DELAY (float): Seconds every write waits.
+    """
+
+    DELAY = 0.25
+
+    def add_many(self, results) -> None:
+        """
+        Waits, then inserts many results in one transaction.
+
+        :param results: Tuples of player, game mode, time in
+                        milliseconds and finish time.
+        :type results: Iterable[Tuple[str, str, int, float]]
+        :return: None
+        """
+
+        time.sleep(self.DELAY)
+        super().add_many(results)
+
+
+class _BlockingWriter:
+    """
+    Writes every submitted result before returning, as saving on the
+    event loop would.
+
+    Attributes:
+        written (int): Results written.
+    """
+
+    def __init__(self, board: Leaderboard):
+        """
+        Initializes the _BlockingWriter over an open leaderboard.
+
+        :param board: The leaderboard written.
+        :type board: Leaderboard
+        :return: None
+        """
+
+        self.written = 0
+        self._board = board
+
+    def submit(self, *result) -> None:
+        """
+        Writes a result at once.
+
+        :param result: Player, game mode and time in milliseconds.
+        :type result: tuple
+        :return: None
+        """
+
+        self._board.add_many([(*result, time.time())])
+        self.written += 1
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Returns at once, as every result is already written.
+
+        :param timeout: Unused.
+        :type timeout: float
+        :return: True.
+        :rtype: bool
+        """
+
+        # pylint: disable=W0613
+        return True
+
+    def close(self, timeout: float = None) -> bool:
+        """
+        Returns at once, as every result is already written.
+
+        :param timeout: Unused.
+        :type timeout: float
+        :return: True.
+        :rtype: bool
+        """
+
+        # pylint: disable=W0613
+        return True
+
+
+async def _measure_game_over(games: int, save: bool) -> list:
+    """
+    Measures how long won games take to show the game over modal.
+
+    :param games: Number of games won.
+    :type games: int
+    :param save: Whether the games have a start time and are saved.
+    :type save: bool
+    :return: Seconds from the game over to the modal, per game.
+    :rtype: list
+    """
+
+    app = MinesweeperApp()
+    latencies = []
+    async with app.run_test(size=(80, 24)) as pilot:
+        await pilot.pause()
+        for _ in range(games):
+            screen = GameScreen(game_mode='Easy', player_name='Tester')
+            app.push_screen(screen)
+            await pilot.pause()
+            screen.start_time = time.time() - 60 if save else None
+
+            start = time.perf_counter()
+            screen.toggle_game_over_modal(True)
+            await pilot.pause()
+            assert isinstance(app.screen, GameOverScreen)
+            latencies.append(time.perf_counter() - start)
+
+            app.pop_screen()
+            app.pop_screen()
+            await pilot.pause()
+
+    return latencies
+
+
+def benchmark_result_writer(games: int = 10) -> None:
+    """
+    Prints the game over modal latency of won games saved to a
+    leaderboard whose writes take _SlowLeaderboard.DELAY seconds,
+    with and without the background ResultWriter.
+
+    :param games: Number of games won per row.
+    :type games: int
+    :return: None
+    """
+
+    print(f'Game over modal with {_SlowLeaderboard.DELAY * 1e3:.0f} ms '
+          f'leaderboard writes')
+    print(f'{"save":>10} {"median ms":>10} {"max ms":>8} {"written":>8}')
+
+    # pylint: disable=W0212
+    shared = leaderboard._RESULT_WRITER
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.db')
+        with _SlowLeaderboard(path) as board:
+            writers = {
+                'none': None,
+                'blocking': _BlockingWriter(board),
+                'writer': ResultWriter(lambda: _SlowLeaderboard(path))
+            }
+            for name, writer in writers.items():
+                leaderboard._RESULT_WRITER = writer or ResultWriter()
+                latencies = asyncio.run(
+                    _measure_game_over(games, writer is not None)
+                )
+                written = writer.written if writer else 0
+                print(f'{name:>10} {np.median(latencies) * 1e3:>10.1f} '
+                      f'{max(latencies) * 1e3:>8.1f} {written:>8}')
+    leaderboard._RESULT_WRITER = shared
+
+
+if __name__ == '__main__':
+    benchmark_compact_memory()
+    benchmark_reveal()
+    benchmark_region_index()
+    benchmark_batch_generation()
+    benchmark_cascade_frame()
+    benchmark_board_mount()
+    benchmark_startup()
+    benchmark_zygote()
+    benchmark_solver()
+    benchmark_probabilities()
+    benchmark_chord()
+    benchmark_board_codec()
+    benchmark_replay()
+    benchmark_leaderboard()
+    benchmark_result_writer()
@@ -6,6 +6,8 @@ Enums:
     LightTheme: Colors for the light theme.
     DarkTheme: Colors for the dark theme.
     GameMode: Settings for different game modes.
+    GameState: States of a game session.
+    Move: Moves recorded in a replay log.
     Icons: Various game icons.
 
 Hue Enum:
@@ -20,10 +22,16 @@ DarkTheme Enum:
     SECONDARY_ACCENT, FONT_COLOR
 
 GameMode Enum:
-    EASY, MEDIUM, HARD
+    EASY, MEDIUM, HARD, HUGE
+
+GameState Enum:
+    READY, PLAYING, WON, LOST
+
+Move Enum:
+    REVEAL, FLAG, CHORD
 
 Icons Enum:
-    MINE, BOMB, SKULL, FLAG, LEFT, RIGHT, UP, DOWN
+    MINE, BOMB, SKULL, FLAG, START, LEFT, RIGHT, UP, DOWN
 """
 
 from enum import Enum
@@ -98,11 +106,45 @@ class GameMode(Enum):
         EASY (dict): Settings for easy mode.
         MEDIUM (dict): Settings for medium mode.
         HARD (dict): Settings for hard mode.
+        HUGE (dict): Settings for huge mode, larger than the terminal.
     """
 
     EASY = {'mine': 10, 'grid_size': (11, 8)}
     MEDIUM = {'mine': 30, 'grid_size': (19, 14)}
     HARD = {'mine': 60, 'grid_size': (25, 16)}
+    HUGE = {'mine': 900, 'grid_size': (100, 60)}
+
+
+class GameState(Enum):
+    """
+    Enum representing the states of a game session.
+
+    Attributes:
+        READY (str): No move has been made yet.
+        PLAYING (str): The game is in progress.
+        WON (str): All mines were flagged or all safe cells uncovered.
+        LOST (str): A mine was uncovered.
+    """
+
+    READY = 'ready'
+    PLAYING = 'playing'
+    WON = 'won'
+    LOST = 'lost'
+
+
+class Move(Enum):
+    """
+    Enum representing the moves of a game, as coded in replay logs.
+
+    Attributes:
+        REVEAL (int): A cell was uncovered.
+        FLAG (int): A flag was placed or removed.
+        CHORD (int): A number was chorded.
+    """
+
+    REVEAL = 0
+    FLAG = 1
+    CHORD = 2
 
 
 class Icons(Enum):
@@ -114,6 +156,7 @@ class Icons(Enum):
         BOMB (str): Icon for a bomb.
         SKULL (str): Icon for a skull.
         FLAG (str): Icon for a flag.
+        START (str): Icon for the safe start cell of a no-guess board.
         LEFT (str): Icon for left arrow.
         RIGHT (str): Icon for right arrow.
         UP (str): Icon for up arrow.
@@ -124,6 +167,7 @@ class Icons(Enum):
     BOMB = '\U0001F4A3'
     SKULL = '\u2620'
     FLAG = '\u2691'
+    START = '\u25CE'
     LEFT = '\u2B9C'
     RIGHT = '\u2B9E'
     UP = '\u2B9D'
@@ -1,5 +1,14 @@
 const Pty = require('node-pty');
 const fs = require('fs');
+const net = require('net');
+
+// Unix socket of zygote.py, games are spawned directly when unset
+const ZYGOTE_SOCKET = process.env.ZYGOTE_SOCKET;
+const TTY_ENV = {
+    TERM: 'xterm-256color',
+    LANG: 'en_US.UTF-8',
+    LC_ALL: 'en_US.UTF-8'
+};
 
 exports.install = function () {
 
@@ -14,31 +23,11 @@ function socket() {
     this.autodestroy();
 
     this.on('open', function (client) {
-
-        // Spawn terminal
-        client.tty = Pty.spawn('python3', ['run.py'], {
-            name: 'xterm-256color',
-            cols: 80,
-            rows: 24,
-            cwd: process.env.PWD,
-            env: {
-                ...process.env,
-                TERM: 'xterm-256color',
-                LANG: 'en_US.UTF-8',
-                LC_ALL: 'en_US.UTF-8'
-            }
-        });
-
-        client.tty.on('exit', function (code, signal) {
-            client.tty = null;
-            client.close();
-            console.log("Process killed");
-        });
-
-        client.tty.on('data', function (data) {
-            client.send(data);
-        });
-
+        if (ZYGOTE_SOCKET) {
+            connectZygote(client);
+        } else {
+            spawnTerminal(client);
+        }
     });
 
     this.on('close', function (client) {
@@ -54,6 +43,71 @@ function socket() {
     });
 }
 
+function spawnTerminal(client) {
+
+    // Spawn terminal
+    client.tty = Pty.spawn('python3', ['run.py'], {
+        name: 'xterm-256color',
+        cols: 80,
+        rows: 24,
+        cwd: process.env.PWD,
+        env: {
+            ...process.env,
+            ...TTY_ENV
+        }
+    });
+
+    client.tty.on('exit', function (code, signal) {
+        client.tty = null;
+        client.close();
+        console.log("Process killed");
+    });
+
+    client.tty.on('data', function (data) {
+        client.send(data);
+    });
+}
+
+function connectZygote(client) {
+
+    // Ask the warm zygote for a forked game, spawn one if it is down
+    const conn = net.connect(ZYGOTE_SOCKET);
+    let connected = false;
+
+    // Queued ahead of any keystrokes, the header is sent first
+    conn.write(JSON.stringify({ cols: 80, rows: 24, env: TTY_ENV }) + '\n');
+
+    conn.on('connect', function () {
+        connected = true;
+    });
+
+    conn.on('error', function (err) {
+        if (!connected) {
+            console.log('Zygote unavailable, spawning run.py: ', err.message);
+            client.tty = null;
+            spawnTerminal(client);
+        }
+    });
+
+    conn.on('close', function () {
+        if (connected && client.tty === conn) {
+            client.tty = null;
+            client.close();
+            console.log("Process killed");
+        }
+    });
+
+    conn.on('data', function (data) {
+        client.send(data);
+    });
+
+    // Closing the connection makes the zygote kill the game
+    conn.kill = function () {
+        conn.destroy();
+    };
+    client.tty = conn;
+}
+
 if (process.env.CREDS != null) {
     console.log("Creating creds.json file.");
     fs.writeFile('creds.json', process.env.CREDS, 'utf8', function (err) {
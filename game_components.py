@@ -1,17 +1,16 @@
 """
-This module defines the core components for the Minesweeper game. It
-includes the `Selector` class for managing option selection, the
-`MinefieldUI` class for displaying the game grid, the `MinefieldLogic`
-class for game logic, and the `GameOverScreen` class for handling game
-over scenarios.
+This module defines the user interface components for the Minesweeper
+game. It includes the `Selector` class for managing option selection,
+the `MinefieldUI` class for displaying the game grid on top of a
+`GameSession`, and the `GameOverScreen` class for handling game over
+scenarios.
 
 Classes:
     Selector: A selectable component that allows users to navigate and
               choose options.
     MinefieldUI: Manages the display of the Minesweeper grid and user
                  interactions.
-    MinefieldLogic: Contains the logic for generating the minefield,
-                    handling user input, and game rules.
+    MinefieldCanvas: Draws the Minesweeper grid as a single widget.
     GameOverScreen: Displays the game over screen with results and
                     options for restarting or exiting.
 
@@ -20,16 +19,32 @@ Usage:
     different aspects of the Minesweeper game.
 """
 
-from typing import List, Callable, Optional, Tuple
+from math import isnan
+from typing import TYPE_CHECKING, List, Callable, Iterable, Optional, Tuple
 
+from rich.color import Color
+from rich.segment import Segment
+from rich.style import Style
+from rich.text import Text
 from textual import events
 from textual.app import ComposeResult
 from textual.containers import Grid, Horizontal
+from textual.geometry import Region
 from textual.screen import ModalScreen
+from textual.strip import Strip
 from textual.widgets import Button, Label, Static
-import numpy as np
-from scipy.ndimage import label
-from configurations import Icons
+from configurations import Icons, GameState, Move
+
+if TYPE_CHECKING:  # Both load numpy, which is deferred until a game starts
+    import numpy as np
+    from solver import MinefieldSolver
+
+# Digit colours of the mine probability overlay, from green to red
+HEAT_STYLES = [
+    Style(color=Color.from_rgb(55 + 20 * tenth, 200 - 20 * tenth, 40),
+          bold=True)
+    for tenth in range(10)
+]
 
 
 class Selector(Static, can_focus=True):
@@ -170,15 +185,30 @@ class Selector(Static, can_focus=True):
 
 class MinefieldUI(Grid):
     """
-    A user interface for a Minefield game that manages the grid of buttons,
-    interactions, and game logic.
+    A user interface for a Minefield game that manages the grid of buttons
+    and interactions, leaving the game rules to a GameSession.
 
     Attributes:
-        BINDINGS (List[Tuple[str, str]]): Key bindings for flag toggling.
+        BINDINGS (List[Tuple[str, str]]): Key bindings for flag toggling,
+                                          chording, hints and the
+                                          probability overlay.
+        session (GameSession): The game being played.
+        game (MinefieldLogic): The board of the session.
+        cells (BoardState): Flat cell values, revealed and flagged
+                            planes read when drawing.
+        start_index (int | None): Index of the marked safe start cell.
+        probabilities (MineProbabilities | None): Probability tracker
+                                                  while the overlay is
+                                                  shown.
+        chance (np.ndarray | None): Flat mine probabilities drawn on
+                                    the covered cells.
     """
 
     BINDINGS = [
-        ('space, f', 'toggle_flag')
+        ('space, f', 'toggle_flag'),
+        ('c', 'chord'),
+        ('h', 'hint'),
+        ('p', 'toggle_probabilities')
     ]
 
     def __init__(
@@ -188,6 +218,9 @@ class MinefieldUI(Grid):
             is_playing: bool = False,
             on_game_over: Optional[Callable] = None,
             on_flag: Optional[Callable] = None,
+            on_move: Optional[Callable] = None,
+            game_matrix: Optional['np.ndarray'] = None,
+            start_position: Optional[Tuple[int, int]] = None,
             **kwargs
     ):
         """
@@ -203,30 +236,97 @@ class MinefieldUI(Grid):
         :type on_game_over: Callable, optional
         :param on_flag: Callback to invoke when a flag is toggled.
         :type on_flag: Callable, optional
+        :param on_move: Callback to invoke with the Move and position
+                        of every move, before it is drawn.
+        :type on_move: Callable, optional
+        :param game_matrix: Pre-generated board to play instead of a
+                            random one.
+        :type game_matrix: np.ndarray, optional
+        :param start_position: Safe start cell, marked and focused.
+        :type start_position: Tuple[int, int], optional
         :param kwargs: Additional keyword arguments.
         :type kwargs: dict
         :return: None
         """
 
+        # Deferred so the main menu starts without loading numpy
+        # pylint: disable=C0415
+        from game_logic import BoardState, GameSession, MinefieldLogic
+
         super().__init__(**kwargs)
-        self.is_game_over = False
-        self.is_playing = is_playing
         self.on_game_over = on_game_over
         self.on_flag = on_flag
-        self.placed_flags = set()
-        self.number_of_mine = number_of_mine
+        self.on_move = on_move
         self.grid_width, self.grid_height = grid_size
-        self.game = MinefieldLogic(
-            cols=self.grid_width,
-            rows=self.grid_height,
-            number_of_mines=number_of_mine
+        # Random boards place their mines on the first uncovered cell,
+        # so the first click is safe and nothing is generated up front
+        self.session = GameSession(
+            game=MinefieldLogic(
+                cols=self.grid_width,
+                rows=self.grid_height,
+                number_of_mines=number_of_mine,
+                game_matrix=game_matrix,
+                deferred=True
+            )
+        )
+        if is_playing:
+            self.session.start()
+        self.game = self.session.game
+        self.cells = BoardState(self.game)
+        self.probabilities = None
+        self.chance = None
+        self.start_index = (
+            self.position_to_index(start_position)
+            if start_position is not None else None
         )
-        self.game_matrix = self.game.game_matrix
-        self.flat_game_matrix = self.game_matrix.flatten()
-        self.focused_button_index = 0
+        self.focused_button_index = self.start_index or 0
         self.setup_styles()
         self.build()
 
+    @property
+    def is_playing(self) -> bool:
+        """
+        Checks whether the game is in progress.
+
+        :return: True if the game is active.
+        :rtype: bool
+        """
+
+        return self.session.state is GameState.PLAYING
+
+    @property
+    def is_game_over(self) -> bool:
+        """
+        Checks whether the game has been won or lost.
+
+        :return: True if the game is over.
+        :rtype: bool
+        """
+
+        return self.session.is_over
+
+    @property
+    def placed_flags(self) -> set:
+        """
+        Returns the positions of the placed flags.
+
+        :return: Positions of the placed flags.
+        :rtype: set
+        """
+
+        return self.session.placed_flags
+
+    @property
+    def number_of_mine(self) -> int:
+        """
+        Returns the number of flags left to place.
+
+        :return: Number of remaining flags.
+        :rtype: int
+        """
+
+        return self.session.remaining_flags
+
     def setup_styles(self) -> None:
         """
         Sets the grid and UI component styles.
@@ -251,7 +351,7 @@ class MinefieldUI(Grid):
             color_class = 'primary-bg' if i % 2 else 'secondary-bg'
             self.compose_add_child(
                 Button(
-                    label='',
+                    label=Icons.START.value if i == self.start_index else '',
                     classes=f'game_button {color_class}',
                     id=f'id_{i}'
                 )
@@ -266,28 +366,73 @@ class MinefieldUI(Grid):
         :return: None
         """
 
-        if not self.is_playing and not event.button.has_class('surface-bg'):
-            self.is_playing = True
+        # pylint: disable=W0613
+        self.press_focused_cell()
 
-        value = self.get_value_by_index(self.focused_button_index)
-        if value and self.is_playing:
-            self.handle_button_press(value)
-        else:
-            self.uncover_connected_zeros()
+    def press_focused_cell(self) -> None:
+        """
+        Starts the game or uncovers cells from the focused cell.
+
+        Pressing an uncovered number chords around it.
+
+        :return: None
+        """
 
-    def handle_button_press(self, value: int) -> None:
+        index = self.focused_button_index
+        if self.is_game_over:
+            return
+
+        if self.cells.revealed.item(index):
+            self.action_chord()
+            return
+
+        flags = self.number_of_mine
+        position = divmod(index, self.grid_width)
+        positions = self.session.reveal(position)
+        self.notify_move(Move.REVEAL, position)
+        self.show_uncovered(positions, flags)
+
+    def action_chord(self) -> None:
         """
-        Processes the button press based on its value.
+        Chords around the focused number once its mines are flagged.
+
+        Every covered, unflagged neighbour is uncovered at once, with
+        the cascades of the zero cells among them merged.
 
-        :param value: The value of the pressed button.
-        :type value: int
         :return: None
         """
 
-        if value >= 9:  # Mine detected, game over
-            self.game_over(completed=False)
-        else:
-            self.set_button(self.focused_button_index)
+        index = self.focused_button_index
+        if not self.is_playing or not self.cells.revealed.item(index):
+            return
+
+        flags = self.number_of_mine
+        position = divmod(index, self.grid_width)
+        positions = self.session.chord(position)
+        self.notify_move(Move.CHORD, position)
+        self.show_uncovered(positions, flags)
+
+    def show_uncovered(self, positions: List[tuple], flags: int) -> None:
+        """
+        Draws the cells uncovered by a move, or the end of the game.
+
+        :param positions: Positions uncovered by the move.
+        :type positions: List[tuple]
+        :param flags: Flags left to place before the move.
+        :type flags: int
+        :return: None
+        """
+
+        if self.is_game_over:
+            self.game_over(completed=self.session.state is GameState.WON)
+            return
+
+        indices = self.cells.indices(positions)
+        self.set_buttons(indices)
+        if flags != self.number_of_mine:
+            self.cells.clear_flags(indices)
+            self.notify_flags()
+        self.update_probabilities(positions)
 
     def on_mount(self):
         """
@@ -343,60 +488,213 @@ class MinefieldUI(Grid):
         :return: None
         """
 
-        if not self.is_playing and not self.is_game_over:
-            self.is_playing = True
+        index = self.focused_button_index
+        position = divmod(index, self.grid_width)
+        if self.cells.revealed.item(index) or not self.session.toggle_flag(
+                position):
+            return
 
-        button = self.children[self.focused_button_index]
-        if not button.has_class('surface-bg'):
-            position = self.index_to_position(self.focused_button_index)
-            increment = 0
+        self.notify_move(Move.FLAG, position)
+        self.cells.flagged[index] = not self.cells.flagged.item(index)
+        self.notify_flags()
+        if self.is_game_over:
+            self.game_over(completed=self.session.state is GameState.WON)
+        else:
+            self.draw_flag(self.focused_button_index)
+            self.update_probabilities([position])
 
-            if not button.label and self.number_of_mine > 0:
-                button.label = f'{Icons.FLAG.value}'
-                increment = -1
-            elif button.label:
-                button.label = ''
-                increment = 1
+    def action_hint(self) -> None:
+        """
+        Moves the focus to the nearest cell the solver can decide.
 
-            self.update_flag(increment, position)
+        Safe cells are preferred to mines still to flag. The solver only
+        sees what the player sees, so a hint is never a guess.
 
-            if not self.number_of_mine and self.game.validate_flags(
-                    self.placed_flags):
-                self.game_over(completed=True)
+        :return: None
+        """
 
-    def update_flag(self, increment: int, position: tuple) -> None:
+        if not self.is_playing:
+            return
+
+        move = self.create_solver().hint(
+            near=self.index_to_position(self.focused_button_index)
+        )
+        if move is None:
+            self.notify('No certain move left, you have to guess.')
+            return
+
+        position, is_mine = move
+        self.focused_button_index = self.position_to_index(position)
+        self.update_focus()
+        self.notify('This cell is a mine.' if is_mine else
+                    'This cell is safe.')
+
+    def create_solver(self) -> 'MinefieldSolver':
         """
-        Updates the flag count and triggers flag events.
+        Creates a solver for what the player sees of the board.
+
+        The solver shares the probability tracker's cache while the
+        overlay is shown.
+
+        :return: Solver for the current position.
+        :rtype: MinefieldSolver
+        """
+
+        # Deferred like game_logic, the solver needs numpy
+        from solver import MinefieldSolver  # pylint: disable=C0415
+
+        return MinefieldSolver(
+            self.game.game_matrix,
+            self.game.revealed,
+            self.cells.flagged.reshape(self.game.revealed.shape),
+            self.game.number_of_mines,
+            cache=(
+                self.probabilities.cache
+                if self.probabilities is not None else None
+            )
+        )
+
+    def action_toggle_probabilities(self) -> None:
+        """
+        Shows or hides the mine probability of every covered cell.
 
-        :param increment: The increment for the flag count.
-        :type increment: int
-        :param position: The grid position of the flag.
-        :type position: tuple
         :return: None
         """
 
-        self.number_of_mine += increment
+        if self.is_game_over:
+            return
 
-        if increment > 0:
-            self.placed_flags.remove(position)
-        elif increment < 0:
-            self.placed_flags.add(position)
+        if self.probabilities is None:
+            from solver import MineProbabilities  # pylint: disable=C0415
+            self.probabilities = MineProbabilities()
+            self.update_probabilities()
+        else:
+            self.probabilities = None
+            previous, self.chance = self.chance, None
+            self.draw_probabilities(previous)
 
-        if callable(self.on_flag) and self.is_playing:
-            self.on_flag(self.number_of_mine)
+    def update_probabilities(self, changed: Iterable[tuple] = ()) -> None:
+        """
+        Recomputes the shown probabilities after a move.
+
+        Only the frontier components near the changed cells are
+        enumerated again.
+
+        :param changed: Cells uncovered or flagged by the move.
+        :type changed: Iterable[tuple]
+        :return: None
+        """
+
+        if self.probabilities is None or self.is_game_over:
+            return
+
+        previous = self.chance
+        self.chance = self.probabilities.update(
+            self.create_solver(),
+            changed
+        ).reshape(-1)
+        self.draw_probabilities(previous)
+
+    def get_heat(self, button_index: int) -> Optional[Tuple[str, Style]]:
+        """
+        Gets the digit and colour showing a covered cell's probability.
+
+        The digit is the probability in tenths, 9 standing for 90% and
+        above.
 
-    def uncover_connected_zeros(self) -> None:
+        :param button_index: The index of the cell in the grid.
+        :type button_index: int
+        :return: The digit and its style, or None if not shown.
+        :rtype: Tuple[str, Style] or None
         """
-        Uncovers all connected cells with zero value.
 
+        if self.chance is None or self.cells.flagged.item(button_index):
+            return None
+
+        chance = self.chance.item(button_index)
+        if isnan(chance):
+            return None
+
+        tenth = min(int(chance * 10), 9)
+        return str(tenth), HEAT_STYLES[tenth]
+
+    def draw_probabilities(self, previous: Optional['np.ndarray']) -> None:
+        """
+        Relabels the covered cells whose shown probability changed.
+
+        :param previous: The probabilities shown before, if any.
+        :type previous: np.ndarray, optional
         :return: None
         """
 
-        position = self.index_to_position(self.focused_button_index)
-        positions = self.game.get_connected_component(position)
+        covered = ~self.cells.revealed & ~self.cells.flagged
+        if previous is not None and self.chance is not None:
+            # Compare the drawn digits, NaN never equals itself
+            covered &= (
+                (previous * 10).clip(max=9) // 1
+                != (self.chance * 10).clip(max=9) // 1
+            )
 
-        for pos in positions:
-            self.set_button(self.position_to_index(pos))
+        with self.app.batch_update():
+            for button_index in covered.nonzero()[0].tolist():
+                self.draw_flag(button_index)
+
+    def draw_flag(self, button_index: int) -> None:
+        """
+        Shows the flag, start mark or probability on a button, or
+        clears it.
+
+        :param button_index: The index of the button in the grid.
+        :type button_index: int
+        :return: None
+        """
+
+        heat = self.get_heat(button_index)
+        if self.cells.flagged.item(button_index):
+            label = f'{Icons.FLAG.value}'
+        elif button_index == self.start_index:
+            label = Icons.START.value
+        elif heat is not None:
+            label = Text(*heat)
+        else:
+            label = ''
+        self.children[button_index].label = label
+
+    def is_revealed(self, button_index: int) -> bool:
+        """
+        Checks whether the cell at the specified index is uncovered.
+
+        :param button_index: The index of the button in the grid.
+        :type button_index: int
+        :return: True if the cell is uncovered, otherwise False.
+        :rtype: bool
+        """
+
+        return self.cells.revealed.item(button_index)
+
+    def notify_move(self, move: Move, position: tuple) -> None:
+        """
+        Triggers the on_move callback with a move played.
+
+        :param move: The move played.
+        :type move: Move
+        :param position: Coordinates of the cell.
+        :type position: tuple
+        :return: None
+        """
+
+        if callable(self.on_move):
+            self.on_move(move, position)
+
+    def notify_flags(self) -> None:
+        """
+        Triggers the on_flag callback with the number of remaining flags.
+
+        :return: None
+        """
+
+        if callable(self.on_flag):
+            self.on_flag(self.number_of_mine)
 
     def position_to_index(self, position: tuple) -> int:
         """
@@ -429,9 +727,7 @@ class MinefieldUI(Grid):
         :return: None
         """
 
-        self.is_playing = False
-        for button_index in range(len(self.children)):
-            self.set_button(button_index)
+        self.set_buttons(range(self.grid_width * self.grid_height))
 
     def get_value_by_index(self, index: int) -> int:
         """
@@ -443,41 +739,73 @@ class MinefieldUI(Grid):
         :rtype: int
         """
 
-        return int(self.flat_game_matrix[index])
+        return self.cells.values.item(index)
 
-    def set_button(self, button_index: int) -> None:
+    def set_button(
+            self,
+            button_index: int,
+            update: bool = True
+    ) -> Optional[Button]:
         """
         Sets the label and style for the button based on the cell value.
 
         :param button_index: The index of the button in the grid.
         :type button_index: int
-        :return: None
+        :param update: Whether to restyle the button immediately.
+        :type update: bool
+        :return: The updated button, or None if the index is invalid.
+        :rtype: Button or None
         """
 
-        if button_index < 0 or button_index >= len(self.children):
-            return
-
-        position = self.index_to_position(button_index)
-        if position in self.placed_flags:
-            self.update_flag(increment=1, position=position)
+        if not 0 <= button_index < self.grid_width * self.grid_height:
+            return None
 
         button = self.children[button_index]
         value = self.get_value_by_index(button_index)
         if value >= 9:
             button.label = Icons.MINE.value
-            button.classes = 'surface-bg block-red'
+            classes = ('surface-bg', 'block-red')
         elif value >= 3:
             button.label = str(value)
-            button.classes = 'surface-bg block-orange'
+            classes = ('surface-bg', 'block-orange')
         elif value == 2:
             button.label = str(value)
-            button.classes = 'surface-bg block-green'
+            classes = ('surface-bg', 'block-green')
         elif value == 1:
             button.label = str(value)
-            button.classes = 'surface-bg block-blue'
+            classes = ('surface-bg', 'block-blue')
         else:
             button.label = ' '
-            button.classes = 'surface-bg'
+            classes = ('surface-bg',)
+
+        # Replace the classes, restyling only if requested
+        button.remove_class(*button.classes, update=False)
+        button.add_class(*classes, update=update)
+        return button
+
+    def set_buttons(self, button_indices: Iterable[int]) -> None:
+        """
+        Sets the labels and styles for many buttons in a single pass.
+
+        Repaints are suspended for the whole batch and the stylesheet
+        is applied to all the buttons at once, sharing its rule cache,
+        instead of restyling every button as it changes.
+
+        :param button_indices: The indices of the buttons in the grid.
+        :type button_indices: Iterable[int]
+        :return: None
+        """
+
+        with self.app.batch_update():
+            buttons = [
+                button
+                for button in (
+                    self.set_button(button_index, update=False)
+                    for button_index in button_indices
+                )
+                if button is not None
+            ]
+            self.app.stylesheet.update_nodes(buttons, animate=True)
 
     def game_over(self, completed: bool = False) -> None:
         """
@@ -489,136 +817,411 @@ class MinefieldUI(Grid):
         :return: None
         """
 
-        self.uncover_all()  # Reveal all cells since the game is over
-        self.is_game_over = True
+        self.uncover_all()  # The session revealed the board on game over
         if callable(self.on_game_over):
             self.on_game_over(completed)
 
 
-class MinefieldLogic:
+class MinefieldCanvas(MinefieldUI, can_focus=True):
     """
-    Manages the logic for a Minesweeper game, including mine placement
-    and validation of flags.
+    A Minefield user interface drawn as a single widget.
+
+    Instead of one Button per cell, rows are drawn with the Line API
+    straight from the game state and the cursor is tracked by the
+    widget itself, so mount time and memory do not depend on the
+    number of cells. Boards larger than the widget are shown through a
+    viewport that follows the cursor, and only the visible cells are
+    drawn, so the cost of a frame depends on the viewport size.
 
     Attributes:
-        cols (int): Number of columns in the game grid.
-        rows (int): Number of rows in the game grid.
-        number_of_mines (int): Number of mines to place.
-        game_matrix (np.ndarray): Matrix representing the game state.
-        mask (np.ndarray): Mask used for mine placement.
-        components (np.ndarray): Labeled components of the game matrix.
+        BINDINGS (List[Tuple[str, str]]): Key bindings for uncovering.
+        COMPONENT_CLASSES (set): Styles used to draw the cells.
+        DEFAULT_CSS (str): CSS styling for the cells.
     """
 
-    def __init__(
-            self,
-            cols: int = 10,
-            rows: int = 10,
-            number_of_mines: int = 10
-    ):
+    BINDINGS = [
+        ('enter', 'press')
+    ]
+
+    COMPONENT_CLASSES = {
+        'minefield--primary',
+        'minefield--secondary',
+        'minefield--revealed',
+        'minefield--cursor',
+        'minefield--red',
+        'minefield--orange',
+        'minefield--green',
+        'minefield--blue'
+    }
+
+    DEFAULT_CSS = """
+    MinefieldCanvas {
+        & > .minefield--primary {
+            background: $primary;
+            color: green;
+            text-style: bold;
+        }
+
+        & > .minefield--secondary {
+            background: $secondary;
+            color: green;
+            text-style: bold;
+        }
+
+        & > .minefield--revealed {
+            background: $surface;
+            text-style: bold;
+        }
+
+        & > .minefield--cursor {
+            background: $accent;
+        }
+
+        & > .minefield--red {
+            color: darkviolet;
+        }
+
+        & > .minefield--orange {
+            color: orangered;
+        }
+
+        & > .minefield--green {
+            color: limegreen;
+        }
+
+        & > .minefield--blue {
+            color: dodgerblue;
+        }
+    }
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initializes the MinefieldCanvas with the MinefieldUI arguments.
+
+        :param args: Positional arguments for MinefieldUI.
+        :type args: tuple
+        :param kwargs: Keyword arguments for MinefieldUI.
+        :type kwargs: dict
+        :return: None
+        """
+
+        self._cell_styles: Optional[dict] = None
+        self._cursor_row = 0
+        self.origin = (0, 0)
+        super().__init__(*args, **kwargs)
+
+    def setup_styles(self) -> None:
+        """
+        Sets the canvas size, limited to the space of its container.
+
+        :return: None
+        """
+
+        super().setup_styles()
+        self.styles.max_width = '100%'
+        self.styles.max_height = '100%'
+
+    @property
+    def viewport_size(self) -> Tuple[int, int]:
+        """
+        Returns the number of cells visible in the canvas.
+
+        :return: Visible (rows, cols).
+        :rtype: Tuple[int, int]
+        """
+
+        return (
+            min(self.content_size.height, self.grid_height),
+            min(self.content_size.width // 3, self.grid_width)
+        )
+
+    def scroll_to_cursor(self) -> bool:
+        """
+        Moves the viewport the least needed to show the cursor.
+
+        :return: True if the viewport moved, otherwise False.
+        :rtype: bool
+        """
+
+        view_rows, view_cols = self.viewport_size
+        if not view_rows or not view_cols:  # Not laid out yet
+            return False
+
+        row, col = self.index_to_position(self.focused_button_index)
+        origin_row, origin_col = self.origin
+        origin = (
+            min(max(origin_row, row - view_rows + 1), row,
+                self.grid_height - view_rows),
+            min(max(origin_col, col - view_cols + 1), col,
+                self.grid_width - view_cols)
+        )
+        origin = (max(origin[0], 0), max(origin[1], 0))
+        if origin == self.origin:
+            return False
+
+        self.origin = origin
+        return True
+
+    def build(self) -> None:
+        """
+        Builds nothing, as the cells are drawn rather than mounted.
+
+        :return: None
+        """
+
+    def notify_style_update(self) -> None:
         """
-        Initializes the MinefieldLogic with given dimensions and mines.
+        Drops the cached cell styles when the CSS changes.
 
-        :param cols: Number of columns in the grid.
-        :type cols: int
-        :param rows: Number of rows in the grid.
-        :type rows: int
-        :param number_of_mines: Number of mines to be placed.
-        :type number_of_mines: int
         :return: None
         """
 
-        self.cols = cols
-        self.rows = rows
-        self.number_of_mines = number_of_mines
-        self.game_matrix = np.zeros((self.rows, self.cols), dtype=np.uint8)
-        self.mask = np.ones((3, 3), dtype=int)
-        self.initialize_mines()
-        self.components: np.ndarray = label(
-            self.game_matrix == 0,
-            structure=self.mask
-        )[0]
+        super().notify_style_update()
+        self._cell_styles = None
 
-    def initialize_mines(self) -> None:
+    def get_cell_styles(self) -> dict:
         """
-        Places mines randomly in the game matrix.
+        Returns the Rich styles of the cells, keyed by component name.
 
-        Updates the game matrix with randomly placed mines based on
-        the number_of_mines attribute.
+        :return: Mapping of component name to partial Rich style.
+        :rtype: dict
+        """
+
+        if self._cell_styles is None:
+            self._cell_styles = {
+                name: self.get_component_rich_style(name, partial=True)
+                for name in self.COMPONENT_CLASSES
+            }
+
+        return self._cell_styles
+
+    def get_cell(self, index: int, styles: dict) -> Tuple[str, Style]:
+        """
+        Gets the text and style used to draw a cell.
+
+        :param index: The index in the flattened grid.
+        :type index: int
+        :param styles: Cell styles from get_cell_styles.
+        :type styles: dict
+        :return: The cell text and its style.
+        :rtype: Tuple[str, Style]
+        """
+
+        if not self.cells.revealed.item(index):
+            text = Icons.FLAG.value if self.cells.flagged.item(index) else ' '
+            style = styles[
+                'minefield--primary' if index % 2 else 'minefield--secondary'
+            ]
+            heat = self.get_heat(index)
+            if index == self.start_index and text == ' ':
+                text = Icons.START.value
+            elif heat is not None:
+                text, heat_style = heat
+                style += heat_style
+        else:
+            value = self.get_value_by_index(index)
+            style = styles['minefield--revealed']
+            if value >= 9:
+                text = Icons.MINE.value
+                style += styles['minefield--red']
+            elif value >= 3:
+                text = str(value)
+                style += styles['minefield--orange']
+            elif value == 2:
+                text = str(value)
+                style += styles['minefield--green']
+            elif value == 1:
+                text = str(value)
+                style += styles['minefield--blue']
+            else:
+                text = ' '
+
+        if index == self.focused_button_index and self.has_focus:
+            style += styles['minefield--cursor']
+
+        return f' {text} ', style
+
+    def render_line(self, y: int) -> Strip:
+        """
+        Draws the visible cells of one line of the viewport.
+
+        :param y: The line of the viewport to draw.
+        :type y: int
+        :return: The drawn line.
+        :rtype: Strip
+        """
+
+        width = self.content_size.width
+        view_rows, view_cols = self.viewport_size
+        if y >= view_rows:
+            return Strip.blank(width, self.rich_style)
+
+        styles = self.get_cell_styles()
+        base_style = self.rich_style
+        origin_row, origin_col = self.origin
+        start = (origin_row + y) * self.grid_width + origin_col
+        segments = []
+        for index in range(start, start + view_cols):
+            text, style = self.get_cell(index, styles)
+            segments.append(Segment(text, base_style + style))
+
+        return Strip(segments, view_cols * 3).extend_cell_length(
+            width,
+            self.rich_style
+        )
+
+    def refresh_row(self, row: int) -> None:
+        """
+        Marks a single row of the minefield for repainting if visible.
+
+        :param row: The row to repaint.
+        :type row: int
+        :return: None
+        """
+
+        y = row - self.origin[0]
+        if 0 <= y < self.viewport_size[0]:
+            self.refresh(Region(0, y, self.content_size.width, 1))
+
+    def update_focus(self) -> None:
+        """
+        Moves the cursor to the focused cell, scrolling the viewport to
+        follow it, and repaints the affected rows.
+
+        :return: None
+        """
+
+        if not self.has_focus:
+            self.focus()
+
+        row = self.focused_button_index // self.grid_width
+        if self.scroll_to_cursor():
+            self.refresh()
+        else:
+            self.refresh_row(self._cursor_row)
+            self.refresh_row(row)
+
+        self._cursor_row = row
+
+    def on_resize(self) -> None:
+        """
+        Keeps the cursor visible when the canvas changes size.
+
+        :return: None
+        """
+
+        self.scroll_to_cursor()
+        self.refresh()
+
+    def on_focus(self) -> None:
+        """
+        Shows the cursor when the minefield gains focus.
 
         :return: None
         """
 
-        matrix = self.game_matrix.copy()
+        self.refresh_row(self._cursor_row)
 
-        # Randomly select positions in the matrix for mine placement
-        random_mines = np.random.choice(
-            self.game_matrix.size,
-            self.number_of_mines,
-            replace=False
+    def on_blur(self) -> None:
+        """
+        Hides the cursor when the minefield loses focus.
+
+        :return: None
+        """
+
+        self.refresh_row(self._cursor_row)
+
+    def on_click(self, event: events.Click) -> None:
+        """
+        Moves the cursor to the clicked cell and uncovers it.
+
+        :param event: The click event.
+        :type event: events.Click
+        :return: None
+        """
+
+        offset = event.get_content_offset(self)
+        view_rows, view_cols = self.viewport_size
+        if (
+                offset is None
+                or offset.y >= view_rows
+                or offset.x >= view_cols * 3
+        ):
+            return
+
+        origin_row, origin_col = self.origin
+        self.focused_button_index = self.position_to_index(
+            (origin_row + offset.y, origin_col + offset.x // 3)
         )
+        self.update_focus()
+        self.press_focused_cell()
 
-        for mine in random_mines:
-            mask = self.mask.copy()
-            mask[1, 1] = 9
-            pos_y, pos_x = divmod(mine, self.cols)
-            pos_y, pos_x = pos_y - 1, pos_x - 1
+    def action_press(self) -> None:
+        """
+        Uncovers cells from the cell under the cursor.
 
-            if pos_x < 0:
-                mask = mask[:, 1:]  # Adjust mask if mine is on the left
-                pos_x = 0
-            elif pos_x > self.cols - 3:
-                mask = mask[:, :-1]  # Adjust mask if mine is on the right
+        :return: None
+        """
 
-            if pos_y < 0:
-                mask = mask[1:, :]  # Adjust mask if mine is on the top
-                pos_y = 0
-            elif pos_y > self.rows - 3:
-                mask = mask[:-1, :]  # Adjust mask if mine is on the bottom
+        self.press_focused_cell()
 
-            new_matrix = self.game_matrix.copy()
-            new_matrix[
-                pos_y:pos_y + mask.shape[0],
-                pos_x:pos_x + mask.shape[1]
-            ] = mask
-            matrix += new_matrix
+    def draw_flag(self, button_index: int) -> None:
+        """
+        Repaints the row of a cell whose flag changed.
+
+        :param button_index: The index of the cell in the grid.
+        :type button_index: int
+        :return: None
+        """
 
-        self.game_matrix = matrix
+        self.refresh_row(button_index // self.grid_width)
 
-    def validate_flags(self, flags: set) -> bool:
+    def draw_probabilities(self, previous: Optional['np.ndarray']) -> None:
         """
-        Checks if flagged positions match the mine locations.
+        Repaints the minefield with the new probabilities.
 
-        :param flags: Set of flagged positions.
-        :type flags: set
-        :return: True if flags match mine positions, otherwise False.
-        :rtype: bool
+        :param previous: The probabilities shown before, if any.
+        :type previous: np.ndarray, optional
+        :return: None
         """
 
-        positions = map(tuple, np.argwhere(self.game_matrix >= 9).tolist())
-        return not bool(set.difference(set(positions), flags))
+        self.refresh()
 
-    def get_connected_component(self, position: list | tuple) -> np.ndarray:
+    def set_button(
+            self,
+            button_index: int,
+            update: bool = True
+    ) -> None:
         """
-        Retrieves the connected component of a given position.
+        Repaints the row of an uncovered cell.
 
-        :param position: Coordinates of the position.
-        :type position: list or tuple
-        :return: Array of connected component positions.
-        :rtype: np.ndarray
+        :param button_index: The index of the cell in the grid.
+        :type button_index: int
+        :param update: Whether to repaint the row immediately.
+        :type update: bool
+        :return: None
         """
 
-        zeros = np.zeros_like(self.game_matrix, dtype=np.uint8)
-        component = np.argwhere(self.components == self.components[position])
+        if not 0 <= button_index < self.grid_width * self.grid_height:
+            return
+
+        if update:
+            self.refresh_row(button_index // self.grid_width)
 
-        for pos in component:
-            # Ensure within bounds
-            pos_start = np.clip(pos - 1, 0, [self.rows - 1, self.cols - 1])
-            pos_end = np.clip(pos + 1, 0, [self.rows - 1, self.cols - 1])
+    def set_buttons(self, button_indices: Iterable[int]) -> None:
+        """
+        Updates many uncovered cells and repaints the minefield once.
+
+        :param button_indices: The indices of the cells in the grid.
+        :type button_indices: Iterable[int]
+        :return: None
+        """
 
-            # Mark connected area
-            zeros[pos_start[0]:pos_end[0] + 1, pos_start[1]:pos_end[1] + 1] = 1
+        for button_index in button_indices:
+            self.set_button(button_index, update=False)
 
-        return np.argwhere(zeros)
+        self.refresh()
 
 
 class GameOverScreen(ModalScreen):
@@ -0,0 +1,1955 @@
+"""
+This module defines the game logic for Minesweeper, independent of any
+user interface. It includes the minefield generators and reveal rules,
+and the `GameSession` class that plays a full game on top of them, so
+games can be played by bots, tests or servers without Textual.
+
+Classes:
+    MinefieldLogic: Contains the logic for generating the minefield,
+                    handling user input, and game rules.
+    CompactMinefieldLogic: Bit-packed minefield logic for very large
+                           custom boards.
+    ChunkedMinefieldLogic: Lazily generated minefield built from seeded
+                           chunks, bounded or endless.
+    GameSession: Plays a game: reveals, flags, chords and game state.
+    BoardState: Flat per-cell planes read by the user interfaces.
+
+Functions:
+    neighbour_sum: Sums the 3x3 neighbourhood of every cell of a plane.
+    label_regions: Labels the 8-connected regions of a boolean plane.
+
+Usage:
+    Create a `GameSession` and drive it with `reveal`, `toggle_flag`
+    and `chord`, reading the outcome from `state`. Boards are shared
+    with `MinefieldLogic.encode` and `MinefieldLogic.decode`.
+"""
+
+import base64
+import math
+import struct
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from configurations import GameState
+
+# Row and column offsets of the 3x3 neighbourhood, shaped to broadcast
+# against a column of positions
+_OFFSET_Y, _OFFSET_X = np.mgrid[-1:2, -1:2].reshape(2, 1, 9)
+
+# Encoded board header: magic, version, flags, rows, cols and seed,
+# followed by the mine plane packed eight cells per byte
+_BOARD_MAGIC = b'MB'
+_BOARD_VERSION = 1
+_BOARD_HAS_SEED = 1
+_BOARD_HEADER = struct.Struct('<2sBBHHQ')
+
+
+class MinefieldLogic:
+    """
+    Manages the logic for a Minesweeper game, including mine placement
+    and validation of flags.
+
+    Attributes:
+        cols (int): Number of columns in the game grid.
+        rows (int): Number of rows in the game grid.
+        number_of_mines (int): Number of mines to place.
+        game_matrix (np.ndarray): Matrix representing the game state.
+        revealed (np.ndarray): Boolean matrix of revealed cells.
+        mines_placed (bool): False until a deferred board places its
+                             mines.
+        safe_radius (int): Cells around the first uncovered cell that
+                           a deferred board keeps free of mines.
+        seed (int | None): Seed of the mine placement, None for a
+                           board given as a game matrix without one.
+        use_region_index (bool): True if the region index is built.
+        region_indptr (np.ndarray | None): Offsets of each zero region
+                                           in region_cells.
+        region_cells (np.ndarray | None): Flat indices of the cells
+                                          revealed by each zero region.
+    """
+
+    def __init__(
+            self,
+            cols: int = 10,
+            rows: int = 10,
+            number_of_mines: int = 10,
+            region_index: bool = False,
+            game_matrix: Optional[np.ndarray] = None,
+            components: Optional[np.ndarray] = None,
+            deferred: bool = False,
+            safe_radius: int = 1,
+            seed: Optional[int] = None
+    ):
+        """
+        Initializes the MinefieldLogic with given dimensions and mines.
+
+        A pre-generated game matrix, such as one board of
+        generate_batch, is used as is; its shape and mines then override
+        the dimensions and mine count. A deferred board starts empty and
+        places its mines when the first cell is uncovered, away from it.
+        Mines are placed by a generator of the board's own, so the same
+        seed and first cell always give the same board.
+
+        :param cols: Number of columns in the grid.
+        :type cols: int
+        :param rows: Number of rows in the grid.
+        :type rows: int
+        :param number_of_mines: Number of mines to be placed.
+        :type number_of_mines: int
+        :param region_index: Build the region index after generation.
+        :type region_index: bool
+        :param game_matrix: Board to use instead of placing mines.
+        :type game_matrix: np.ndarray, optional
+        :param components: Zero region labels of game_matrix.
+        :type components: np.ndarray, optional
+        :param deferred: Place the mines on the first uncovered cell.
+        :type deferred: bool
+        :param safe_radius: Cells around the first uncovered cell kept
+                            free of mines on a deferred board.
+        :type safe_radius: int
+        :param seed: Seed of the mine placement, random when not given.
+        :type seed: int, optional
+        :return: None
+        """
+
+        if game_matrix is not None:
+            rows, cols = game_matrix.shape
+            number_of_mines = int(np.count_nonzero(game_matrix >= 9))
+
+        self.cols = cols
+        self.rows = rows
+        self.number_of_mines = number_of_mines
+        self.use_region_index = region_index
+        self.game_matrix = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        self.revealed = np.zeros((self.rows, self.cols), dtype=bool)
+        self.mines_placed = not deferred or game_matrix is not None
+        self.safe_radius = safe_radius
+        self.seed = (
+            seed if seed is not None or game_matrix is not None
+            else int(np.random.SeedSequence().entropy % 2**63)
+        )
+        self._rng: Optional[np.random.Generator] = None
+        self._components: Optional[np.ndarray] = None
+        self.region_indptr: Optional[np.ndarray] = None
+        self.region_cells: Optional[np.ndarray] = None
+
+        if game_matrix is not None:
+            self.set_game_matrix(game_matrix, components)
+        elif not deferred:
+            self.initialize_mines()
+
+    @property
+    def components(self) -> np.ndarray:
+        """
+        Returns the labeled zero regions of the game matrix.
+
+        Labeling scans the whole board, so it only runs on first use;
+        reveals flood fill from the clicked cell instead.
+
+        :return: Labeled components of the game matrix.
+        :rtype: np.ndarray
+        """
+
+        if self._components is None:
+            self._components = label_regions(self.game_matrix == 0)[0]
+
+        return self._components
+
+    @property
+    def rng(self) -> np.random.Generator:
+        """
+        Returns the random generator of the board, seeded on first use.
+
+        :return: Generator seeded with the board seed.
+        :rtype: np.random.Generator
+        """
+
+        if self._rng is None:
+            self._rng = np.random.default_rng(self.seed)
+
+        return self._rng
+
+    def initialize_mines(self, exclude: Optional[tuple] = None) -> None:
+        """
+        Places mines randomly in the game matrix.
+
+        Updates the game matrix with randomly placed mines based on
+        the number_of_mines attribute. Neighbour counts are computed in
+        a single pass by summing the nine shifted views of a padded
+        mine plane, so mines end up as 9 + neighbouring mines and all
+        other cells hold their 0-8 count.
+
+        Mines avoid the excluded cell and the cells within safe_radius
+        of it, or only the cell itself when the rest of the board is
+        too small for the mines. The matrix is written in place, so
+        views of it stay valid.
+
+        :param exclude: Coordinates of a cell to keep free of mines.
+        :type exclude: tuple, optional
+        :return: None
+        """
+
+        candidates = np.ones((self.rows, self.cols), dtype=bool)
+        if exclude is not None:
+            row, col = exclude
+            radius = self.safe_radius
+            candidates[max(row - radius, 0):row + radius + 1,
+                       max(col - radius, 0):col + radius + 1] = False
+            if np.count_nonzero(candidates) < self.number_of_mines:
+                candidates[:] = True
+                candidates[row, col] = False
+
+        # Randomly select positions in the matrix for mine placement
+        random_mines = self.rng.choice(
+            np.flatnonzero(candidates),
+            self.number_of_mines,
+            replace=False
+        )
+
+        # Scatter the mines into a plane padded by one cell on each side
+        padded = np.zeros((self.rows + 2, self.cols + 2), dtype=np.uint8)
+        pos_y, pos_x = np.divmod(random_mines, self.cols)
+        padded[pos_y + 1, pos_x + 1] = 1
+
+        self.game_matrix[...] = self.count_mines(padded)
+        self.set_game_matrix(self.game_matrix)
+        self.mines_placed = True
+
+    @staticmethod
+    def count_mines(padded: np.ndarray) -> np.ndarray:
+        """
+        Builds a game matrix from a padded plane of mines.
+
+        :param padded: Plane of 0/1 mines with a one-cell border.
+        :type padded: np.ndarray
+        :return: Board values, 9 + neighbours for mines.
+        :rtype: np.ndarray
+        """
+
+        # Sum the 3x3 neighbourhood of every cell, the cell included
+        matrix = neighbour_sum(padded)
+
+        # A mine counted itself once above, lift it to 9 + neighbours
+        matrix += padded[1:-1, 1:-1] * np.uint8(8)
+        return matrix
+
+    def set_game_matrix(
+            self,
+            game_matrix: np.ndarray,
+            components: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Replaces the board, dropping anything derived from the old one.
+
+        :param game_matrix: Board values, 9 + neighbours for mines.
+        :type game_matrix: np.ndarray
+        :param components: Zero region labels of game_matrix.
+        :type components: np.ndarray, optional
+        :return: None
+        """
+
+        self.game_matrix = game_matrix
+        self._components = components
+        self.region_indptr = self.region_cells = None
+
+        if self.use_region_index:
+            self.build_region_index()
+
+    @staticmethod
+    def generate_batch(
+            count: int,
+            cols: int = 10,
+            rows: int = 10,
+            number_of_mines: int = 10,
+            seed: Optional[int | np.random.SeedSequence] = None
+    ) -> np.ndarray:
+        """
+        Generates many boards of the same size as one 3-D array.
+
+        Every board draws a random key per cell and takes the
+        number_of_mines smallest keys as its mines, with a single
+        argpartition over the whole batch. Neighbour counts are then
+        summed over the padded stack at once, so no step loops over
+        boards or mines in Python.
+
+        :param count: Number of boards to generate.
+        :type count: int
+        :param cols: Number of columns in each grid.
+        :type cols: int
+        :param rows: Number of rows in each grid.
+        :type rows: int
+        :param number_of_mines: Number of mines on each board.
+        :type number_of_mines: int
+        :param seed: Seed for reproducible boards.
+        :type seed: int or np.random.SeedSequence, optional
+        :return: Boards of shape (count, rows, cols), encoded as
+                 game_matrix.
+        :rtype: np.ndarray
+        """
+
+        rng = np.random.default_rng(seed)
+        padded = np.zeros((count, rows + 2, cols + 2), dtype=np.uint8)
+        mines = padded[:, 1:-1, 1:-1]
+
+        if number_of_mines:
+            keys = rng.random((count, rows * cols), dtype=np.float32)
+            cells = np.argpartition(keys, number_of_mines - 1, axis=1)
+            pos_y, pos_x = np.divmod(cells[:, :number_of_mines], cols)
+            mines[np.arange(count)[:, None], pos_y, pos_x] = 1
+
+        matrices = neighbour_sum(padded)
+        matrices += mines * np.uint8(8)
+        return matrices
+
+    @staticmethod
+    def label_batch(game_matrices: np.ndarray) -> np.ndarray:
+        """
+        Labels the zero regions of a stack of boards in a single pass.
+
+        The boards are stacked into one tall plane, each followed by an
+        empty row so regions cannot join across boards, and labeled
+        with a single call. Labels are assigned in scan order, so each
+        board's labels form a consecutive range that is shifted back to
+        start at 1, matching what `components` would give.
+
+        :param game_matrices: Boards of shape (count, rows, cols).
+        :type game_matrices: np.ndarray
+        :return: Zero region labels of the same shape.
+        :rtype: np.ndarray
+        """
+
+        count, rows, cols = game_matrices.shape
+        stacked = np.zeros((count, rows + 1, cols), dtype=bool)
+        stacked[:, :rows] = game_matrices == 0
+        labels = label_regions(
+            stacked.reshape(-1, cols)
+        )[0].reshape(count, rows + 1, cols)[:, :rows]
+
+        last = np.maximum.accumulate(
+            labels.reshape(len(labels), -1).max(axis=1, initial=0)
+        )
+        offsets = np.concatenate(([0], last[:-1])).astype(labels.dtype)
+        labels -= np.where(labels > 0, offsets[:, None, None], 0).astype(
+            labels.dtype
+        )
+        return labels
+
+    def build_region_index(self) -> None:
+        """
+        Builds a CSR index from zero region label to revealed cells.
+
+        A cell is revealed by a zero region when the region touches its
+        3x3 neighbourhood, so every zero cell contributes a (label,
+        cell) pair for each of its in-bounds neighbours. The pairs are
+        sorted by label and deduplicated. The cells of region L are then
+        region_cells[region_indptr[L]:region_indptr[L + 1]], in
+        row-major order, including the numbered border.
+
+        :return: None
+        """
+
+        size = self.rows * self.cols
+        labels = self.components
+        zero_cells = np.flatnonzero(labels)
+        zero_labels = labels.reshape(-1)[zero_cells].astype(np.int64) * size
+        zero_y, zero_x = np.divmod(zero_cells, self.cols)
+
+        # Pair every zero cell's label with each in-bounds neighbour
+        pairs = []
+        for offset_y in (-1, 0, 1):
+            for offset_x in (-1, 0, 1):
+                pos_y, pos_x = zero_y + offset_y, zero_x + offset_x
+                inside = (
+                    (pos_y >= 0) & (pos_y < self.rows)
+                    & (pos_x >= 0) & (pos_x < self.cols)
+                )
+                pairs.append(
+                    zero_labels[inside]
+                    + zero_cells[inside]
+                    + offset_y * self.cols + offset_x
+                )
+
+        # Sort and drop repeated pairs, keeping the result label-major
+        pairs = np.sort(np.concatenate(pairs))
+        pairs = pairs[np.diff(pairs, prepend=-1) != 0]
+        region_labels, region_cells = np.divmod(pairs, size)
+        counts = np.bincount(region_labels, minlength=int(labels.max()) + 1)
+        self.region_indptr = np.concatenate(([0], np.cumsum(counts)))
+        self.region_cells = region_cells.astype(np.intp)
+
+    def validate_flags(self, flags: set) -> bool:
+        """
+        Checks if flagged positions match the mine locations.
+
+        :param flags: Set of flagged positions.
+        :type flags: set
+        :return: True if flags match mine positions, otherwise False.
+        :rtype: bool
+        """
+
+        positions = map(tuple, np.argwhere(self.game_matrix >= 9).tolist())
+        return not bool(set.difference(set(positions), flags))
+
+    def get_value(self, position: list | tuple) -> int:
+        """
+        Returns the value of the cell at the given position.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: Neighbouring mines, plus 9 if the cell is a mine.
+        :rtype: int
+        """
+
+        return int(self.game_matrix[tuple(position)])
+
+    def get_connected_component(self, position: list | tuple) -> np.ndarray:
+        """
+        Retrieves the connected component of a given position.
+
+        A zero cell yields its zero region together with the numbered
+        cells bordering it; any other cell yields only itself.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: Array of connected component positions.
+        :rtype: np.ndarray
+        """
+
+        position = tuple(position)
+        if self.region_indptr is not None and not self.game_matrix[position]:
+            cells = self._region_cells(position)
+            return np.column_stack(np.divmod(cells, self.cols))
+
+        visited = set()
+        cells = _flood_fill(
+            position,
+            (0, 0, self.rows, self.cols),
+            self.game_matrix.item,
+            visited.__contains__,
+            visited.add
+        )
+        return np.array(cells, dtype=np.intp).reshape(-1, 2)
+
+    def reveal(self, position: list | tuple) -> List[tuple]:
+        """
+        Reveals a cell, flooding through connected zero cells.
+
+        The flood fill starts at the given cell and stops at revealed
+        cells, so its cost depends on the number of newly revealed
+        cells rather than on the size of the board. With the region
+        index built, a zero cell is a slice lookup instead and its
+        cells come back in row-major order.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: Newly revealed positions in the order they were reached.
+        :rtype: List[tuple]
+        """
+
+        position = tuple(position)
+        if (
+                self.region_indptr is not None
+                and not self.game_matrix[position]
+                and not self.revealed[position]
+        ):
+            cells = self._region_cells(position)
+            flat_revealed = self.revealed.reshape(-1)
+            cells = cells[~flat_revealed[cells]]
+            flat_revealed[cells] = True
+            pos_y, pos_x = np.divmod(cells, self.cols)
+            return list(zip(pos_y.tolist(), pos_x.tolist()))
+
+        return _flood_fill(
+            position,
+            (0, 0, self.rows, self.cols),
+            self.game_matrix.item,
+            self.revealed.item,
+            self._mark_revealed
+        )
+
+    def reveal_many(self, cells: np.ndarray) -> List[tuple]:
+        """
+        Reveals many safe cells at once, with the union of their floods.
+
+        The zero cells among them select their zero regions by label,
+        and every region is opened with its numbered border in a single
+        step: slices of the region index when it is built, otherwise
+        one 3x3 dilation of the selected regions. Overlapping floods
+        are merged, so each cell is revealed once.
+
+        :param cells: Flat indices of safe cells.
+        :type cells: np.ndarray
+        :return: Newly revealed positions in row-major order.
+        :rtype: List[tuple]
+        """
+
+        flat_revealed = self.revealed.reshape(-1)
+        cells = cells[~flat_revealed[cells]]
+        if not len(cells):
+            return []
+
+        # Mark the cells and their floods on one plane, merging overlaps
+        opened = np.zeros(self.rows * self.cols, dtype=bool)
+        opened[cells] = True
+        labels = np.unique(self.components.reshape(-1)[cells])
+        labels = labels[labels > 0]
+        if len(labels) and self.region_indptr is not None:
+            starts = self.region_indptr[labels]
+            lengths = self.region_indptr[labels + 1] - starts
+            # Concatenate the slices of the selected regions
+            shifts = starts - (np.cumsum(lengths) - lengths)
+            opened[self.region_cells[
+                np.arange(lengths.sum()) + np.repeat(shifts, lengths)
+            ]] = True
+        elif len(labels):
+            selected = np.zeros(self.components.max() + 1, dtype=bool)
+            selected[labels] = True
+            padded = np.zeros((self.rows + 2, self.cols + 2), dtype=np.uint8)
+            padded[1:-1, 1:-1] = selected[self.components]
+            opened |= neighbour_sum(padded).reshape(-1) > 0
+
+        cells = np.flatnonzero(opened & ~flat_revealed)
+        flat_revealed[cells] = True
+        pos_y, pos_x = np.divmod(cells, self.cols)
+        return list(zip(pos_y.tolist(), pos_x.tolist()))
+
+    def chord_targets(
+            self,
+            positions: List[tuple],
+            flagged: np.ndarray
+    ) -> np.ndarray:
+        """
+        Finds the cells uncovered by chording around numbers.
+
+        A number is satisfied when as many of its neighbours are
+        flagged as its value. The 3x3 neighbourhoods of all the
+        positions are gathered as one (positions, 9) index array, so
+        flag counts and the neighbours to uncover come from a few array
+        operations whatever the number of positions.
+
+        :param positions: Coordinates of the chorded cells.
+        :type positions: List[tuple]
+        :param flagged: Boolean plane of flagged cells.
+        :type flagged: np.ndarray
+        :return: Flat indices of the covered, unflagged neighbours of
+                 the satisfied numbers, which may hold mines.
+        :rtype: np.ndarray
+        """
+
+        pos_y, pos_x = np.array(positions, dtype=np.intp).reshape(-1, 2).T
+        around_y = pos_y[:, None] + _OFFSET_Y
+        around_x = pos_x[:, None] + _OFFSET_X
+        inside = (
+            (around_y >= 0) & (around_y < self.rows)
+            & (around_x >= 0) & (around_x < self.cols)
+        )
+        # Off-board neighbours point at the cell itself, never flagged
+        # when it is an uncovered number, and are masked out below
+        around = np.where(inside, around_y * self.cols + around_x,
+                          (pos_y * self.cols + pos_x)[:, None])
+
+        flat_flagged = flagged.reshape(-1)
+        flags = np.count_nonzero(flat_flagged[around], axis=1)
+        values = self.game_matrix.reshape(-1)[around[:, 4]]
+        satisfied = (
+            self.revealed.reshape(-1)[around[:, 4]]
+            & (values > 0) & (values < 9) & (flags == values)
+        )
+
+        cells = around[satisfied][inside[satisfied]]
+        cells = np.unique(cells)
+        return cells[
+            ~self.revealed.reshape(-1)[cells] & ~flat_flagged[cells]
+        ]
+
+    def _region_cells(self, position: tuple) -> np.ndarray:
+        """
+        Looks up the cells revealed by the zero region of a position.
+
+        :param position: Coordinates of a zero cell.
+        :type position: tuple
+        :return: Flat indices of the region and its numbered border.
+        :rtype: np.ndarray
+        """
+
+        region = self.components[position]
+        return self.region_cells[
+            self.region_indptr[region]:self.region_indptr[region + 1]
+        ]
+
+    def _mark_revealed(self, position: tuple) -> None:
+        """
+        Marks the given position as revealed.
+
+        :param position: Coordinates of the position.
+        :type position: tuple
+        :return: None
+        """
+
+        self.revealed[position] = True
+
+    def is_revealed(self, position: list | tuple) -> bool:
+        """
+        Checks whether the given position has been revealed.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: True if the cell is revealed, otherwise False.
+        :rtype: bool
+        """
+
+        return bool(self.revealed[tuple(position)])
+
+    def reveal_all(self) -> None:
+        """
+        Marks every cell of the board as revealed.
+
+        :return: None
+        """
+
+        self.revealed[:] = True
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the board as a 16-byte header and a packed mine plane.
+
+        The header holds the dimensions and the seed, and every cell
+        takes one bit, so a HARD board fits in 66 bytes. Numbers are
+        left out as they follow from the mines.
+
+        :return: The encoded board.
+        :rtype: bytes
+        """
+
+        if not self.mines_placed:
+            raise ValueError('the mines of the board are not placed yet')
+        if max(self.rows, self.cols) > 0xFFFF:
+            raise ValueError('boards are encoded up to 65535 cells a side')
+
+        has_seed = self.seed is not None and 0 <= self.seed < 2**64
+        header = _BOARD_HEADER.pack(
+            _BOARD_MAGIC,
+            _BOARD_VERSION,
+            _BOARD_HAS_SEED if has_seed else 0,
+            self.rows,
+            self.cols,
+            self.seed if has_seed else 0
+        )
+        mines = np.packbits(self.game_matrix >= 9, axis=None,
+                            bitorder='little')
+        return header + mines.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, **kwargs) -> 'MinefieldLogic':
+        """
+        Decodes a board encoded by to_bytes.
+
+        :param data: The encoded board.
+        :type data: bytes
+        :param kwargs: Further MinefieldLogic arguments, such as
+                       region_index.
+        :type kwargs: dict
+        :return: The board, with nothing uncovered.
+        :rtype: MinefieldLogic
+        """
+
+        try:
+            magic, version, flags, rows, cols, seed = (
+                _BOARD_HEADER.unpack_from(data)
+            )
+        except struct.error as error:
+            raise ValueError('the board data is truncated') from error
+
+        if magic != _BOARD_MAGIC or version != _BOARD_VERSION:
+            raise ValueError('the data is not an encoded board')
+        if len(data) != _BOARD_HEADER.size + (rows * cols + 7) // 8:
+            raise ValueError('the board data does not match its size')
+
+        padded = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1] = np.unpackbits(
+            np.frombuffer(data, dtype=np.uint8, offset=_BOARD_HEADER.size),
+            count=rows * cols,
+            bitorder='little'
+        ).reshape(rows, cols)
+        return cls(
+            game_matrix=cls.count_mines(padded),
+            seed=seed if flags & _BOARD_HAS_SEED else None,
+            **kwargs
+        )
+
+    def encode(self) -> str:
+        """
+        Encodes the board as URL-safe base64 text.
+
+        :return: The encoded board.
+        :rtype: str
+        """
+
+        return base64.urlsafe_b64encode(self.to_bytes()).decode('ascii')
+
+    @classmethod
+    def decode(cls, text: str, **kwargs) -> 'MinefieldLogic':
+        """
+        Decodes a board encoded by encode.
+
+        :param text: The encoded board.
+        :type text: str
+        :param kwargs: Further MinefieldLogic arguments, such as
+                       region_index.
+        :type kwargs: dict
+        :return: The board, with nothing uncovered.
+        :rtype: MinefieldLogic
+        """
+
+        try:
+            data = base64.urlsafe_b64decode(text)
+        except ValueError as error:
+            raise ValueError('the text is not an encoded board') from error
+
+        return cls.from_bytes(data, **kwargs)
+
+
+class CompactMinefieldLogic:
+    """
+    Manages the logic for very large custom Minesweeper boards.
+
+    Mines and revealed cells are stored as bit-packed planes and
+    neighbour counts are computed on demand, so a board costs two bits
+    per cell (0.25 bytes/cell, about 25 MB for 10,000 x 10,000 cells).
+    Mine placement runs over bands of BAND_CELLS cells, adding roughly
+    9 bytes per band cell of transient memory while generating. Flags
+    are sparse and kept in the caller's set, as with MinefieldLogic.
+
+    Every band draws from the board's own generator, so the size, mine
+    count and seed are enough to rebuild the board.
+
+    The board serves engine-side uses such as bots and benchmarks; the
+    interface still plays the fixed GameMode sizes on MinefieldLogic.
+
+    Attributes:
+        BAND_CELLS (int): Number of cells generated per band.
+        cols (int): Number of columns in the game grid.
+        rows (int): Number of rows in the game grid.
+        number_of_mines (int): Number of mines to place.
+        seed (int): Seed of the mine placement.
+        mines (np.ndarray): Bit-packed plane of mine positions.
+        revealed (np.ndarray): Bit-packed plane of revealed cells.
+    """
+
+    BAND_CELLS = 1 << 20
+
+    def __init__(
+            self,
+            cols: int = 10,
+            rows: int = 10,
+            number_of_mines: int = 10,
+            seed: Optional[int] = None
+    ):
+        """
+        Initializes the CompactMinefieldLogic with dimensions and mines.
+
+        :param cols: Number of columns in the grid.
+        :type cols: int
+        :param rows: Number of rows in the grid.
+        :type rows: int
+        :param number_of_mines: Number of mines to be placed.
+        :type number_of_mines: int
+        :param seed: Seed of the mine placement, random when not given.
+        :type seed: int, optional
+        :return: None
+        """
+
+        self.cols = cols
+        self.rows = rows
+        self.number_of_mines = number_of_mines
+        self.seed = (
+            seed if seed is not None
+            else int(np.random.SeedSequence().entropy % 2**63)
+        )
+        self._rng: Optional[np.random.Generator] = None
+        packed_cols = (cols + 7) // 8
+        self.mines = np.zeros((rows, packed_cols), dtype=np.uint8)
+        self.revealed = np.zeros((rows, packed_cols), dtype=np.uint8)
+        self.initialize_mines()
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns the number of bytes held by the board planes.
+
+        :return: Size of the mine and revealed planes in bytes.
+        :rtype: int
+        """
+
+        return self.mines.nbytes + self.revealed.nbytes
+
+    @property
+    def rng(self) -> np.random.Generator:
+        """
+        Returns the random generator of the board, seeded on first use.
+
+        :return: Generator seeded with the board seed.
+        :rtype: np.random.Generator
+        """
+
+        if self._rng is None:
+            self._rng = np.random.default_rng(self.seed)
+
+        return self._rng
+
+    def initialize_mines(self) -> None:
+        """
+        Places mines randomly in the bit-packed mine plane.
+
+        The board is filled band by band. The number of mines falling
+        into each band is drawn from a hypergeometric distribution, so
+        the result is a uniform sample over the whole board while only
+        one band is ever held unpacked.
+
+        :return: None
+        """
+
+        band_rows = max(1, self.BAND_CELLS // self.cols)
+        remaining_cells = self.rows * self.cols
+        remaining_mines = self.number_of_mines
+
+        for start in range(0, self.rows, band_rows):
+            stop = min(start + band_rows, self.rows)
+            band_cells = (stop - start) * self.cols
+
+            # Share the remaining mines between this band and the rest
+            if band_cells == remaining_cells:
+                band_mines = remaining_mines
+            elif remaining_mines:
+                band_mines = int(self.rng.hypergeometric(
+                    band_cells,
+                    remaining_cells - band_cells,
+                    remaining_mines
+                ))
+            else:
+                band_mines = 0
+
+            band = np.zeros(band_cells, dtype=bool)
+            band[self.rng.choice(band_cells, band_mines, replace=False)] = 1
+            self.mines[start:stop] = np.packbits(
+                band.reshape(stop - start, self.cols),
+                axis=1
+            )
+            remaining_cells -= band_cells
+            remaining_mines -= band_mines
+
+    @staticmethod
+    def _get_bit(plane: np.ndarray, row: int, col: int) -> int:
+        """
+        Reads a single cell from a bit-packed plane.
+
+        :param plane: The bit-packed plane.
+        :type plane: np.ndarray
+        :param row: Row of the cell.
+        :type row: int
+        :param col: Column of the cell.
+        :type col: int
+        :return: 1 if the bit is set, otherwise 0.
+        :rtype: int
+        """
+
+        return (int(plane[row, col >> 3]) >> (7 - (col & 7))) & 1
+
+    @staticmethod
+    def _set_bit(plane: np.ndarray, row: int, col: int) -> None:
+        """
+        Sets a single cell in a bit-packed plane.
+
+        :param plane: The bit-packed plane.
+        :type plane: np.ndarray
+        :param row: Row of the cell.
+        :type row: int
+        :param col: Column of the cell.
+        :type col: int
+        :return: None
+        """
+
+        plane[row, col >> 3] |= 0x80 >> (col & 7)
+
+    def is_mine(self, position: list | tuple) -> bool:
+        """
+        Checks whether the given position holds a mine.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: True if the cell is a mine, otherwise False.
+        :rtype: bool
+        """
+
+        return bool(self._get_bit(self.mines, *position))
+
+    def is_revealed(self, position: list | tuple) -> bool:
+        """
+        Checks whether the given position has been revealed.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: True if the cell is revealed, otherwise False.
+        :rtype: bool
+        """
+
+        return bool(self._get_bit(self.revealed, *position))
+
+    def get_value(self, position: list | tuple) -> int:
+        """
+        Computes the value of a cell using the MinefieldLogic encoding.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: Neighbouring mines, plus 9 if the cell is a mine.
+        :rtype: int
+        """
+
+        row, col = position
+        value = 8 * self._get_bit(self.mines, row, col)
+        for pos_y in range(max(row - 1, 0), min(row + 2, self.rows)):
+            for pos_x in range(max(col - 1, 0), min(col + 2, self.cols)):
+                value += self._get_bit(self.mines, pos_y, pos_x)
+
+        return value
+
+    def get_values(self, rows: slice, cols: slice) -> np.ndarray:
+        """
+        Computes the values of a rectangular window of the board.
+
+        Only the requested window plus a one-cell border is unpacked,
+        so the cost depends on the window size, not the board size.
+
+        :param rows: Row range of the window.
+        :type rows: slice
+        :param cols: Column range of the window.
+        :type cols: slice
+        :return: Window of values using the MinefieldLogic encoding.
+        :rtype: np.ndarray
+        """
+
+        row_start, row_stop, _ = rows.indices(self.rows)
+        col_start, col_stop, _ = cols.indices(self.cols)
+        height = max(row_stop - row_start, 0)
+        width = max(col_stop - col_start, 0)
+
+        # Unpack the window with a one-cell border, clipped to the board
+        top, bottom = max(row_start - 1, 0), min(row_stop + 1, self.rows)
+        left, right = max(col_start - 1, 0), min(col_stop + 1, self.cols)
+        unpacked = np.unpackbits(
+            self.mines[top:bottom, left >> 3:(right + 7) >> 3],
+            axis=1
+        )[:, left & 7:(left & 7) + right - left]
+
+        padded = np.zeros((height + 2, width + 2), dtype=np.uint8)
+        pad_y, pad_x = row_start - top, col_start - left
+        padded[
+            1 - pad_y:1 - pad_y + bottom - top,
+            1 - pad_x:1 - pad_x + right - left
+        ] = unpacked
+
+        values = neighbour_sum(padded)
+        values += padded[1:-1, 1:-1] * np.uint8(8)
+        return values
+
+    def validate_flags(self, flags: set) -> bool:
+        """
+        Checks if flagged positions match the mine locations.
+
+        :param flags: Set of flagged positions.
+        :type flags: set
+        :return: True if flags match mine positions, otherwise False.
+        :rtype: bool
+        """
+
+        return sum(map(self.is_mine, flags)) == self.number_of_mines
+
+    def get_connected_component(self, position: list | tuple) -> np.ndarray:
+        """
+        Retrieves the connected component of a given position.
+
+        A zero cell yields its zero region together with the numbered
+        cells bordering it; any other cell yields only itself.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: Array of connected component positions.
+        :rtype: np.ndarray
+        """
+
+        visited = set()
+        cells = _flood_fill(
+            tuple(position),
+            (0, 0, self.rows, self.cols),
+            self.get_value,
+            visited.__contains__,
+            visited.add
+        )
+        return np.array(cells, dtype=np.intp).reshape(-1, 2)
+
+    def reveal(self, position: list | tuple) -> List[tuple]:
+        """
+        Reveals a cell, flooding through connected zero cells.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: Newly revealed positions in the order they were reached.
+        :rtype: List[tuple]
+        """
+
+        return _flood_fill(
+            tuple(position),
+            (0, 0, self.rows, self.cols),
+            self.get_value,
+            self.is_revealed,
+            lambda pos: self._set_bit(self.revealed, *pos)
+        )
+
+    def reveal_all(self) -> None:
+        """
+        Marks every cell of the board as revealed.
+
+        :return: None
+        """
+
+        self.revealed[:] = 0xFF
+
+
+class ChunkedMinefieldLogic:
+    """
+    Manages the logic for a lazily generated, chunked Minesweeper board.
+
+    The board is split into CHUNK_SIZE x CHUNK_SIZE chunks whose mines
+    are derived from the board seed and the chunk coordinates, so a
+    chunk is only generated once a reveal or flood fill reaches it and
+    construction cost does not depend on the board size.
+
+    A bounded board holds exactly number_of_mines mines: the count of
+    every chunk is found by splitting the total along a binary tree
+    over the chunks with seeded hypergeometric draws. An endless board
+    (no cols/rows) extends in every direction and places each mine
+    independently with the given density.
+
+    Attributes:
+        CHUNK_SIZE (int): Width and height of a chunk in cells.
+        MAX_ENDLESS_REVEAL (int): Cells revealed at most per click on
+                                  an endless board; zero cells left
+                                  unopened stay covered.
+        cols (int | None): Number of columns, None when endless.
+        rows (int | None): Number of rows, None when endless.
+        number_of_mines (int | None): Number of mines, None when endless.
+        density (float): Mine probability per cell when endless.
+        seed (int): Seed from which every chunk is derived.
+    """
+
+    CHUNK_SIZE = 32
+    MAX_ENDLESS_REVEAL = 1 << 16
+
+    def __init__(
+            self,
+            cols: Optional[int] = None,
+            rows: Optional[int] = None,
+            number_of_mines: Optional[int] = None,
+            density: float = 0.2,
+            seed: Optional[int] = None
+    ):
+        """
+        Initializes the ChunkedMinefieldLogic without generating chunks.
+
+        :param cols: Number of columns, None for an endless board.
+        :type cols: int, optional
+        :param rows: Number of rows, None for an endless board.
+        :type rows: int, optional
+        :param number_of_mines: Number of mines on a bounded board.
+        :type number_of_mines: int, optional
+        :param density: Mine probability per cell on an endless board.
+        :type density: float
+        :param seed: Seed of the board, random when not given.
+        :type seed: int, optional
+        :return: None
+        """
+
+        self.cols = cols
+        self.rows = rows
+        self.number_of_mines = number_of_mines
+        self.density = density
+        self.seed = (
+            seed if seed is not None
+            else int(np.random.SeedSequence().entropy % 2**63)
+        )
+        self.is_endless = cols is None or rows is None
+        self.bounds = (
+            (-math.inf, -math.inf, math.inf, math.inf)
+            if self.is_endless
+            else (0, 0, rows, cols)
+        )
+        if not self.is_endless:
+            self.chunks_x = -(-cols // self.CHUNK_SIZE)
+            self.chunks_y = -(-rows // self.CHUNK_SIZE)
+
+        self._mines = {}
+        self._values = {}
+        self._revealed = {}
+        self._empty_chunk = np.zeros(
+            (self.CHUNK_SIZE, self.CHUNK_SIZE),
+            dtype=bool
+        )
+
+    @property
+    def generated_chunks(self) -> int:
+        """
+        Returns the number of chunks generated so far.
+
+        :return: Number of generated chunks.
+        :rtype: int
+        """
+
+        return len(self._mines)
+
+    def _chunk_rng(self, *key: int) -> np.random.Generator:
+        """
+        Creates a random generator derived from the seed and a key.
+
+        Negative key values are folded onto the non-negative integers
+        so endless boards can use negative chunk coordinates.
+
+        :param key: Integers identifying what is being generated.
+        :type key: int
+        :return: Deterministic random generator for the key.
+        :rtype: np.random.Generator
+        """
+
+        entropy = [self.seed] + [2 * k if k >= 0 else -2 * k - 1 for k in key]
+        return np.random.default_rng(entropy)
+
+    def _range_cells(self, start: int, stop: int) -> int:
+        """
+        Counts the board cells in a range of row-major chunk indices.
+
+        :param start: First chunk index of the range.
+        :type start: int
+        :param stop: Chunk index after the end of the range.
+        :type stop: int
+        :return: Number of board cells covered by the range.
+        :rtype: int
+        """
+
+        def prefix(index: int) -> int:
+            chunk_y, chunk_x = divmod(index, self.chunks_x)
+            top = min(chunk_y * self.CHUNK_SIZE, self.rows)
+            height = min(self.CHUNK_SIZE, self.rows - top)
+            width = min(chunk_x * self.CHUNK_SIZE, self.cols)
+            return top * self.cols + height * width
+
+        return prefix(stop) - prefix(start)
+
+    def _chunk_mine_count(self, chunk: tuple) -> int:
+        """
+        Finds how many of the board's mines fall into a chunk.
+
+        :param chunk: Chunk coordinates (chunk_y, chunk_x).
+        :type chunk: tuple
+        :return: Number of mines in the chunk.
+        :rtype: int
+        """
+
+        index = chunk[0] * self.chunks_x + chunk[1]
+        start, stop = 0, self.chunks_x * self.chunks_y
+        count = self.number_of_mines
+
+        # Walk down the split tree, drawing the left share at each node
+        while stop - start > 1 and count:
+            middle = (start + stop) // 2
+            left_count = int(self._chunk_rng(0, start, stop).hypergeometric(
+                self._range_cells(start, middle),
+                self._range_cells(middle, stop),
+                count
+            ))
+            if index < middle:
+                stop, count = middle, left_count
+            else:
+                start, count = middle, count - left_count
+
+        return count
+
+    def _chunk_mines(self, chunk: tuple) -> np.ndarray:
+        """
+        Returns the mine plane of a chunk, generating it if needed.
+
+        :param chunk: Chunk coordinates (chunk_y, chunk_x).
+        :type chunk: tuple
+        :return: Boolean plane of the chunk's mines.
+        :rtype: np.ndarray
+        """
+
+        mines = self._mines.get(chunk)
+        if mines is not None:
+            return mines
+
+        size = self.CHUNK_SIZE
+        rng = self._chunk_rng(1, *chunk)
+        if self.is_endless:
+            mines = rng.random((size, size)) < self.density
+        elif 0 <= chunk[0] < self.chunks_y and 0 <= chunk[1] < self.chunks_x:
+            height = min(size, self.rows - chunk[0] * size)
+            width = min(size, self.cols - chunk[1] * size)
+            cells = rng.choice(
+                height * width,
+                self._chunk_mine_count(chunk),
+                replace=False
+            )
+            mines = np.zeros((size, size), dtype=bool)
+            mines[cells // width, cells % width] = True
+        else:
+            return self._empty_chunk  # Outside a bounded board
+
+        self._mines[chunk] = mines
+        return mines
+
+    def _chunk_values(self, chunk: tuple) -> np.ndarray:
+        """
+        Returns the values of a chunk, computing them if needed.
+
+        :param chunk: Chunk coordinates (chunk_y, chunk_x).
+        :type chunk: tuple
+        :return: Chunk values using the MinefieldLogic encoding.
+        :rtype: np.ndarray
+        """
+
+        values = self._values.get(chunk)
+        if values is not None:
+            return values
+
+        size = self.CHUNK_SIZE
+        chunk_y, chunk_x = chunk
+        mines = np.block([
+            [
+                self._chunk_mines((chunk_y + offset_y, chunk_x + offset_x))
+                for offset_x in (-1, 0, 1)
+            ]
+            for offset_y in (-1, 0, 1)
+        ]).astype(np.uint8)[size - 1:2 * size + 1, size - 1:2 * size + 1]
+
+        values = neighbour_sum(mines)
+        values += mines[1:-1, 1:-1] * np.uint8(8)
+        self._values[chunk] = values
+        return values
+
+    def is_mine(self, position: list | tuple) -> bool:
+        """
+        Checks whether the given position holds a mine.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: True if the cell is a mine, otherwise False.
+        :rtype: bool
+        """
+
+        chunk_y, pos_y = divmod(position[0], self.CHUNK_SIZE)
+        chunk_x, pos_x = divmod(position[1], self.CHUNK_SIZE)
+        return bool(self._chunk_mines((chunk_y, chunk_x))[pos_y, pos_x])
+
+    def get_value(self, position: list | tuple) -> int:
+        """
+        Returns the value of a cell using the MinefieldLogic encoding.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: Neighbouring mines, plus 9 if the cell is a mine.
+        :rtype: int
+        """
+
+        chunk_y, pos_y = divmod(position[0], self.CHUNK_SIZE)
+        chunk_x, pos_x = divmod(position[1], self.CHUNK_SIZE)
+        return int(self._chunk_values((chunk_y, chunk_x))[pos_y, pos_x])
+
+    def is_revealed(self, position: list | tuple) -> bool:
+        """
+        Checks whether the given position has been revealed.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: True if the cell is revealed, otherwise False.
+        :rtype: bool
+        """
+
+        chunk_y, pos_y = divmod(position[0], self.CHUNK_SIZE)
+        chunk_x, pos_x = divmod(position[1], self.CHUNK_SIZE)
+        revealed = self._revealed.get((chunk_y, chunk_x))
+        return revealed is not None and bool(revealed[pos_y, pos_x])
+
+    def _mark_revealed(self, position: tuple) -> None:
+        """
+        Marks the given position as revealed.
+
+        :param position: Coordinates of the position.
+        :type position: tuple
+        :return: None
+        """
+
+        chunk_y, pos_y = divmod(position[0], self.CHUNK_SIZE)
+        chunk_x, pos_x = divmod(position[1], self.CHUNK_SIZE)
+        revealed = self._revealed.get((chunk_y, chunk_x))
+        if revealed is None:
+            revealed = self._revealed[chunk_y, chunk_x] = np.zeros_like(
+                self._empty_chunk
+            )
+        revealed[pos_y, pos_x] = True
+
+    def _mark_covered(self, position: tuple) -> None:
+        """
+        Marks the given position as covered again.
+
+        :param position: Coordinates of the position.
+        :type position: tuple
+        :return: None
+        """
+
+        chunk_y, pos_y = divmod(position[0], self.CHUNK_SIZE)
+        chunk_x, pos_x = divmod(position[1], self.CHUNK_SIZE)
+        self._revealed[chunk_y, chunk_x][pos_y, pos_x] = False
+
+    def validate_flags(self, flags: set) -> bool:
+        """
+        Checks if flagged positions match the mine locations.
+
+        On an endless board only the chunks generated so far can be
+        checked, so every mine in them has to be flagged.
+
+        :param flags: Set of flagged positions.
+        :type flags: set
+        :return: True if flags match mine positions, otherwise False.
+        :rtype: bool
+        """
+
+        if not self.is_endless:
+            return sum(map(self.is_mine, flags)) == self.number_of_mines
+
+        size = self.CHUNK_SIZE
+        for (chunk_y, chunk_x), mines in list(self._mines.items()):
+            for pos_y, pos_x in np.argwhere(mines).tolist():
+                position = (chunk_y * size + pos_y, chunk_x * size + pos_x)
+                if position not in flags:
+                    return False
+
+        return True
+
+    def get_connected_component(self, position: list | tuple) -> np.ndarray:
+        """
+        Retrieves the connected component of a given position.
+
+        A zero cell yields its zero region together with the numbered
+        cells bordering it; any other cell yields only itself.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: Array of connected component positions.
+        :rtype: np.ndarray
+        """
+
+        visited = set()
+        cells = _flood_fill(
+            tuple(position),
+            self.bounds,
+            self.get_value,
+            visited.__contains__,
+            visited.add,
+            self.MAX_ENDLESS_REVEAL if self.is_endless else None,
+            visited.discard
+        )
+        return np.array(cells, dtype=np.intp).reshape(-1, 2)
+
+    def reveal(self, position: list | tuple) -> List[tuple]:
+        """
+        Reveals a cell, flooding through connected zero cells.
+
+        :param position: Coordinates of the position.
+        :type position: list or tuple
+        :return: Newly revealed positions in the order they were reached.
+        :rtype: List[tuple]
+        """
+
+        return _flood_fill(
+            tuple(position),
+            self.bounds,
+            self.get_value,
+            self.is_revealed,
+            self._mark_revealed,
+            self.MAX_ENDLESS_REVEAL if self.is_endless else None,
+            self._mark_covered
+        )
+
+    def reveal_all(self) -> None:
+        """
+        Marks every cell of the board as revealed.
+
+        On an endless board only the chunks generated so far are
+        revealed.
+
+        :return: None
+        """
+
+        chunks = (
+            list(self._mines)
+            if self.is_endless
+            else [
+                (chunk_y, chunk_x)
+                for chunk_y in range(self.chunks_y)
+                for chunk_x in range(self.chunks_x)
+            ]
+        )
+        for chunk in chunks:
+            self._revealed[chunk] = np.ones_like(self._empty_chunk)
+
+
+class GameSession:
+    """
+    Plays a Minesweeper game on a minefield without any user interface.
+
+    The session applies the game rules on top of a MinefieldLogic board
+    (or any board sharing its interface): uncovering cells, placing and
+    removing flags, chording around numbers, and deciding when the game
+    is won or lost. User interfaces, bots and servers drive it and read
+    the outcome of every move from the returned cells and `state`.
+
+    The game is won when every mine is flagged or every safe cell is
+    uncovered. Both are decided from two counters updated by each move,
+    correct flags and covered safe cells, rather than by scanning the
+    board.
+
+    Chording is computed in one vectorized step on boards that offer
+    `chord_targets` and `reveal_many`, for which the session also keeps
+    the flags as a boolean plane; other boards chord cell by cell.
+
+    Attributes:
+        game (MinefieldLogic): The board being played.
+        placed_flags (set): Positions of the placed flags.
+        flagged (np.ndarray | None): Boolean plane of the placed flags,
+                                     on boards that chord vectorized.
+    """
+
+    def __init__(
+            self,
+            cols: int = 10,
+            rows: int = 10,
+            number_of_mines: int = 10,
+            game: Optional[MinefieldLogic] = None,
+            seed: Optional[int] = None
+    ):
+        """
+        Initializes the GameSession with a new or existing board.
+
+        :param cols: Number of columns in the grid.
+        :type cols: int
+        :param rows: Number of rows in the grid.
+        :type rows: int
+        :param number_of_mines: Number of mines to be placed.
+        :type number_of_mines: int
+        :param game: Board to play on instead of generating one.
+        :type game: MinefieldLogic, optional
+        :param seed: Seed of the generated board.
+        :type seed: int, optional
+        :return: None
+        """
+
+        self.game = game if game is not None else MinefieldLogic(
+            cols=cols,
+            rows=rows,
+            number_of_mines=number_of_mines,
+            seed=seed
+        )
+        self.placed_flags = set()
+        self.flagged = (
+            np.zeros((self.game.rows, self.game.cols), dtype=bool)
+            if hasattr(self.game, 'chord_targets') else None
+        )
+        self._state = GameState.READY
+        self._correct_flags = 0
+        self._covered_safe = (
+            None if self.game.number_of_mines is None
+            else self.game.rows * self.game.cols - self.game.number_of_mines
+        )
+
+    @property
+    def remaining_flags(self) -> Optional[int]:
+        """
+        Returns the number of flags left to place.
+
+        :return: Remaining flags, or None on an endless board.
+        :rtype: int or None
+        """
+
+        if self.game.number_of_mines is None:
+            return None
+
+        return self.game.number_of_mines - len(self.placed_flags)
+
+    @property
+    def covered_safe(self) -> Optional[int]:
+        """
+        Returns the number of safe cells still covered.
+
+        :return: Covered safe cells, or None on an endless board.
+        :rtype: int or None
+        """
+
+        return self._covered_safe
+
+    @property
+    def state(self) -> GameState:
+        """
+        Returns the current state of the game.
+
+        :return: The state of the game.
+        :rtype: GameState
+        """
+
+        return self._state
+
+    @property
+    def is_over(self) -> bool:
+        """
+        Checks whether the game has been won or lost.
+
+        :return: True if the game is over, otherwise False.
+        :rtype: bool
+        """
+
+        return self._state in (GameState.WON, GameState.LOST)
+
+    def start(self) -> None:
+        """
+        Starts the game if no move has been made yet.
+
+        :return: None
+        """
+
+        if self._state is GameState.READY:
+            self._state = GameState.PLAYING
+
+    def reveal(self, position: list | tuple) -> List[tuple]:
+        """
+        Uncovers a cell, flooding through connected zero cells.
+
+        Uncovering a mine loses the game and uncovering the last safe
+        cell wins it. Flags on uncovered cells are removed and returned
+        to the flag count. A deferred board places its mines first,
+        away from the cell, and counts the flags already placed.
+
+        :param position: Coordinates of the cell.
+        :type position: list or tuple
+        :return: Newly revealed positions.
+        :rtype: List[tuple]
+        """
+
+        position = tuple(position)
+        if self.is_over or self.game.is_revealed(position):
+            return []
+
+        self.start()
+        if not getattr(self.game, 'mines_placed', True):
+            self.game.initialize_mines(exclude=position)
+            self._correct_flags = sum(
+                self.game.get_value(flag) >= 9 for flag in self.placed_flags
+            )
+
+        if self.game.get_value(position) >= 9:  # Mine uncovered, game over
+            self._finish(won=False)
+            return [position]
+
+        cells = self.game.reveal(position)
+        self._uncovered(cells)
+        return cells
+
+    def toggle_flag(self, position: list | tuple) -> bool:
+        """
+        Places or removes a flag on a covered cell.
+
+        Flagging the last unflagged mine wins the game. Flags are capped
+        at the number of mines, so every flag is then correct.
+
+        :param position: Coordinates of the cell.
+        :type position: list or tuple
+        :return: True if a flag was placed or removed, otherwise False.
+        :rtype: bool
+        """
+
+        position = tuple(position)
+        if self.is_over:
+            return False
+
+        self.start()
+        if self.game.is_revealed(position):
+            return False
+
+        remaining = self.remaining_flags
+        if position in self.placed_flags:
+            self.placed_flags.remove(position)
+            change = -1
+        elif remaining is None or remaining > 0:
+            self.placed_flags.add(position)
+            change = 1
+        else:
+            return False
+
+        if self.flagged is not None:
+            self.flagged[position] = change > 0
+
+        if self.game.get_value(position) >= 9:
+            self._correct_flags += change
+            if self._correct_flags == self.game.number_of_mines:
+                self._finish(won=True)
+
+        return True
+
+    def chord(self, position: list | tuple) -> List[tuple]:
+        """
+        Uncovers the neighbours of a number whose mines are all flagged.
+
+        Chording an uncovered number with as many flagged neighbours as
+        its value uncovers every other covered neighbour, cascading
+        through zero cells; a wrongly placed flag loses the game.
+
+        :param position: Coordinates of an uncovered number.
+        :type position: list or tuple
+        :return: Newly revealed positions.
+        :rtype: List[tuple]
+        """
+
+        if self.flagged is not None:
+            return self.chord_many([position])
+
+        row, col = position = tuple(position)
+        if (
+                self._state is not GameState.PLAYING
+                or not self.game.is_revealed(position)
+                or not 0 < self.game.get_value(position) < 9
+        ):
+            return []
+
+        neighbours = [
+            (pos_y, pos_x)
+            for pos_y in range(max(row - 1, 0), min(row + 2, self.game.rows))
+            for pos_x in range(max(col - 1, 0), min(col + 2, self.game.cols))
+            if (pos_y, pos_x) != position
+        ]
+        flags = sum(cell in self.placed_flags for cell in neighbours)
+        if flags != self.game.get_value(position):
+            return []
+
+        cells = []
+        for neighbour in neighbours:
+            if neighbour in self.placed_flags or self.game.is_revealed(
+                    neighbour):
+                continue
+
+            if self.game.get_value(neighbour) >= 9:  # Wrong flag, game over
+                self._finish(won=False)
+                return cells + [neighbour]
+
+            cells += self.game.reveal(neighbour)
+
+        self._uncovered(cells)
+        return cells
+
+    def chord_many(self, positions: List[tuple]) -> List[tuple]:
+        """
+        Chords around many numbers at once, as a single move.
+
+        The satisfied numbers among the positions and their covered
+        neighbours are found with one vectorized pass, and the union of
+        their cascades is revealed at once. If any of those neighbours
+        is a mine, the game is lost and nothing else is uncovered.
+        Boards without vectorized chording chord the positions in turn.
+
+        :param positions: Coordinates of uncovered numbers.
+        :type positions: List[tuple]
+        :return: Newly revealed positions, or the mines hit.
+        :rtype: List[tuple]
+        """
+
+        if self.flagged is None:
+            cells = []
+            for position in positions:
+                cells += self.chord(position)
+            return cells
+
+        if self._state is not GameState.PLAYING:
+            return []
+
+        targets = self.game.chord_targets(
+            [tuple(position) for position in positions],
+            self.flagged
+        )
+        mines = targets[self.game.game_matrix.reshape(-1)[targets] >= 9]
+        if len(mines):  # Wrong flag, game over
+            self._finish(won=False)
+            return [divmod(int(mine), self.game.cols) for mine in mines]
+
+        cells = self.game.reveal_many(targets)
+        self._uncovered(cells)
+        return cells
+
+    def _uncovered(self, cells: List[tuple]) -> None:
+        """
+        Counts newly revealed safe cells and removes their flags.
+
+        The game is won once no safe cell is left covered. Revealed
+        cells are never mines, so the correct flags are unchanged.
+
+        :param cells: Newly revealed positions.
+        :type cells: List[tuple]
+        :return: None
+        """
+
+        if self.placed_flags:
+            cleared = self.placed_flags.intersection(cells)
+            self.placed_flags.difference_update(cleared)
+            if self.flagged is not None:
+                for cell in cleared:
+                    self.flagged[cell] = False
+
+        if self._covered_safe is not None:
+            self._covered_safe -= len(cells)
+            if not self._covered_safe:
+                self._finish(won=True)
+
+    def _finish(self, won: bool) -> None:
+        """
+        Ends the game, uncovering the whole board.
+
+        :param won: Whether the game was won.
+        :type won: bool
+        :return: None
+        """
+
+        self._state = GameState.WON if won else GameState.LOST
+        self.game.reveal_all()
+
+
+class BoardState:
+    """
+    Flat per-cell state of a MinefieldLogic board for the interfaces.
+
+    Cells are addressed by their flat row-major index, so renderers
+    read a cell with one array lookup instead of building position
+    tuples. The value and revealed planes are flat views of the
+    board's own arrays, not copies, and stay current as it is played.
+    The flagged plane mirrors the flags of the session, kept up to date
+    by whoever toggles them.
+
+    Attributes:
+        cols (int): Number of columns in the game grid.
+        values (np.ndarray): uint8 cell values, 9 + neighbours for mines.
+        revealed (np.ndarray): Boolean plane of revealed cells.
+        flagged (np.ndarray): Boolean plane of flagged cells.
+    """
+
+    __slots__ = ('cols', 'values', 'revealed', 'flagged')
+
+    def __init__(self, game: MinefieldLogic):
+        """
+        Initializes the BoardState over the planes of a board.
+
+        :param game: The board to expose.
+        :type game: MinefieldLogic
+        :return: None
+        """
+
+        self.cols = game.cols
+        self.values = game.game_matrix.reshape(-1)
+        self.revealed = game.revealed.reshape(-1)
+        self.flagged = np.zeros(self.values.size, dtype=bool)
+
+    def indices(self, positions: List[tuple]) -> List[int]:
+        """
+        Converts revealed positions into flat indices.
+
+        :param positions: Positions as returned by GameSession.
+        :type positions: List[tuple]
+        :return: Flat indices of the positions.
+        :rtype: List[int]
+        """
+
+        cols = self.cols
+        return [row * cols + col for row, col in positions]
+
+    def clear_flags(self, indices: List[int]) -> None:
+        """
+        Drops the flags of cells that were revealed.
+
+        :param indices: Flat indices of the revealed cells.
+        :type indices: List[int]
+        :return: None
+        """
+
+        self.flagged[indices] = False
+
+
+def neighbour_sum(padded: np.ndarray) -> np.ndarray:
+    """
+    Sums the 3x3 neighbourhood of every cell of a padded plane.
+
+    The plane carries a one-cell border around the cells of interest,
+    so the result is two cells smaller in each dimension and every sum
+    includes the cell itself. Sums are built from the nine shifted
+    views of the plane without any Python loop over the cells. Leading
+    dimensions are treated as a batch of planes.
+
+    :param padded: Plane of 0/1 values with a one-cell border.
+    :type padded: np.ndarray
+    :return: Neighbourhood sums of the inner cells.
+    :rtype: np.ndarray
+    """
+
+    *batch, height, width = padded.shape
+    height, width = height - 2, width - 2
+    sums = np.zeros((*batch, height, width), dtype=np.uint8)
+    for offset_y in range(3):
+        for offset_x in range(3):
+            sums += padded[
+                ...,
+                offset_y:offset_y + height,
+                offset_x:offset_x + width
+            ]
+
+    return sums
+
+
+def label_regions(plane: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Labels the 8-connected regions of a boolean plane.
+
+    The plane is split into horizontal runs of set cells, and runs on
+    adjacent rows are linked when they touch, diagonals included. The
+    linked runs are merged by hooking every larger root onto the
+    smaller one and jumping pointers until each run points at its
+    root, all with whole-array operations. The root of a region is its
+    first run in scan order, so labels are numbered from 1 in the same
+    order as scipy.ndimage.label with a 3x3 structure.
+
+    :param plane: Boolean plane to label.
+    :type plane: np.ndarray
+    :return: Region labels (0 outside regions) and the region count.
+    :rtype: Tuple[np.ndarray, int]
+    """
+
+    rows, cols = plane.shape
+    width = cols + 1
+
+    # A clear column after every row keeps runs from wrapping
+    padded = np.zeros((rows, width), dtype=bool)
+    padded[:, :cols] = plane
+    flat = padded.reshape(-1)
+    changes = np.flatnonzero(np.diff(flat, prepend=False))
+    starts, stops = changes[::2], changes[1::2]
+    runs = len(starts)
+
+    # Link each run to the runs of the row above within one column
+    first = np.searchsorted(stops, starts - width, 'left')
+    last = np.searchsorted(starts, stops - width, 'right')
+    counts = np.maximum(last - first, 0)
+    run_ids = np.repeat(np.arange(runs), counts)
+    above = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(
+        len(run_ids)
+    )
+
+    parent = np.arange(runs)
+    while True:
+        root, root_above = parent[run_ids], parent[above]
+        merge = root != root_above
+        if not merge.any():
+            break
+
+        np.minimum.at(
+            parent,
+            np.maximum(root, root_above)[merge],
+            np.minimum(root, root_above)[merge]
+        )
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    # Number the roots in scan order and paint the runs and the gaps
+    ranks = np.cumsum(parent == np.arange(runs), dtype=np.int32)
+    values = np.zeros(2 * runs + 1, dtype=np.int32)
+    values[1::2] = ranks[parent]
+    lengths = np.empty(2 * runs + 1, dtype=np.intp)
+    lengths[0:-1:2] = starts - np.concatenate(([0], stops[:-1]))
+    lengths[1::2] = stops - starts
+    lengths[-1] = flat.size - (stops[-1] if runs else 0)
+    labels = np.repeat(values, lengths).reshape(rows, width)[:, :cols]
+    return labels, int(ranks[-1]) if runs else 0
+
+
+def _flood_fill(
+        position: tuple,
+        bounds: Tuple[float, float, float, float],
+        get_value: Callable,
+        is_visited: Callable,
+        mark_visited: Callable,
+        limit: Optional[int] = None,
+        unmark_visited: Optional[Callable] = None
+) -> List[tuple]:
+    """
+    Breadth-first flood fill from a cell through connected zero cells.
+
+    Every reached cell is marked as visited; zero cells also expand to
+    their eight neighbours. The cost depends on the number of cells
+    reached, not on the size of the board, and infinite bounds are
+    allowed for endless boards.
+
+    A fill stopped by the limit unmarks the zero cells it reached but
+    did not expand yet, so a later fill from one of them carries on
+    where this one stopped.
+
+    :param position: Coordinates of the starting cell.
+    :type position: tuple
+    :param bounds: Board limits (top, left, bottom, right), where the
+                   bottom and right limits are exclusive.
+    :type bounds: Tuple[float, float, float, float]
+    :param get_value: Returns the value of a cell.
+    :type get_value: Callable
+    :param is_visited: Returns True if a cell was already visited.
+    :type is_visited: Callable
+    :param mark_visited: Marks a cell as visited.
+    :type mark_visited: Callable
+    :param limit: Stop expanding once this many cells were reached.
+    :type limit: int, optional
+    :param unmark_visited: Unmarks a cell, required with a limit.
+    :type unmark_visited: Callable, optional
+    :return: Newly visited positions in breadth-first order.
+    :rtype: List[tuple]
+    """
+
+    if is_visited(position):
+        return []
+
+    top, left, bottom, right = bounds
+    mark_visited(position)
+    cells = [position]
+    queue = deque([position] if not get_value(position) else [])
+
+    while queue and (limit is None or len(cells) < limit):
+        row, col = queue.popleft()
+        for pos_y in range(max(row - 1, top), min(row + 2, bottom)):
+            for pos_x in range(max(col - 1, left), min(col + 2, right)):
+                neighbour = (pos_y, pos_x)
+                if is_visited(neighbour):
+                    continue
+
+                mark_visited(neighbour)
+                cells.append(neighbour)
+                if not get_value(neighbour):
+                    queue.append(neighbour)
+
+    if queue:  # Stopped by the limit, leave the frontier to expand
+        frontier = set(queue)
+        for cell in frontier:
+            unmark_visited(cell)
+        cells = [cell for cell in cells if cell not in frontier]
+
+    return cells
@@ -0,0 +1,516 @@
+"""
+This module keeps the times of won games in a local SQLite database
+and answers leaderboard queries from its indexes.
+
+Every result is a row of player, game mode, time in milliseconds and
+finish date. An index on (game_mode, time_ms) returns the fastest
+results of a mode in order, and an index on (player, game_mode,
+time_ms) finds a player's best time with a single seek.
+
+A player's rank is one plus the number of faster results, which a
+plain COUNT would find by stepping through every faster entry of the
+index. A trigger therefore keeps the number of results of each mode
+per second of play in `time_buckets`, so the rank adds up at most one
+bucket per second of the player's best time and only counts the
+results of that player's own second one by one.
+
+The database runs in WAL mode with `synchronous=NORMAL`, so commits
+append to the log without waiting for the disk, and results are
+inserted in batches, one transaction per batch.
+
+Games save their results through a `ResultWriter`, which writes from a
+worker thread with its own connection, so the event loop never waits
+for the disk. WAL lets the interface read standings meanwhile. Every
+session waits for its results when it exits, and the process closes
+the shared writer once at shutdown.
+
+Classes:
+    Leaderboard: Stores results and ranks players per game mode.
+    ResultWriter: Writes results to a leaderboard from a worker thread.
+
+Functions:
+    mode_name: Names the leaderboard of a difficulty and board type.
+    leaderboard: Returns the Leaderboard shared by the process.
+    result_writer: Returns the ResultWriter shared by the process.
+    format_time: Formats milliseconds as minutes, seconds and
+                 milliseconds.
+
+Usage:
+    with Leaderboard('results.db') as board:
+        board.add('Ada', 'Hard', 81250)
+        top, rank, best = board.standings('Hard', 'Ada')
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+
+LEADERBOARD_PATH = os.environ.get(
+    'MINESWEEPER_LEADERBOARD',
+    os.path.join(os.path.expanduser('~'), '.minesweeper', 'leaderboard.db')
+)
+
+# Width of a time bucket; the rank counts at most one bucket row by row
+BUCKET_MS = 1000
+
+# Seconds the process shutdown waits at most for queued results
+EXIT_CLOSE_TIMEOUT = 5.0
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    game_mode TEXT NOT NULL,
+    time_ms INTEGER NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_mode_time
+    ON results (game_mode, time_ms);
+CREATE INDEX IF NOT EXISTS results_player
+    ON results (player, game_mode, time_ms);
+CREATE TABLE IF NOT EXISTS time_buckets (
+    game_mode TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    results INTEGER NOT NULL,
+    PRIMARY KEY (game_mode, bucket)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS count_result AFTER INSERT ON results
+BEGIN
+    INSERT INTO time_buckets
+        VALUES (NEW.game_mode, NEW.time_ms / {BUCKET_MS}, 1)
+        ON CONFLICT DO UPDATE SET results = results + 1;
+END;
+"""
+
+_INSERT = (
+    'INSERT INTO results (player, game_mode, time_ms, finished_at) '
+    'VALUES (?, ?, ?, ?)'
+)
+
+# The top results of a mode, then one row with the player's best time
+# and rank; every part is a search of an index
+_STANDINGS = f"""
+WITH best AS (
+    SELECT MIN(time_ms) AS time_ms FROM results
+    WHERE player = :player AND game_mode = :mode
+)
+SELECT player, time_ms, NULL FROM (
+    SELECT player, time_ms FROM results
+    WHERE game_mode = :mode
+    ORDER BY time_ms
+    LIMIT :limit
+)
+UNION ALL
+SELECT :player, best.time_ms, 1 + (
+    SELECT COALESCE(SUM(results), 0) FROM time_buckets
+    WHERE game_mode = :mode AND bucket < best.time_ms / {BUCKET_MS}
+) + (
+    SELECT COUNT(*) FROM results
+    WHERE game_mode = :mode
+        AND time_ms >= best.time_ms / {BUCKET_MS} * {BUCKET_MS}
+        AND time_ms < best.time_ms
+)
+FROM best
+WHERE best.time_ms IS NOT NULL
+"""
+
+
+def mode_name(difficulty: str, no_guess: bool = False) -> str:
+    """
+    Names the leaderboard of a difficulty and board type.
+
+    :param difficulty: The difficulty, such as 'Hard'.
+    :type difficulty: str
+    :param no_guess: Whether the boards are no-guess boards.
+    :type no_guess: bool
+    :return: The game mode stored with the results.
+    :rtype: str
+    """
+
+    return f'{difficulty} No guess' if no_guess else difficulty
+
+
+def format_time(time_ms: int) -> str:
+    """
+    Formats milliseconds as minutes, seconds and milliseconds.
+
+    :param time_ms: The time in milliseconds.
+    :type time_ms: int
+    :return: The time as 'MM:SS.mmm'.
+    :rtype: str
+    """
+
+    seconds, milliseconds = divmod(time_ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    return f'{minutes:02}:{seconds:02}.{milliseconds:03}'
+
+
+class Leaderboard:
+    """
+    Stores the times of won games and ranks players per game mode.
+
+    Added results are held until `batch_size` of them are pending and
+    then inserted in one transaction. Queries and `close` insert the
+    pending results first.
+
+    Attributes:
+        path (str): Path of the database file.
+        batch_size (int): Pending results that trigger an insert.
+    """
+
+    def __init__(self, path: Optional[str] = None, batch_size: int = 64):
+        """
+        Initializes the Leaderboard, creating the database if needed.
+
+        :param path: Path of the database, LEADERBOARD_PATH by default.
+        :type path: str, optional
+        :param batch_size: Pending results that trigger an insert.
+        :type batch_size: int
+        :return: None
+        """
+
+        self.path = path or LEADERBOARD_PATH
+        self.batch_size = batch_size
+        self._pending: List[Tuple[str, str, int, float]] = []
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(self.path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(_SCHEMA)
+
+    def add(
+            self,
+            player: str,
+            game_mode: str,
+            time_ms: int,
+            finished_at: Optional[float] = None
+    ) -> None:
+        """
+        Adds the result of a won game.
+
+        :param player: Name of the player.
+        :type player: str
+        :param game_mode: The game mode, as named by mode_name.
+        :type game_mode: str
+        :param time_ms: Time taken to win, in milliseconds.
+        :type time_ms: int
+        :param finished_at: Unix time the game ended, now by default.
+        :type finished_at: float, optional
+        :return: None
+        """
+
+        self._pending.append((
+            player,
+            game_mode,
+            int(time_ms),
+            time.time() if finished_at is None else finished_at
+        ))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def add_many(
+            self,
+            results: Iterable[Tuple[str, str, int, float]]
+    ) -> None:
+        """
+        Inserts many results in one transaction.
+
+        :param results: Tuples of player, game mode, time in
+                        milliseconds and finish time.
+        :type results: Iterable[Tuple[str, str, int, float]]
+        :return: None
+        """
+
+        with self._db:
+            self._db.executemany(_INSERT, results)
+
+    def flush(self) -> None:
+        """
+        Inserts the pending results.
+
+        :return: None
+        """
+
+        if self._pending:
+            pending, self._pending = self._pending, []
+            self.add_many(pending)
+
+    def standings(
+            self,
+            game_mode: str,
+            player: Optional[str] = None,
+            limit: int = 10
+    ) -> Tuple[List[Tuple[str, int]], Optional[int], Optional[int]]:
+        """
+        Returns the fastest results of a mode and a player's rank in
+        a single query.
+
+        :param game_mode: The game mode, as named by mode_name.
+        :type game_mode: str
+        :param player: Name of the player to rank, if any.
+        :type player: str, optional
+        :param limit: Number of top results.
+        :type limit: int
+        :return: The top results as (player, time in milliseconds),
+                 then the player's rank and best time, None if the
+                 player has no result in the mode.
+        :rtype: Tuple[List[Tuple[str, int]], int | None, int | None]
+        """
+
+        self.flush()
+        rows = self._db.execute(
+            _STANDINGS,
+            {'mode': game_mode, 'player': player, 'limit': limit}
+        ).fetchall()
+
+        if rows and rows[-1][2] is not None:
+            _, best, rank = rows.pop()
+            return [row[:2] for row in rows], rank, best
+
+        return [row[:2] for row in rows], None, None
+
+    def close(self) -> None:
+        """
+        Inserts the pending results and closes the database.
+
+        :return: None
+        """
+
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
+
+    def __enter__(self) -> 'Leaderboard':
+        """
+        Returns the leaderboard, closed when the block exits.
+
+        :return: The leaderboard.
+        :rtype: Leaderboard
+        """
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Closes the leaderboard when the block exits.
+
+        :param exc_info: Exception details, if any.
+        :type exc_info: tuple
+        :return: None
+        """
+
+        self.close()
+
+
+class ResultWriter:
+    """
+    Writes results to a leaderboard from a worker thread.
+
+    `submit` only puts the result on a queue. The worker opens the
+    backend on first use and writes every result waiting in the queue
+    with one `add_many`, so results that arrive while a write is in
+    progress are coalesced into the next one. Results that cannot be
+    written are dropped and counted, as a game never fails for its
+    leaderboard. `close` stops the worker once the queue is written;
+    a later `submit` starts a new one.
+
+    Attributes:
+        submitted (int): Results submitted.
+        written (int): Results written or dropped.
+        dropped (int): Results lost to storage errors.
+        writes (int): Calls to the backend's add_many.
+    """
+
+    def __init__(self, backend: Callable[[], Leaderboard] = Leaderboard):
+        """
+        Initializes the ResultWriter; the worker starts on first use.
+
+        :param backend: Opens the leaderboard, called by the worker.
+        :type backend: Callable[[], Leaderboard]
+        :return: None
+        """
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.writes = 0
+        self._backend = backend
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._done = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    # Queued after the last result to stop the worker
+    _STOP = None
+
+    def submit(
+            self,
+            player: str,
+            game_mode: str,
+            time_ms: int,
+            finished_at: Optional[float] = None
+    ) -> None:
+        """
+        Queues the result of a won game without waiting for the disk.
+
+        :param player: Name of the player.
+        :type player: str
+        :param game_mode: The game mode, as named by mode_name.
+        :type game_mode: str
+        :param time_ms: Time taken to win, in milliseconds.
+        :type time_ms: int
+        :param finished_at: Unix time the game ended, now by default.
+        :type finished_at: float, optional
+        :return: None
+        """
+
+        with self._done:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    args=(self._queue,),
+                    name='result-writer',
+                    daemon=True
+                )
+                self._thread.start()
+
+            self.submitted += 1
+            self._queue.put((
+                player,
+                game_mode,
+                int(time_ms),
+                time.time() if finished_at is None else finished_at
+            ))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every submitted result is written.
+
+        :param timeout: Seconds to wait at most, forever if None.
+        :type timeout: float, optional
+        :return: True if every result was written in time.
+        :rtype: bool
+        """
+
+        with self._done:
+            target = self.submitted
+            return self._done.wait_for(
+                lambda: self.written >= target,
+                timeout
+            )
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Writes every submitted result, then stops the worker and closes
+        its leaderboard.
+
+        The worker reads a queue of its own, so results submitted
+        during the close go to a new worker and are not lost.
+
+        :param timeout: Seconds to wait at most, forever if None.
+        :type timeout: float, optional
+        :return: True if the worker stopped in time.
+        :rtype: bool
+        """
+
+        with self._done:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return True
+
+            self._queue.put(self._STOP)
+            self._queue = queue.SimpleQueue()
+
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _run(self, results: queue.SimpleQueue) -> None:
+        """
+        Writes the queued results until the writer is closed.
+
+        :param results: The queue read by this worker.
+        :type results: queue.SimpleQueue
+        :return: None
+        """
+
+        board = None
+        stopped = False
+        while not stopped:
+            batch = [results.get()]
+            while batch[-1] is not self._STOP:
+                try:
+                    batch.append(results.get_nowait())
+                except queue.Empty:
+                    break
+
+            if batch[-1] is self._STOP:
+                stopped = True
+                batch.pop()
+
+            if batch:
+                try:
+                    if board is None:
+                        board = self._backend()
+                    board.add_many(batch)
+                    self.writes += 1
+                except (OSError, sqlite3.Error):
+                    self.dropped += len(batch)
+
+            with self._done:
+                self.written += len(batch)
+                self._done.notify_all()
+
+        if board is not None:
+            try:
+                board.close()
+            except sqlite3.Error:
+                pass
+
+
+_LEADERBOARD: Optional[Leaderboard] = None
+_RESULT_WRITER: Optional[ResultWriter] = None
+
+
+def leaderboard() -> Leaderboard:
+    """
+    Returns the Leaderboard shared by every game of the process.
+
+    The database is opened on first use, so processes forked by
+    zygote.py each open their own connection.
+
+    :return: The shared Leaderboard.
+    :rtype: Leaderboard
+    """
+
+    global _LEADERBOARD  # pylint: disable=W0603
+    if _LEADERBOARD is None:
+        _LEADERBOARD = Leaderboard()
+
+    return _LEADERBOARD
+
+
+def result_writer() -> ResultWriter:
+    """
+    Returns the ResultWriter shared by every game of the process.
+
+    Sessions hosted together, as by multiplex.py, share its worker, so
+    their results are coalesced into the same writes. The writer is
+    closed when the process exits.
+
+    :return: The shared ResultWriter.
+    :rtype: ResultWriter
+    """
+
+    global _RESULT_WRITER  # pylint: disable=W0603
+    if _RESULT_WRITER is None:
+        _RESULT_WRITER = ResultWriter()
+        atexit.register(_RESULT_WRITER.close, EXIT_CLOSE_TIMEOUT)
+
+    return _RESULT_WRITER
@@ -0,0 +1,385 @@
+"""
+Command line load test for the Minesweeper session servers.
+
+Simulates many players connecting at once to zygote.py or
+multiplex.py. Every simulated client opens a session, waits for the
+main menu, enters a name to start an Easy game and then keeps pressing
+keys until the test ends. The report gives the time each client
+waited for its menu and game screen, and the memory held by the
+server's processes, proportional set size (PSS) summed over the server
+and its children, so pages shared after a fork count once.
+
+Functions:
+    run_client: Plays one simulated client against a server.
+    server_memory: Sums the PSS of a process and its children.
+    load_test: Starts a server and runs many clients against it.
+    main: Parses the command line and prints the report.
+
+Usage:
+    python loadtest.py --server multiplex --clients 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+MENU_MARKER = b'Minesweeper Game'
+GAME_MARKER = b'Player: '
+
+# Type a name into the focused field, then click Play on an 80x24 menu;
+# clicking avoids racing the focus moves of key navigation under load
+START_GAME_KEYS = [b'Tester', b'\x1b[<0;31;21M\x1b[<0;31;21m']
+PLAY_KEYS = [b'd', b'\r', b's', b'\r', b'f']
+
+
+class _Terminal:
+    """
+    Collects a session's output from a single background read.
+
+    Attributes:
+        output (bytes): Output received since the last key press.
+        closed (bool): True once the session closed its output.
+    """
+
+    def __init__(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+    ):
+        """
+        Initializes the _Terminal and starts reading the output.
+
+        :param reader: Output of the session.
+        :type reader: asyncio.StreamReader
+        :param writer: Input of the session.
+        :type writer: asyncio.StreamWriter
+        :return: None
+        """
+
+        self.output = b''
+        self.closed = False
+        self._writer = writer
+        self._received = asyncio.Event()
+        self._task = asyncio.create_task(self._read(reader))
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        """
+        Appends the session's output until it closes.
+
+        :param reader: Output of the session.
+        :type reader: asyncio.StreamReader
+        :return: None
+        """
+
+        try:
+            while chunk := await reader.read(65536):
+                self.output += chunk
+                self._received.set()
+        finally:
+            self.closed = True
+            self._received.set()
+
+    async def _wait(self, timeout: float) -> bool:
+        """
+        Waits until new output arrives.
+
+        :param timeout: Seconds to wait.
+        :type timeout: float
+        :return: True if output arrived, otherwise False.
+        :rtype: bool
+        """
+
+        self._received.clear()
+        try:
+            await asyncio.wait_for(self._received.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        if self.closed:
+            raise ConnectionError('the session closed')
+        return True
+
+    async def wait_for(self, marker: bytes, timeout: float) -> None:
+        """
+        Waits until the output contains a marker.
+
+        :param marker: Bytes to wait for.
+        :type marker: bytes
+        :param timeout: Seconds to wait for the marker.
+        :type timeout: float
+        :return: None
+        """
+
+        deadline = time.perf_counter() + timeout
+        while marker not in self.output:
+            if not await self._wait(deadline - time.perf_counter()):
+                raise TimeoutError(f'{marker!r} was not drawn')
+
+    async def press(
+            self,
+            keys: bytes,
+            timeout: float,
+            quiet: float = 0.05
+    ) -> None:
+        """
+        Presses keys and waits until the redraw they cause goes quiet.
+
+        Waiting for the redraw keeps a loaded server from receiving the
+        next key before the focus moved for the previous one.
+
+        :param keys: Bytes to send.
+        :type keys: bytes
+        :param timeout: Seconds to wait for the redraw to start.
+        :type timeout: float
+        :param quiet: Seconds without output that end the redraw.
+        :type quiet: float
+        :return: None
+        """
+
+        self.output = b''
+        self._writer.write(keys)
+        if not await self._wait(timeout):
+            raise TimeoutError('the session did not redraw')
+        while await self._wait(quiet):
+            pass
+
+    def close(self) -> None:
+        """
+        Closes the session.
+
+        :return: None
+        """
+
+        self._task.cancel()
+        self._writer.close()
+
+
+async def run_client(
+        path: str,
+        hold: float,
+        key_interval: float = 0.5,
+        timeout: float = 60
+) -> Dict[str, float]:
+    """
+    Plays one simulated client against a server.
+
+    :param path: Path of the server's Unix socket.
+    :type path: str
+    :param hold: Seconds to keep playing once the game started.
+    :type hold: float
+    :param key_interval: Seconds between two key presses.
+    :type key_interval: float
+    :param timeout: Seconds to wait for each screen.
+    :type timeout: float
+    :return: Seconds until the menu and until the game screen.
+    :rtype: Dict[str, float]
+    """
+
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_unix_connection(path)
+    terminal = _Terminal(reader, writer)
+    try:
+        writer.write(json.dumps({'cols': 80, 'rows': 24}).encode() + b'\n')
+        await terminal.wait_for(MENU_MARKER, timeout)
+        menu = time.perf_counter() - start
+
+        for keys in START_GAME_KEYS:
+            await terminal.press(keys, timeout)
+        await terminal.wait_for(GAME_MARKER, timeout)
+        game = time.perf_counter() - start
+
+        deadline = time.perf_counter() + hold
+        index = 0
+        while time.perf_counter() < deadline and not terminal.closed:
+            writer.write(PLAY_KEYS[index % len(PLAY_KEYS)])
+            terminal.output = b''
+            index += 1
+            await asyncio.sleep(key_interval)
+    finally:
+        terminal.close()
+
+    return {'menu': menu, 'game': game}
+
+
+def server_memory(pid: int) -> int:
+    """
+    Sums the PSS of a process and all its descendants.
+
+    :param pid: Process id of the server.
+    :type pid: int
+    :return: Proportional set size in bytes.
+    :rtype: int
+    """
+
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', encoding='utf-8') as stat:
+                parent = int(stat.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        pending += children.get(current, [])
+        try:
+            with open(f'/proc/{current}/smaps_rollup', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('Pss:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+
+    return total
+
+
+async def _run_clients(path: str, clients: int, ramp: float,
+                       hold: float) -> List:
+    """
+    Starts the clients spread over the ramp-up time and awaits them.
+
+    :param path: Path of the server's Unix socket.
+    :type path: str
+    :param clients: Number of simulated clients.
+    :type clients: int
+    :param ramp: Seconds over which the clients connect.
+    :type ramp: float
+    :param hold: Seconds every client keeps playing.
+    :type hold: float
+    :return: Timings of every client, or the exception it raised.
+    :rtype: List
+    """
+
+    async def delayed(index: int) -> Dict[str, float]:
+        await asyncio.sleep(ramp * index / clients)
+        return await run_client(path, hold)
+
+    return await asyncio.gather(
+        *(delayed(index) for index in range(clients)),
+        return_exceptions=True
+    )
+
+
+def load_test(
+        server: str,
+        clients: int,
+        ramp: float = 5,
+        hold: float = 10
+) -> dict:
+    """
+    Starts a server and runs many simulated clients against it.
+
+    Memory is sampled once the server is idle and again halfway
+    through the hold, when every client should be playing.
+
+    :param server: Server to test, 'zygote' or 'multiplex'.
+    :type server: str
+    :param clients: Number of simulated clients.
+    :type clients: int
+    :param ramp: Seconds over which the clients connect.
+    :type ramp: float
+    :param hold: Seconds every client keeps playing.
+    :type hold: float
+    :return: Client timings, failures and memory figures.
+    :rtype: dict
+    """
+
+    path = os.path.join(tempfile.mkdtemp(), f'{server}.sock')
+    with subprocess.Popen([sys.executable, f'{server}.py', path]) as process:
+        try:
+            while not os.path.exists(path):
+                time.sleep(0.05)
+            time.sleep(0.5)
+            idle = server_memory(process.pid)
+
+            async def run() -> tuple:
+                clients_task = asyncio.create_task(
+                    _run_clients(path, clients, ramp, hold)
+                )
+                await asyncio.sleep(ramp + hold / 2)
+                peak = await asyncio.to_thread(server_memory, process.pid)
+                return await clients_task, peak
+
+            results, peak = asyncio.run(run())
+        finally:
+            process.kill()
+
+    return {
+        'timings': [result for result in results if isinstance(result, dict)],
+        'failures': [
+            result for result in results if not isinstance(result, dict)
+        ],
+        'idle_memory': idle,
+        'peak_memory': peak
+    }
+
+
+def main() -> None:
+    """
+    Parses the command line, runs the load test and prints a report.
+
+    :return: None
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Load test a Minesweeper session server.'
+    )
+    parser.add_argument(
+        '--server',
+        default='multiplex',
+        choices=['multiplex', 'zygote'],
+        help='server to test (default: multiplex)'
+    )
+    parser.add_argument(
+        '--clients',
+        type=int,
+        default=100,
+        help='number of simulated clients (default: 100)'
+    )
+    parser.add_argument(
+        '--ramp',
+        type=float,
+        default=5,
+        help='seconds over which clients connect (default: 5)'
+    )
+    parser.add_argument(
+        '--hold',
+        type=float,
+        default=10,
+        help='seconds every client keeps playing (default: 10)'
+    )
+    args = parser.parse_args()
+
+    report = load_test(args.server, args.clients, args.ramp, args.hold)
+    timings = report['timings']
+    print(f'Server:           {args.server}')
+    print(f'Clients:          {args.clients}')
+    print(f'Failures:         {len(report["failures"])}')
+    for screen in ('menu', 'game'):
+        latencies = sorted(timing[screen] for timing in timings)
+        if latencies:
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[len(latencies) * 95 // 100]
+            print(f'{screen.capitalize() + " p50/p95:":<18}'
+                  f'{p50 * 1e3:.0f} / {p95 * 1e3:.0f} ms')
+    session_memory = (
+        (report['peak_memory'] - report['idle_memory']) / args.clients
+    )
+    print(f'Idle memory:      {report["idle_memory"] / 2**20:.1f} MB')
+    print(f'Peak memory:      {report["peak_memory"] / 2**20:.1f} MB')
+    print(f'Per session:      {session_memory / 2**20:.2f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Server that hosts many Minesweeper sessions in a single process.
+
+Where zygote.py forks a process per visitor, this server runs every
+session as a `MinesweeperApp` inside one asyncio event loop. Python,
+Textual and NumPy are loaded once and shared, so a session only costs
+its game state and widget tree.
+
+Connections use the same protocol as zygote.py: a JSON header line
+holding the terminal size, for example `{"cols": 80, "rows": 24}`,
+followed by raw terminal bytes in both directions. The gateway can
+therefore point ZYGOTE_SOCKET at either server. The header's `env` is
+ignored, as every session shares the server's environment.
+
+Classes:
+    StreamDriver: Textual driver that talks to a stream instead of a
+                  terminal.
+    SessionApp: MinesweeperApp attached to a client connection.
+
+Functions:
+    serve: Listens on a Unix socket and runs a session per connection.
+
+Usage:
+    python multiplex.py /tmp/minesweeper.sock
+"""
+
+import asyncio
+import json
+import os
+import sys
+from codecs import getincrementaldecoder
+
+from textual import events
+from textual._xterm_parser import XTermParser
+from textual.driver import Driver
+from textual.geometry import Size
+
+import game_logic  # pylint: disable=W0611  # Warm the deferred import
+from run import MinesweeperApp
+
+READ_SIZE = 65536
+PARSER_TICK = 0.1
+
+
+class StreamDriver(Driver):
+    """
+    A Textual driver that reads input from and writes output to the
+    client connection of its SessionApp instead of the terminal.
+
+    Output is written straight to the stream's buffer on the event
+    loop, and input is parsed by a task of the same loop, so a session
+    needs neither threads nor signal handlers.
+    """
+
+    def __init__(self, app: 'SessionApp', **kwargs):
+        """
+        Initializes the StreamDriver for a session.
+
+        :param app: The session to drive.
+        :type app: SessionApp
+        :param kwargs: Keyword arguments for the Textual Driver.
+        :type kwargs: dict
+        :return: None
+        """
+
+        super().__init__(app, **kwargs)
+        self._reader = app.reader
+        self._writer = app.writer
+        self._input_task = None
+
+    def write(self, data: str) -> None:
+        """
+        Writes terminal output to the client.
+
+        :param data: The output to write.
+        :type data: str
+        :return: None
+        """
+
+        if not self._writer.is_closing():
+            self._writer.write(data.encode())
+
+    def send_event(self, event: events.Event) -> None:
+        """
+        Posts an input event to the session.
+
+        :param event: The event to post.
+        :type event: events.Event
+        :return: None
+        """
+
+        self._app.post_message(event)
+
+    def start_application_mode(self) -> None:
+        """
+        Sets up the client's terminal and starts reading its input.
+
+        :return: None
+        """
+
+        self.write('\x1b[?1049h')  # Alternate screen
+        if self._mouse:
+            self.write('\x1b[?1000h\x1b[?1003h\x1b[?1015h\x1b[?1006h')
+        self.write('\x1b[?25l')  # Hide cursor
+        self.write('\x1b[?1004h')  # Focus events
+        self.write('\x1b[?2004h')  # Bracketed paste
+
+        size = Size(*self._size)
+        self.send_event(events.Resize(size, size))
+        self._input_task = asyncio.create_task(self._read_input())
+
+    async def _read_input(self) -> None:
+        """
+        Parses the client's input into events until it disconnects.
+
+        The parser is ticked between reads so a lone escape key is
+        delivered without waiting for the next keystroke.
+
+        :return: None
+        """
+
+        parser = XTermParser(self._debug)
+        decode = getincrementaldecoder('utf-8')(errors='replace').decode
+        read = None
+
+        try:
+            while True:
+                # Wait on a pending read rather than cancelling it, so a
+                # tick never drops input that arrived meanwhile
+                if read is None:
+                    read = asyncio.ensure_future(self._reader.read(READ_SIZE))
+                done, _ = await asyncio.wait({read}, timeout=PARSER_TICK)
+                if done:
+                    try:
+                        data = read.result()
+                    except ConnectionError:
+                        data = b''
+                    read = None
+                    if not data:  # The client went away, end the session
+                        self._app.exit()
+                        return
+
+                    for event in parser.feed(decode(data)):
+                        self.process_event(event)
+
+                for event in parser.tick():
+                    self.process_event(event)
+        finally:
+            if read is not None:
+                read.cancel()
+
+    def disable_input(self) -> None:
+        """
+        Stops reading the client's input.
+
+        :return: None
+        """
+
+        if self._input_task is not None:
+            self._input_task.cancel()
+            self._input_task = None
+
+    def stop_application_mode(self) -> None:
+        """
+        Restores the client's terminal.
+
+        :return: None
+        """
+
+        self.disable_input()
+        self.write('\x1b[?2004l\x1b[?1004l')
+        if self._mouse:
+            self.write('\x1b[?1000l\x1b[?1003l\x1b[?1015l\x1b[?1006l')
+        self.write('\x1b[?1049l\x1b[?25h')
+
+
+class SessionApp(MinesweeperApp):
+    """
+    A Minesweeper application attached to a client connection.
+
+    Attributes:
+        reader (asyncio.StreamReader): Input of the client.
+        writer (asyncio.StreamWriter): Output to the client.
+    """
+
+    def __init__(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+            **kwargs
+    ):
+        """
+        Initializes the SessionApp with the client's streams.
+
+        :param reader: Input of the client.
+        :type reader: asyncio.StreamReader
+        :param writer: Output to the client.
+        :type writer: asyncio.StreamWriter
+        :param kwargs: Keyword arguments for the Textual App.
+        :type kwargs: dict
+        :return: None
+        """
+
+        self.reader = reader
+        self.writer = writer
+        super().__init__(driver_class=StreamDriver, **kwargs)
+
+
+async def _run_session(
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+) -> None:
+    """
+    Runs a game for one client until either of them ends.
+
+    :param reader: Input of the client.
+    :type reader: asyncio.StreamReader
+    :param writer: Output to the client.
+    :type writer: asyncio.StreamWriter
+    :return: None
+    """
+
+    try:
+        header = json.loads(await reader.readline() or b'{}')
+        app = SessionApp(reader, writer)
+        await app.run_async(
+            size=(header.get('cols', 80), header.get('rows', 24))
+        )
+    except (ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(path: str) -> None:
+    """
+    Listens on a Unix socket and runs a session per connection.
+
+    Every session runs as a task of the current event loop.
+
+    :param path: Path of the Unix socket.
+    :type path: str
+    :return: None
+    """
+
+    if os.path.exists(path):
+        os.unlink(path)
+
+    server = await asyncio.start_unix_server(
+        _run_session,
+        path,
+        limit=READ_SIZE,
+        backlog=128
+    )
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    asyncio.run(serve(sys.argv[1] if len(sys.argv) > 1 else
+                      '/tmp/minesweeper.sock'))
@@ -0,0 +1,395 @@
+"""
+This module generates Minesweeper boards that can be solved without
+guessing. A board comes with a start cell, a zero cell whose opening
+is a safe first click, and `MinefieldSolver` must be able to clear the
+whole board from there using certain moves only.
+
+Candidates are random boards checked by playing them with the solver,
+so generation is rejection sampling. Candidates are checked in
+parallel over a pool of worker processes, and `BoardCache` keeps a few
+boards per `GameMode` ready so a game starts without waiting.
+
+Servers that fork a process per session, like zygote.py, call
+`share_board_cache` once before serving. Every session then takes its
+boards from one cache hosted by a manager process, so N sessions share
+one worker pool instead of starting N.
+
+Classes:
+    BoardCache: Keeps pre-generated boards for every GameMode.
+    BoardCacheManager: Serves a BoardCache to other processes.
+
+Functions:
+    is_solvable: Checks that a board can be cleared without guessing.
+    generate_boards: Generates boards in the current process.
+    generate: Spreads board generation over a process pool.
+    board_cache: Returns the BoardCache used by the process.
+    share_board_cache: Hosts a BoardCache for forked sessions.
+
+Usage:
+    Call `generate` for a batch of boards, or `take` a board from
+    `board_cache()` when a game starts.
+"""
+
+import multiprocessing
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.managers import BaseManager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from configurations import GameMode, GameState
+from game_logic import GameSession, MinefieldLogic
+from solver import auto_play
+
+Board = Tuple[np.ndarray, Tuple[int, int]]
+
+
+def is_solvable(game_matrix: np.ndarray, start: Tuple[int, int]) -> bool:
+    """
+    Checks that a board can be cleared without guessing.
+
+    :param game_matrix: Board values, 9 + neighbours for mines.
+    :type game_matrix: np.ndarray
+    :param start: The first cell uncovered.
+    :type start: Tuple[int, int]
+    :return: True if the solver wins from the start cell.
+    :rtype: bool
+    """
+
+    session = GameSession(game=MinefieldLogic(game_matrix=game_matrix))
+    session.reveal(start)
+    auto_play(session)
+    return session.state is GameState.WON
+
+
+def generate_boards(
+        cols: int,
+        rows: int,
+        number_of_mines: int,
+        count: int,
+        seed: Optional[int | np.random.SeedSequence] = None,
+        batch_size: int = 16,
+        max_candidates: int = 10_000
+) -> List[Board]:
+    """
+    Generates boards that can be solved without guessing.
+
+    Candidates are generated in batches by
+    MinefieldLogic.generate_batch. Each gets a random zero cell as its
+    start and is kept if the solver clears it from there; boards
+    without a zero cell are skipped.
+
+    :param cols: Number of columns in each grid.
+    :type cols: int
+    :param rows: Number of rows in each grid.
+    :type rows: int
+    :param number_of_mines: Number of mines on each board.
+    :type number_of_mines: int
+    :param count: Number of boards wanted.
+    :type count: int
+    :param seed: Seed for reproducible boards.
+    :type seed: int or np.random.SeedSequence, optional
+    :param batch_size: Candidates generated at once.
+    :type batch_size: int
+    :param max_candidates: Candidates checked before giving up.
+    :type max_candidates: int
+    :return: Boards with their start cells, fewer than count if
+             max_candidates ran out.
+    :rtype: List[Tuple[np.ndarray, Tuple[int, int]]]
+    """
+
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(seed.spawn(1)[0])
+
+    boards = []
+    for _ in range(0, max_candidates, batch_size):
+        for game_matrix in MinefieldLogic.generate_batch(
+                batch_size,
+                cols=cols,
+                rows=rows,
+                number_of_mines=number_of_mines,
+                seed=seed.spawn(1)[0]
+        ):
+            zeros = np.flatnonzero(game_matrix == 0)
+            if not len(zeros):
+                continue
+
+            start = divmod(int(zeros[rng.integers(len(zeros))]), cols)
+            if is_solvable(game_matrix, start):
+                boards.append((game_matrix, start))
+                if len(boards) == count:
+                    return boards
+
+    return boards
+
+
+def _generate_mode(mode: str, count: int,
+                   seed: np.random.SeedSequence) -> List[Board]:
+    """
+    Generates boards of a GameMode, as a task of a worker process.
+
+    :param mode: Name of the GameMode.
+    :type mode: str
+    :param count: Number of boards wanted.
+    :type count: int
+    :param seed: Seed of the task.
+    :type seed: np.random.SeedSequence
+    :return: Boards with their start cells.
+    :rtype: List[Tuple[np.ndarray, Tuple[int, int]]]
+    """
+
+    settings = GameMode[mode.upper()].value
+    cols, rows = settings['grid_size']
+    return generate_boards(cols, rows, settings['mine'], count, seed)
+
+
+def generate(
+        mode: str,
+        count: int,
+        workers: Optional[int] = None,
+        seed: Optional[int] = None
+) -> List[Board]:
+    """
+    Generates boards of a GameMode spread over a pool of processes.
+
+    Every board is a task of its own, so the slow rejections of one
+    do not hold up the others.
+
+    :param mode: Name of the GameMode.
+    :type mode: str
+    :param count: Number of boards wanted.
+    :type count: int
+    :param workers: Number of worker processes, all cores by default.
+    :type workers: int, optional
+    :param seed: Seed for reproducible boards.
+    :type seed: int, optional
+    :return: Boards with their start cells.
+    :rtype: List[Tuple[np.ndarray, Tuple[int, int]]]
+    """
+
+    seeds = np.random.SeedSequence(seed).spawn(count)
+    boards = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for found in executor.map(
+                _generate_mode,
+                [mode] * count,
+                [1] * count,
+                seeds
+        ):
+            boards += found
+
+    return boards
+
+
+class BoardCache:
+    """
+    Keeps pre-generated no-guess boards for every GameMode.
+
+    Taking a board queues the generation of a replacement on a pool of
+    worker processes, so the cache refills while the game is played.
+    Nothing is generated in the calling process: a cold cache has no
+    board to give, and its first game is a random one. Workers come
+    from a forkserver, a clean single-threaded process, as forking the
+    threaded game process itself is unsafe.
+
+    Attributes:
+        size (int): Boards kept ready per GameMode.
+    """
+
+    def __init__(self, size: int = 2, workers: Optional[int] = None):
+        """
+        Initializes the BoardCache, empty until filled.
+
+        :param size: Boards kept ready per GameMode.
+        :type size: int
+        :param workers: Number of worker processes, all cores by default.
+        :type workers: int, optional
+        :return: None
+        """
+
+        self.size = size
+        self._workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._boards: Dict[str, deque] = {
+            mode.name: deque() for mode in GameMode
+        }
+        self._pending: Dict[str, int] = {mode.name: 0 for mode in GameMode}
+        self._lock = threading.Lock()
+
+    def ready(self, mode: str) -> int:
+        """
+        Returns the number of boards ready for a GameMode.
+
+        :param mode: Name of the GameMode.
+        :type mode: str
+        :return: Boards ready to take.
+        :rtype: int
+        """
+
+        return len(self._boards[mode.upper()])
+
+    def fill(self, mode: str) -> None:
+        """
+        Queues generation until the GameMode has size boards coming.
+
+        :param mode: Name of the GameMode.
+        :type mode: str
+        :return: None
+        """
+
+        mode = mode.upper()
+        with self._lock:
+            missing = (
+                self.size - len(self._boards[mode]) - self._pending[mode]
+            )
+            if missing <= 0:
+                return
+
+            if self._executor is None:
+                self._executor = self._start_executor()
+            self._pending[mode] += missing
+
+        for seed in np.random.SeedSequence().spawn(missing):
+            future = self._executor.submit(_generate_mode, mode, 1, seed)
+            future.add_done_callback(
+                lambda done, mode=mode: self._store(mode, done)
+            )
+
+    def _start_executor(self) -> ProcessPoolExecutor:
+        """
+        Starts the worker pool on the forkserver.
+
+        The multiprocessing resource tracker is started with the file
+        descriptor of sys.stderr, which Textual replaces while an app
+        runs, so it is started against the real stderr first.
+
+        :return: The worker pool.
+        :rtype: ProcessPoolExecutor
+        """
+
+        stderr, sys.stderr = sys.stderr, sys.__stderr__
+        try:
+            resource_tracker.ensure_running()
+        finally:
+            sys.stderr = stderr
+
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=context
+        )
+
+    def _store(self, mode: str, future: Future) -> None:
+        """
+        Adds the boards of a finished generation task.
+
+        :param mode: Name of the GameMode.
+        :type mode: str
+        :param future: The finished task.
+        :type future: Future
+        :return: None
+        """
+
+        with self._lock:
+            self._pending[mode] -= 1
+            if not future.cancelled() and future.exception() is None:
+                self._boards[mode].extend(future.result())
+
+    def take(self, mode: str) -> Optional[Board]:
+        """
+        Takes a board for a GameMode and queues its replacement.
+
+        :param mode: Name of the GameMode.
+        :type mode: str
+        :return: A board with its start cell, or None if the cache
+                 has none ready yet.
+        :rtype: Tuple[np.ndarray, Tuple[int, int]] or None
+        """
+
+        mode = mode.upper()
+        try:
+            board = self._boards[mode].popleft()
+        except IndexError:
+            board = None
+
+        self.fill(mode)
+        return board
+
+    def close(self) -> None:
+        """
+        Stops the worker processes, dropping queued generation.
+
+        :return: None
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class BoardCacheManager(BaseManager):
+    """
+    Serves the BoardCache of its server process to other processes.
+
+    `board_cache()` on a connected manager returns a proxy whose
+    methods run on the server's cache.
+    """
+
+
+_BOARD_CACHE: Optional[BoardCache] = None
+_SHARED_CACHE_ADDRESS: Optional[str] = None
+
+
+def board_cache() -> BoardCache:
+    """
+    Returns the BoardCache used by every game of the process.
+
+    Sessions hosted together, as by multiplex.py, share the cache and
+    its worker processes. Sessions forked after `share_board_cache`
+    get a proxy of the cache it hosts, or a cache of their own if the
+    host cannot be reached.
+
+    :return: The shared BoardCache, or a proxy of it.
+    :rtype: BoardCache
+    """
+
+    global _BOARD_CACHE  # pylint: disable=W0603
+    if _BOARD_CACHE is None and _SHARED_CACHE_ADDRESS is not None:
+        manager = BoardCacheManager(address=_SHARED_CACHE_ADDRESS)
+        try:
+            manager.connect()
+            # pylint: disable=E1101  # Registered below
+            _BOARD_CACHE = manager.board_cache()
+        except OSError:  # The host is gone, generate in this session
+            pass
+
+    if _BOARD_CACHE is None:
+        _BOARD_CACHE = BoardCache()
+
+    return _BOARD_CACHE
+
+
+BoardCacheManager.register('board_cache', callable=board_cache)
+
+
+def share_board_cache() -> BoardCacheManager:
+    """
+    Hosts a BoardCache in a manager process for sessions forked later.
+
+    Call it before the caller starts any thread, as the manager
+    process is forked from it.
+
+    :return: The started manager, which stops its process on exit.
+    :rtype: BoardCacheManager
+    """
+
+    global _SHARED_CACHE_ADDRESS  # pylint: disable=W0603
+    manager = BoardCacheManager(ctx=multiprocessing.get_context('fork'))
+    manager.start()
+    _SHARED_CACHE_ADDRESS = manager.address
+    return manager
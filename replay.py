@@ -0,0 +1,560 @@
+"""
+This module records games to compact binary replay logs and plays them
+back through `GameSession`, without any user interface.
+
+A log starts with a fixed header describing the board: its size, mine
+count and seed, plus the packed mine plane when the mines were placed
+before recording started, as on no-guess boards. Random boards place
+their mines on the first reveal from their seed, so the seed alone
+rebuilds them. Every move then appends a 9-byte record: the move, the
+cell and the milliseconds since recording started.
+
+The header is written out as soon as the log is opened and records
+are handed to the operating system at most `flush_interval` seconds
+after they are played, every move by default, so a session killed
+mid-game still leaves a readable log. Records are never synced to the
+disk one by one. Logs are read back with `mmap` and the records are
+exposed as a numpy structured array viewing the map, so nothing is
+copied or parsed per record. A log still being written, or cut short,
+is read up to its last whole record.
+
+Classes:
+    ReplayRecorder: Appends the moves of a game to a log file.
+    Replay: Reads a log and plays it back.
+
+Functions:
+    record_game: Starts recording a board to a new log file.
+    summarize: Counts the moves and play time of many logs.
+    main: Parses the command line and replays logs.
+
+Usage:
+    python replay.py ~/.minesweeper/replays --speed 2
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+import uuid
+from collections import Counter
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+from configurations import Move
+from game_logic import GameSession, MinefieldLogic
+
+REPLAY_DIR = os.environ.get(
+    'MINESWEEPER_REPLAYS',
+    os.path.join(os.path.expanduser('~'), '.minesweeper', 'replays')
+)
+
+# Log header: magic, version, flags, safe radius, rows, cols, mines
+# and seed, followed by the packed mine plane when HAS_MINES is set
+_LOG_MAGIC = b'MR'
+_LOG_VERSION = 1
+_LOG_HAS_SEED = 1
+_LOG_HAS_MINES = 2
+_LOG_HEADER = struct.Struct('<2sBBBHHIQ')
+
+# One record per move: move, row, col and milliseconds since the start
+_RECORD = struct.Struct('<BHHI')
+MOVE_DTYPE = np.dtype([
+    ('move', 'u1'),
+    ('row', '<u2'),
+    ('col', '<u2'),
+    ('time', '<u4')
+])
+
+
+class ReplayRecorder:
+    """
+    Appends the moves of a game to a binary replay log.
+
+    The header is written out when recording starts, so the board must
+    either have its mines placed or a seed that places them. Records
+    are written out once `flush_interval` seconds have passed since
+    the last write, so a live log can be read up to its last flush.
+
+    Attributes:
+        path (str): Path of the log file.
+        moves (int): Number of moves recorded.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            game: MinefieldLogic,
+            flush_interval: float = 0.0
+    ):
+        """
+        Initializes the ReplayRecorder, writing the header of the log.
+
+        :param path: Path of the log file, replaced if it exists.
+        :type path: str
+        :param game: The board being played.
+        :type game: MinefieldLogic
+        :param flush_interval: Seconds records may stay buffered, 0 to
+                               write every move out at once.
+        :type flush_interval: float
+        :return: None
+        """
+
+        has_seed = game.seed is not None and 0 <= game.seed < 2**64
+        if not game.mines_placed and not has_seed:
+            raise ValueError('a board without mines needs a 64-bit seed')
+
+        flags = (
+            (_LOG_HAS_SEED if has_seed else 0)
+            | (_LOG_HAS_MINES if game.mines_placed else 0)
+        )
+        header = _LOG_HEADER.pack(
+            _LOG_MAGIC,
+            _LOG_VERSION,
+            flags,
+            game.safe_radius,
+            game.rows,
+            game.cols,
+            game.number_of_mines,
+            game.seed if has_seed else 0
+        )
+        if game.mines_placed:
+            header += np.packbits(game.game_matrix >= 9, axis=None,
+                                  bitorder='little').tobytes()
+
+        self.path = path
+        self.moves = 0
+        # Closed by close(), the file lives as long as the recording
+        # pylint: disable=R1732
+        self._file = open(path, 'wb')
+        self._file.write(header)
+        self._file.flush()
+        self._flush_interval = flush_interval
+        self._start = self._flushed = time.monotonic()
+
+    def record(self, move: Move, position: list | tuple) -> None:
+        """
+        Appends a move to the log.
+
+        :param move: The move played.
+        :type move: Move
+        :param position: Coordinates of the cell.
+        :type position: list or tuple
+        :return: None
+        """
+
+        if self._file is None:
+            return
+
+        row, col = position
+        now = time.monotonic()
+        elapsed = int((now - self._start) * 1000)
+        self._file.write(
+            _RECORD.pack(move.value, row, col, min(elapsed, 0xFFFFFFFF))
+        )
+        self.moves += 1
+        if now - self._flushed >= self._flush_interval:
+            self._file.flush()
+            self._flushed = now
+
+    def close(self) -> None:
+        """
+        Writes the buffered moves and closes the log.
+
+        :return: None
+        """
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'ReplayRecorder':
+        """
+        Returns the recorder, closed when the block exits.
+
+        :return: The recorder.
+        :rtype: ReplayRecorder
+        """
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Closes the log when the block exits.
+
+        :param exc_info: Exception details, if any.
+        :type exc_info: tuple
+        :return: None
+        """
+
+        self.close()
+
+
+def record_game(
+        game: MinefieldLogic,
+        directory: Optional[str] = None
+) -> ReplayRecorder:
+    """
+    Starts recording a board to a new log file.
+
+    :param game: The board being played.
+    :type game: MinefieldLogic
+    :param directory: Directory of the logs, REPLAY_DIR by default.
+    :type directory: str, optional
+    :return: The recorder of the new log.
+    :rtype: ReplayRecorder
+    """
+
+    directory = directory or REPLAY_DIR
+    os.makedirs(directory, exist_ok=True)
+    name = f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}.mlog'
+    return ReplayRecorder(os.path.join(directory, name), game)
+
+
+class Replay:
+    """
+    Reads a replay log and plays it back.
+
+    The log is memory-mapped and `moves` views its records in place.
+    Arrays taken from the log are views of the map as well; copy them
+    to keep them after close.
+
+    Attributes:
+        path (str): Path of the log file.
+        rows (int): Number of rows of the board.
+        cols (int): Number of columns of the board.
+        number_of_mines (int): Number of mines of the board.
+        safe_radius (int): Safe radius of a deferred board.
+        seed (int | None): Seed of the board, if recorded.
+        moves (np.ndarray): Records of MOVE_DTYPE, in play order.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the Replay by mapping a log file.
+
+        :param path: Path of the log file.
+        :type path: str
+        :return: None
+        """
+
+        self.path = path
+        with open(path, 'rb') as file:
+            try:
+                self._map = mmap.mmap(file.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+            except ValueError as error:  # Empty file
+                raise ValueError(f'{path} is not a replay log') from error
+
+        try:
+            (magic, version, flags, self.safe_radius, self.rows, self.cols,
+             self.number_of_mines, seed) = _LOG_HEADER.unpack_from(self._map)
+        except struct.error as error:
+            self._map.close()
+            raise ValueError(f'{path} is not a replay log') from error
+
+        if magic != _LOG_MAGIC or version != _LOG_VERSION:
+            self._map.close()
+            raise ValueError(f'{path} is not a replay log')
+
+        self.seed = seed if flags & _LOG_HAS_SEED else None
+        offset = _LOG_HEADER.size
+        self._mines = None
+        if flags & _LOG_HAS_MINES:
+            size = (self.rows * self.cols + 7) // 8
+            if len(self._map) < offset + size:
+                self._map.close()
+                raise ValueError(f'{path} is not a replay log')
+            self._mines = np.frombuffer(self._map, dtype=np.uint8,
+                                        count=size, offset=offset)
+            offset += size
+
+        # A log still being written may end in part of a record
+        count = max(len(self._map) - offset, 0) // MOVE_DTYPE.itemsize
+        self.moves = np.frombuffer(self._map, dtype=MOVE_DTYPE,
+                                   count=count, offset=offset)
+
+    @property
+    def duration(self) -> float:
+        """
+        Returns the time from the start of recording to the last move.
+
+        :return: Duration in seconds.
+        :rtype: float
+        """
+
+        return int(self.moves['time'][-1]) / 1000 if len(self.moves) else 0.0
+
+    def board(self) -> MinefieldLogic:
+        """
+        Rebuilds the board of the log, with nothing uncovered.
+
+        :return: The board as it was when recording started.
+        :rtype: MinefieldLogic
+        """
+
+        if self._mines is None:
+            return MinefieldLogic(
+                cols=self.cols,
+                rows=self.rows,
+                number_of_mines=self.number_of_mines,
+                deferred=True,
+                safe_radius=self.safe_radius,
+                seed=self.seed
+            )
+
+        padded = np.zeros((self.rows + 2, self.cols + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1] = np.unpackbits(
+            self._mines,
+            count=self.rows * self.cols,
+            bitorder='little'
+        ).reshape(self.rows, self.cols)
+        return MinefieldLogic(
+            game_matrix=MinefieldLogic.count_mines(padded),
+            seed=self.seed
+        )
+
+    def play(
+            self,
+            speed: Optional[float] = None,
+            on_move: Optional[Callable] = None
+    ) -> GameSession:
+        """
+        Plays the log back on a new session.
+
+        :param speed: Playback speed relative to the recording, or None
+                      to play every move at once.
+        :type speed: float, optional
+        :param on_move: Called with the session, the move, the cell and
+                        the cells it uncovered after every move.
+        :type on_move: Callable, optional
+        :return: The session after the last move.
+        :rtype: GameSession
+        """
+
+        session = GameSession(game=self.board())
+        actions = {
+            Move.REVEAL.value: session.reveal,
+            Move.FLAG.value: session.toggle_flag,
+            Move.CHORD.value: session.chord
+        }
+        start = time.monotonic()
+        for move, row, col, elapsed in self.moves.tolist():
+            if speed:
+                delay = start + elapsed / 1000 / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+            cells = actions[move]((row, col))
+            if callable(on_move):
+                on_move(session, Move(move), (row, col), cells)
+
+        return session
+
+    def close(self) -> None:
+        """
+        Unmaps the log, invalidating the arrays viewing it.
+
+        :return: None
+        """
+
+        self.moves = self._mines = None
+        self._map.close()
+
+    def __enter__(self) -> 'Replay':
+        """
+        Returns the replay, unmapped when the block exits.
+
+        :return: The replay.
+        :rtype: Replay
+        """
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Unmaps the log when the block exits.
+
+        :param exc_info: Exception details, if any.
+        :type exc_info: tuple
+        :return: None
+        """
+
+        self.close()
+
+
+def summarize(
+        paths: Iterable[str],
+        on_skip: Optional[Callable] = None
+) -> Counter:
+    """
+    Counts the moves and play time of many logs without playing them.
+
+    Logs that cannot be read, such as the empty file of a session
+    killed before it started recording, are skipped and counted.
+
+    :param paths: Paths of the log files.
+    :type paths: Iterable[str]
+    :param on_skip: Called with the path and the error of every log
+                    skipped.
+    :type on_skip: Callable, optional
+    :return: Counters of games, reveals, flags, chords, play time in
+             milliseconds and skipped logs.
+    :rtype: Counter
+    """
+
+    stats = Counter()
+    counts = np.zeros(len(Move), dtype=np.int64)
+    for path in paths:
+        try:
+            replay = Replay(path)
+        except (OSError, ValueError) as error:
+            stats['skipped'] += 1
+            if callable(on_skip):
+                on_skip(path, error)
+            continue
+
+        # Only temporaries view the map, so it can close after each log
+        with replay:
+            counts += np.bincount(replay.moves['move'], minlength=len(Move))
+            if len(replay.moves):
+                stats['time'] += int(replay.moves['time'][-1])
+        stats['games'] += 1
+
+    for move in Move:
+        stats[f'{move.name.lower()}s'] = int(counts[move.value])
+
+    return stats
+
+
+def _log_paths(paths: List[str]) -> List[str]:
+    """
+    Expands directories into the logs they contain.
+
+    :param paths: Log files or directories of logs.
+    :type paths: List[str]
+    :return: Paths of the log files, sorted within each directory.
+    :rtype: List[str]
+    """
+
+    logs = []
+    for path in paths:
+        if os.path.isdir(path):
+            logs += sorted(
+                os.path.join(path, name)
+                for name in os.listdir(path) if name.endswith('.mlog')
+            )
+        else:
+            logs.append(path)
+
+    return logs
+
+
+def _print_skipped(path: str, error: Exception) -> None:
+    """
+    Reports a log that could not be read.
+
+    :param path: Path of the log file.
+    :type path: str
+    :param error: The error raised reading it.
+    :type error: Exception
+    :return: None
+    """
+
+    print(f'{path}: skipped, {error}', file=sys.stderr)
+
+
+def _print_move(
+        session: GameSession,
+        move: Move,
+        position: tuple,
+        cells: List[tuple] | bool
+) -> None:
+    """
+    Prints a move played back, with the number of cells it uncovered.
+
+    :param session: The session played.
+    :type session: GameSession
+    :param move: The move played.
+    :type move: Move
+    :param position: Coordinates of the cell.
+    :type position: tuple
+    :param cells: Cells uncovered, or whether a flag changed.
+    :type cells: List[tuple] or bool
+    :return: None
+    """
+
+    row, col = position
+    line = f'  {move.name.lower():<6} {row:>4} {col:>4}'
+    if isinstance(cells, list) and cells:
+        line += f'  +{len(cells)} cells'
+    if session.is_over:
+        line += f'  {session.state.value}'
+    print(line)
+
+
+def main() -> None:
+    """
+    Parses the command line and replays or summarizes logs.
+
+    :return: None
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Replay recorded Minesweeper games.'
+    )
+    parser.add_argument(
+        'paths',
+        nargs='*',
+        default=[REPLAY_DIR],
+        help='log files or directories of logs (default: the replay '
+             'directory)'
+    )
+    parser.add_argument(
+        '--speed',
+        type=float,
+        default=None,
+        help='playback speed, printing every move (default: instant)'
+    )
+    parser.add_argument(
+        '--summary',
+        action='store_true',
+        help='only count the moves of the logs'
+    )
+    args = parser.parse_args()
+    logs = _log_paths(args.paths)
+
+    if args.summary:
+        start = time.perf_counter()
+        stats = summarize(logs, on_skip=_print_skipped)
+        elapsed = time.perf_counter() - start
+        print(f'Games:         {stats["games"]}')
+        for move in Move:
+            print(f'{move.name.capitalize() + "s:":<15}'
+                  f'{stats[f"{move.name.lower()}s"]}')
+        print(f'Play time:     {stats["time"] / 1000:.1f} s')
+        print(f'Skipped:       {stats["skipped"]}')
+        print(f'Logs/second:   {len(logs) / elapsed:,.0f}')
+        return
+
+    for path in logs:
+        try:
+            replay = Replay(path)
+        except (OSError, ValueError) as error:
+            _print_skipped(path, error)
+            continue
+
+        with replay:
+            print(f'{path}: {replay.cols}x{replay.rows}, '
+                  f'{replay.number_of_mines} mines')
+            session = replay.play(
+                speed=args.speed,
+                on_move=_print_move if args.speed else None
+            )
+            print(f'  {session.state.value} after {len(replay.moves)} '
+                  f'moves in {replay.duration:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
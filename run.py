@@ -10,6 +10,8 @@ Classes:
         and difficulty level before starting the game.
     GameScreen: Manages the game UI and logic, including the game board,
         timer, and flag counter.
+    LeaderboardScreen: Shows the fastest times of a game mode and the
+        player's rank.
     MinesweeperApp: The main entry point for the application, responsible
         for running the game and managing screen transitions.
 
@@ -17,21 +19,27 @@ Attributes:
     CSS_PATH (str): Path to the CSS file for styling the application.
 """
 
+import asyncio
+import sqlite3
 import time
+from typing import Optional
 
-from textual import events
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal
 from textual.screen import Screen
-from textual.widgets import Button, Label, Input, Digits
+from textual.widgets import Button, Label, Input, Digits, Static
 from textual.color import Color
-from configurations import Hue, DarkTheme, LightTheme, GameMode, Icons
+from configurations import (
+    Hue, DarkTheme, LightTheme, GameMode, Icons, Move
+)
 from game_components import (
     ControlsFooter,
     Selector,
     MinefieldUI,
+    MinefieldCanvas,
     GameOverScreen
 )
+from leaderboard import format_time, leaderboard, mode_name, result_writer
 
 
 class MainScreen(Screen):
@@ -40,16 +48,19 @@ class MainScreen(Screen):
 
     Attributes:
         BINDINGS (List[Tuple[str, str]]): Key bindings for widget navigation.
+        focus_order (List[Widget]): Widgets in the order up and down
+                                    focus them.
     """
 
     BINDINGS = [
         ('up, w', 'previous_widget'),
-        ('down, s', 'next_widget')
+        ('down, s', 'next_widget'),
+        ('left, right, a, d', 'next_button')
     ]
 
     def __init__(self):
         """
-        Initializes the MainScreen with input fields, selectors, and button.
+        Initializes the MainScreen with input fields, selectors, and buttons.
 
         :return: None
         """
@@ -60,15 +71,31 @@ class MainScreen(Screen):
         self.theme_selector = self.create_theme_selector()
         self.color_selector = self.create_color_selector()
         self.game_mode_selector = self.create_game_mode_selector()
+        self.board_selector = self.create_board_selector()
         self.play_button = self.create_play_button()
+        self.leaderboard_button = self.create_leaderboard_button()
         self.main_container = Container(
             self.input_field,
             self.theme_selector,
             self.color_selector,
             self.game_mode_selector,
-            self.play_button,
+            self.board_selector,
+            Horizontal(
+                self.play_button,
+                self.leaderboard_button,
+                classes='menu_buttons'
+            ),
             classes='main_container'
         )
+        self.focus_order = [
+            self.input_field,
+            self.theme_selector,
+            self.color_selector,
+            self.game_mode_selector,
+            self.board_selector,
+            self.play_button,
+            self.leaderboard_button
+        ]
 
     def create_input_field(self) -> Input:
         """
@@ -188,13 +215,44 @@ class MainScreen(Screen):
         """
 
         selector = Selector(
-            options=['Easy', 'Medium', 'Hard'],
-            classes='bordered'
+            options=['Easy', 'Medium', 'Hard', 'Huge'],
+            classes='bordered',
+            on_change=lambda x: self.prepare_boards()
         )
         selector.current_index = 0
         selector.border_title = 'Difficulty'
         return selector
 
+    def create_board_selector(self) -> Selector:
+        """
+        Creates a selector for random or no-guess boards.
+
+        :return: Configured board Selector.
+        :rtype: Selector
+        """
+
+        selector = Selector(
+            options=['Random', 'No guess'],
+            classes='bordered',
+            on_change=lambda x: self.prepare_boards()
+        )
+        selector.current_index = 0
+        selector.border_title = 'Board'
+        return selector
+
+    def prepare_boards(self) -> None:
+        """
+        Starts generating no-guess boards of the selected difficulty in
+        the background, so the game can start without waiting.
+
+        :return: None
+        """
+
+        if self.board_selector.value == 'No guess':
+            # Deferred so the main menu starts without loading numpy
+            from no_guess import board_cache  # pylint: disable=C0415
+            board_cache().fill(self.game_mode_selector.value)
+
     def create_play_button(self) -> Button:
         """
         Creates the play button for starting the game.
@@ -204,7 +262,23 @@ class MainScreen(Screen):
         """
 
         button = Button("Play", id="play_button", classes='bordered')
-        button.styles.width = 40
+        button.styles.width = 20
+        return button
+
+    def create_leaderboard_button(self) -> Button:
+        """
+        Creates the button for showing the leaderboard.
+
+        :return: Configured Leaderboard button.
+        :rtype: Button
+        """
+
+        button = Button(
+            "Leaderboard",
+            id="leaderboard_button",
+            classes='bordered'
+        )
+        button.styles.width = 20
         return button
 
     def compose(self) -> ComposeResult:
@@ -236,7 +310,7 @@ class MainScreen(Screen):
         :rtype: int or None
         """
 
-        for index, widget in enumerate(self.main_container.children):
+        for index, widget in enumerate(self.focus_order):
             if widget.has_focus:
                 return index
 
@@ -250,8 +324,8 @@ class MainScreen(Screen):
         """
 
         focused = self.get_focused_widget()
-        next_widget_index = (focused + 1) % len(self.main_container.children)
-        self.main_container.children[next_widget_index].focus()
+        next_widget_index = (focused + 1) % len(self.focus_order)
+        self.focus_order[next_widget_index].focus()
 
     def action_previous_widget(self) -> None:
         """
@@ -261,8 +335,20 @@ class MainScreen(Screen):
         """
 
         focused = self.get_focused_widget()
-        next_widget_index = (focused - 1) % len(self.main_container.children)
-        self.main_container.children[next_widget_index].focus()
+        next_widget_index = (focused - 1) % len(self.focus_order)
+        self.focus_order[next_widget_index].focus()
+
+    def action_next_button(self) -> None:
+        """
+        Moves the focus between the Play and Leaderboard buttons.
+
+        :return: None
+        """
+
+        if self.play_button.has_focus:
+            self.leaderboard_button.focus()
+        elif self.leaderboard_button.has_focus:
+            self.play_button.focus()
 
     def validate_player_name(self) -> str | None:
         """
@@ -282,7 +368,7 @@ class MainScreen(Screen):
                 if player_name
                 else 'Please enter your name'
             )
-            self.main_container.children[0].focus()
+            self.input_field.focus()
             return None
 
         # Validate player name with allowed characters
@@ -291,7 +377,7 @@ class MainScreen(Screen):
             self.input_field.placeholder = (
                 'Only use letters, spaces, hyphens'
             )
-            self.main_container.children[0].focus()
+            self.input_field.focus()
             return None
 
         return player_name.capitalize()
@@ -305,13 +391,25 @@ class MainScreen(Screen):
         :return: None
         """
 
+        if event.button.id == "leaderboard_button":
+            player_name = self.input_field.value.strip().capitalize()
+            self.app.push_screen(
+                LeaderboardScreen(
+                    game_mode=self.game_mode_selector.value,
+                    player_name=player_name or None,
+                    no_guess=self.board_selector.value == 'No guess'
+                )
+            )
+            return
+
         player_name = self.validate_player_name()
         if player_name and event.button.id == "play_button":
             game_mode = self.game_mode_selector.value
             self.app.push_screen(
                 GameScreen(
                     game_mode=game_mode,
-                    player_name=player_name
+                    player_name=player_name,
+                    no_guess=self.board_selector.value == 'No guess'
                 )
             )
 
@@ -333,18 +431,30 @@ class GameScreen(Screen):
     """
     Screen for the game where the Minesweeper game is played.
 
+    Every game is recorded to a replay log until it ends or the screen
+    is left; games are played unrecorded if no log can be written. The
+    times of won games are queued for the leaderboard's writer.
+
     Attributes:
         BINDINGS (List[Tuple[str, str]]): Key bindings for quitting the game.
+        CANVAS_CELLS (int): Boards with more cells are drawn by a
+                            MinefieldCanvas instead of buttons.
+        recorder (ReplayRecorder | None): Replay log of the game.
+        leaderboard_mode (str): Game mode of the leaderboard results.
     """
 
     BINDINGS = [
         ('escape, q', 'quit_game')
     ]
 
+    CANVAS_CELLS = 50 * 50
+
     def __init__(
             self,
             game_mode: str,
             player_name: str,
+            use_canvas: Optional[bool] = None,
+            no_guess: bool = False,
             **kwargs
     ):
         """
@@ -354,6 +464,12 @@ class GameScreen(Screen):
         :type game_mode: str
         :param player_name: The name of the player.
         :type player_name: str
+        :param use_canvas: Draw the board as a single widget, decided
+                           by the board size when not given.
+        :type use_canvas: bool, optional
+        :param no_guess: Play a board that can be solved without
+                         guessing from its marked start cell.
+        :type no_guess: bool
         :param kwargs: Additional keyword arguments.
         :type kwargs: dict
         :return: None
@@ -361,6 +477,7 @@ class GameScreen(Screen):
 
         super().__init__(**kwargs)
         self.player_name = player_name
+        self.leaderboard_mode = mode_name(game_mode, no_guess)
         self.game_mode = GameMode[game_mode.upper()].value
         self.grid_size = self.game_mode['grid_size']
         self.mine = self.game_mode['mine']
@@ -373,13 +490,30 @@ class GameScreen(Screen):
             value='00:00',
             classes='digits'
         )
-        self.game_board = MinefieldUI(
+        if use_canvas is None:
+            cols, rows = self.grid_size
+            use_canvas = cols * rows > self.CANVAS_CELLS
+
+        game_matrix = start_position = None
+        if no_guess:
+            from no_guess import board_cache  # pylint: disable=C0415
+            board = board_cache().take(game_mode)
+            if board is not None:  # Else a random board is deferred
+                game_matrix, start_position = board
+
+        board_class = MinefieldCanvas if use_canvas else MinefieldUI
+        self.game_board = board_class(
             grid_size=self.grid_size,
             number_of_mine=self.mine,
             on_game_over=self.toggle_game_over_modal,
-            on_flag=self.update_flag_counter
+            on_flag=self.update_flag_counter,
+            on_move=self.handle_move,
+            game_matrix=game_matrix,
+            start_position=start_position
         )
         self.update_flag_counter(self.mine)
+        self.recorder = None
+        self.start_recording()
 
     def compose(self) -> ComposeResult:
         """
@@ -407,21 +541,28 @@ class GameScreen(Screen):
                 f'{Icons.DOWN.value} '
                 f'{Icons.RIGHT.value} / w, a, s, d ': 'Move',
                 'enter': 'Hit',
-                'space/f': 'Place flag'
+                'space/f': 'Flag',
+                'c': 'Chord',
+                'h': 'Hint',
+                'p': 'Probabilities'
             }
         )
 
-    def on_key(self, event: events.Key) -> None:
+    def handle_move(self, move: Move, position: tuple) -> None:
         """
-        Handles key events to start the timer when appropriate.
+        Starts the timer on the first move, whether played with the
+        keyboard or the mouse, and records the move.
 
-        :param event: The key event.
-        :type event: events.Key
+        :param move: The move played.
+        :type move: Move
+        :param position: Coordinates of the cell.
+        :type position: tuple
         :return: None
         """
 
-        if event.key in ('enter', 'space') and not self.game_board.is_playing:
+        if self.start_time is None:
             self.start_timer()
+        self.record_move(move, position)
 
     def start_timer(self) -> None:
         """
@@ -457,6 +598,73 @@ class GameScreen(Screen):
 
         self.flag_counter.update(f'{value:02}')
 
+    def start_recording(self) -> None:
+        """
+        Starts the replay log of the game.
+
+        :return: None
+        """
+
+        from replay import record_game  # pylint: disable=C0415
+        try:
+            self.recorder = record_game(self.game_board.game)
+        except OSError:  # No writable replay directory, play unrecorded
+            self.recorder = None
+
+    def record_move(self, move: Move, position: tuple) -> None:
+        """
+        Appends a move to the replay log.
+
+        :param move: The move played.
+        :type move: Move
+        :param position: Coordinates of the cell.
+        :type position: tuple
+        :return: None
+        """
+
+        if self.recorder is not None:
+            self.recorder.record(move, position)
+
+    def stop_recording(self) -> None:
+        """
+        Writes out and closes the replay log.
+
+        :return: None
+        """
+
+        if self.recorder is not None:
+            try:
+                self.recorder.close()
+            except OSError:  # The log is lost, the game goes on
+                pass
+            self.recorder = None
+
+    def add_result(self) -> None:
+        """
+        Adds the time of the won game to the leaderboard.
+
+        :return: None
+        """
+
+        if self.start_time is None:
+            return
+
+        # Written by a worker thread, so the game over modal never waits
+        result_writer().submit(
+            self.player_name,
+            self.leaderboard_mode,
+            int((time.time() - self.start_time) * 1000)
+        )
+
+    def on_unmount(self) -> None:
+        """
+        Closes the replay log when the screen is removed.
+
+        :return: None
+        """
+
+        self.stop_recording()
+
     def action_quit_game(self) -> None:
         """
         Handles quitting the game and returning to the previous screen.
@@ -464,6 +672,7 @@ class GameScreen(Screen):
         :return: None
         """
 
+        self.stop_recording()
         self.app.pop_screen()
 
     def toggle_game_over_modal(self, completed):
@@ -475,6 +684,9 @@ class GameScreen(Screen):
         :return: None
         """
 
+        self.stop_recording()
+        if completed:
+            self.add_result()
         modal = GameOverScreen(
             player_name=self.player_name,
             timer=self.timer.value,
@@ -483,15 +695,173 @@ class GameScreen(Screen):
         self.app.push_screen(modal)
 
 
+class LeaderboardScreen(Screen):
+    """
+    Screen showing the fastest times of a game mode and the rank of
+    the player's best time.
+
+    Attributes:
+        BINDINGS (List[Tuple[str, str]]): Key bindings for navigation.
+        LIMIT (int): Number of top results shown.
+    """
+
+    BINDINGS = [
+        ('escape, q', 'close'),
+        ('up, w, down, s', 'switch_selector')
+    ]
+
+    LIMIT = 10
+
+    def __init__(
+            self,
+            game_mode: str = 'Easy',
+            player_name: Optional[str] = None,
+            no_guess: bool = False,
+            **kwargs
+    ):
+        """
+        Initializes the LeaderboardScreen with the mode to show.
+
+        :param game_mode: The difficulty shown first.
+        :type game_mode: str
+        :param player_name: Name of the player to rank, if any.
+        :type player_name: str, optional
+        :param no_guess: Show the results of no-guess boards first.
+        :type no_guess: bool
+        :param kwargs: Additional keyword arguments.
+        :type kwargs: dict
+        :return: None
+        """
+
+        super().__init__(**kwargs)
+        self.player_name = player_name
+        difficulties = ['Easy', 'Medium', 'Hard', 'Huge']
+        self.game_mode_selector = Selector(
+            options=difficulties,
+            current_index=difficulties.index(game_mode),
+            classes='bordered',
+            on_change=lambda x: self.update_standings(),
+            width=30
+        )
+        self.game_mode_selector.border_title = 'Difficulty'
+        self.board_selector = Selector(
+            options=['Random', 'No guess'],
+            current_index=int(no_guess),
+            classes='bordered',
+            on_change=lambda x: self.update_standings(),
+            width=30
+        )
+        self.board_selector.border_title = 'Board'
+        self.table = Static(classes='bordered leaderboard')
+        self.table.border_title = 'Fastest times'
+
+    def compose(self) -> ComposeResult:
+        """
+        Yields the layout components for the LeaderboardScreen.
+
+        :return: Layout components for the screen.
+        :rtype: ComposeResult
+        """
+
+        yield Horizontal(
+            Label(f'{Icons.BOMB.value} Leaderboard {Icons.BOMB.value}'),
+            classes='header'
+        )
+        yield Container(
+            Horizontal(
+                self.game_mode_selector,
+                self.board_selector,
+                classes='selectors'
+            ),
+            self.table,
+            classes='main_container'
+        )
+        yield ControlsFooter(
+            bindings={
+                'esc/q': 'Back',
+                f'{Icons.UP.value} {Icons.DOWN.value} / w, s ': 'Up & Down',
+                f'{Icons.LEFT.value} {Icons.RIGHT.value} / a, d ': 'Switch'
+            }
+        )
+
+    def on_mount(self) -> None:
+        """
+        Focuses the difficulty and shows its standings.
+
+        :return: None
+        """
+
+        self.game_mode_selector.focus()
+        self.update_standings()
+
+    def update_standings(self) -> None:
+        """
+        Loads and shows the standings of the selected mode.
+
+        :return: None
+        """
+
+        game_mode = mode_name(
+            self.game_mode_selector.options[
+                self.game_mode_selector.current_index
+            ],
+            self.board_selector.current_index == 1
+        )
+        try:
+            top, rank, best = leaderboard().standings(
+                game_mode,
+                self.player_name,
+                self.LIMIT
+            )
+        except (OSError, sqlite3.Error):
+            self.table.update('The leaderboard is unavailable')
+            return
+
+        lines = [
+            f'{place:>2}. {player:<12}{format_time(time_ms):>12}'
+            for place, (player, time_ms) in enumerate(top, start=1)
+        ] or ['No games won yet']
+        if rank is not None:
+            lines.append('')
+            lines.append(
+                f'{self.player_name}: #{rank} in {format_time(best)}'
+            )
+        self.table.update('\n'.join(lines))
+
+    def action_switch_selector(self) -> None:
+        """
+        Moves the focus to the other selector.
+
+        :return: None
+        """
+
+        if self.game_mode_selector.has_focus:
+            self.board_selector.focus()
+        else:
+            self.game_mode_selector.focus()
+
+    def action_close(self) -> None:
+        """
+        Returns to the previous screen.
+
+        :return: None
+        """
+
+        self.app.pop_screen()
+
+
 class MinesweeperApp(App):
     """
     Main application class for the Minesweeper game.
 
     Attributes:
         CSS_PATH (str): Path to the CSS file for styling.
+        EXIT_FLUSH_TIMEOUT (float): Seconds the exit waits at most for
+                                    queued results to be written.
     """
 
     CSS_PATH = 'style.tcss'
+    EXIT_FLUSH_TIMEOUT = 5.0
 
     def on_mount(self) -> None:
         """
@@ -503,6 +873,20 @@ class MinesweeperApp(App):
 
         self.push_screen(MainScreen())
 
+    async def on_unmount(self) -> None:
+        """
+        Waits for the results still queued when the application exits,
+        off the event loop that other sessions may share. The writer
+        stays open for them and is closed when the process exits.
+
+        :return: None
+        """
+
+        await asyncio.to_thread(
+            result_writer().flush,
+            self.EXIT_FLUSH_TIMEOUT
+        )
+
 
 if __name__ == '__main__':
     MinesweeperApp().run()
@@ -0,0 +1,255 @@
+"""
+Command line runner that simulates Minesweeper games in bulk.
+
+Games are played headlessly by a built-in automated player on top of
+`GameSession`, spread over a pool of worker processes. Every worker
+plays a whole batch of games and returns aggregated counters only, so
+millions of games cost one small message per batch. The report is used
+to tune the difficulty presets in `configurations.GameMode`.
+
+Functions:
+    play_game: Plays one game with the automated player.
+    simulate_batch: Plays a batch of games and aggregates the results.
+    simulate: Spreads a number of games over a process pool.
+    main: Parses the command line and prints the report.
+
+Usage:
+    python simulate.py --mode Hard --games 100000
+"""
+
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from configurations import GameMode, GameState
+from game_logic import GameSession, MinefieldLogic, neighbour_sum
+
+
+def _neighbours(plane: np.ndarray, padded: np.ndarray) -> np.ndarray:
+    """
+    Counts the set cells in the 3x3 neighbourhood of every cell.
+
+    The plane is copied into the inside of a reused padded buffer
+    whose border stays zero, avoiding an allocation per count.
+
+    :param plane: Boolean plane of the board.
+    :type plane: np.ndarray
+    :param padded: Zero-bordered uint8 buffer one cell larger per side.
+    :type padded: np.ndarray
+    :return: Neighbourhood counts, the cell itself included.
+    :rtype: np.ndarray
+    """
+
+    padded[1:-1, 1:-1] = plane
+    return neighbour_sum(padded)
+
+
+def play_game(session: GameSession, rng: np.random.Generator) -> Counter:
+    """
+    Plays one game to the end with the automated player.
+
+    The player applies the two single-cell deduction rules to every
+    uncovered number at once: a number with all its mines flagged makes
+    its other covered neighbours safe, and a number with as many
+    covered neighbours as missing mines makes them all mines. When no
+    rule applies it flags the rest of the board if only mines remain,
+    and otherwise guesses a random covered cell.
+
+    :param session: A new game to play.
+    :type session: GameSession
+    :param rng: Random generator used for guesses.
+    :type rng: np.random.Generator
+    :return: Counters for the game (games, wins, clicks, guesses).
+    :rtype: Counter
+    """
+
+    game = session.game
+    matrix = game.game_matrix.astype(np.int16)
+    flags = np.zeros_like(game.revealed)
+    padded = np.zeros((game.rows + 2, game.cols + 2), dtype=np.uint8)
+    stats = Counter(games=1, clicks=0, guesses=0)
+
+    while not session.is_over:
+        covered = ~game.revealed & ~flags
+        hidden = _neighbours(covered, padded)
+        frontier = game.revealed & (hidden > 0)
+        missing = np.where(frontier, matrix, 0) - _neighbours(flags, padded)
+
+        mines = covered & (
+            _neighbours(frontier & (missing == hidden), padded) > 0
+        )
+        safe = covered & ~mines & (
+            _neighbours(frontier & (missing == 0), padded) > 0
+        )
+
+        if not mines.any() and not safe.any():
+            cells = np.argwhere(covered)
+            if len(cells) == session.remaining_flags:
+                mines = covered
+            else:
+                stats['guesses'] += 1
+                safe[tuple(cells[rng.integers(len(cells))])] = True
+
+        for position in map(tuple, np.argwhere(mines)):
+            session.toggle_flag(position)
+            flags[position] = True
+
+        for position in map(tuple, np.argwhere(safe)):
+            if not session.is_over and not game.revealed[position]:
+                stats['clicks'] += 1
+                session.reveal(position)
+
+    stats['wins'] = int(session.state is GameState.WON)
+    return stats
+
+
+def simulate_batch(
+        mode: str,
+        games: int,
+        seed: np.random.SeedSequence
+) -> Counter:
+    """
+    Plays a batch of games and aggregates their counters.
+
+    All the boards of the batch are generated up front as one array
+    by MinefieldLogic.generate_batch.
+
+    :param mode: Name of the GameMode to play.
+    :type mode: str
+    :param games: Number of games in the batch.
+    :type games: int
+    :param seed: Seed of the batch, for boards and guesses alike.
+    :type seed: np.random.SeedSequence
+    :return: Summed counters of the batch.
+    :rtype: Counter
+    """
+
+    settings = GameMode[mode.upper()].value
+    cols, rows = settings['grid_size']
+    board_seed, player_seed = seed.spawn(2)
+    boards = MinefieldLogic.generate_batch(
+        games,
+        cols=cols,
+        rows=rows,
+        number_of_mines=settings['mine'],
+        seed=board_seed
+    )
+    rng = np.random.default_rng(player_seed)
+
+    stats = Counter()
+    for board in boards:
+        session = GameSession(game=MinefieldLogic(game_matrix=board))
+        stats += play_game(session, rng)
+
+    return stats
+
+
+def simulate(
+        mode: str,
+        games: int,
+        workers: Optional[int] = None,
+        batch_size: int = 1_000,
+        seed: Optional[int] = None
+) -> Counter:
+    """
+    Plays a number of games spread over a pool of processes.
+
+    :param mode: Name of the GameMode to play.
+    :type mode: str
+    :param games: Total number of games.
+    :type games: int
+    :param workers: Number of worker processes, all cores by default.
+    :type workers: int, optional
+    :param batch_size: Number of games played per task.
+    :type batch_size: int
+    :param seed: Seed for reproducible runs.
+    :type seed: int, optional
+    :return: Summed counters of all the games.
+    :rtype: Counter
+    """
+
+    sizes: List[int] = [batch_size] * (games // batch_size)
+    if games % batch_size:
+        sizes.append(games % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    stats = Counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in executor.map(
+                simulate_batch,
+                [mode] * len(sizes),
+                sizes,
+                seeds
+        ):
+            stats += batch
+
+    return stats
+
+
+def main() -> None:
+    """
+    Parses the command line, runs the simulation and prints a report.
+
+    :return: None
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Simulate Minesweeper games with an automated player.'
+    )
+    parser.add_argument(
+        '--mode',
+        default='Easy',
+        choices=[mode.name.capitalize() for mode in GameMode],
+        help='difficulty to play (default: Easy)'
+    )
+    parser.add_argument(
+        '--games',
+        type=int,
+        default=10_000,
+        help='number of games to play (default: 10000)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count(),
+        help='number of worker processes (default: all cores)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=1_000,
+        help='games played per worker task (default: 1000)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='seed for a reproducible run'
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = simulate(
+        args.mode,
+        args.games,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        seed=args.seed
+    )
+    elapsed = time.perf_counter() - start
+
+    games = stats['games']
+    print(f'Mode:          {args.mode}')
+    print(f'Games:         {games}')
+    print(f'Win rate:      {stats["wins"] / games:.2%}')
+    print(f'Avg clicks:    {stats["clicks"] / games:.2f}')
+    print(f'Avg guesses:   {stats["guesses"] / games:.2f}')
+    print(f'Games/second:  {games / elapsed:,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,795 @@
+"""
+This module deduces safe cells and mines from what a Minesweeper
+player can see: the uncovered numbers and the placed flags. It never
+reads the value of a covered cell, so its moves are the ones a perfect
+player could make without guessing.
+
+Classes:
+    MinefieldSolver: Deduces the safe cells and mines of a position.
+    MineProbabilities: Keeps mine probabilities up to date between moves.
+
+Functions:
+    auto_play: Plays a game with the solver until it has to guess.
+
+Usage:
+    Create a `MinefieldSolver` from a `GameSession` with
+    `from_session` and call `solve` for every deduction at once, or
+    `hint` for a single move. Pass it to `MineProbabilities.update`
+    after every move for the mine probability of each covered cell.
+"""
+
+from math import lgamma
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from game_logic import GameSession, neighbour_sum
+
+
+class MinefieldSolver:
+    """
+    Deduces safe cells and mines from the visible state of a board.
+
+    Deductions are made in three stages, each only run when the
+    previous ones are stuck:
+
+    1. Single-cell rules on every uncovered number at once: a number
+       with all its mines known makes its other covered neighbours
+       safe, and a number with as many covered neighbours as missing
+       mines makes them all mines.
+    2. Subset rules between pairs of numbers: when the covered
+       neighbours of one number are a subset of another's, the cells
+       only the second one touches hold the difference of their
+       missing mines.
+    3. Exact enumeration of every small frontier component, the
+       covered cells linked through the numbers they touch: a cell
+       that is a mine in every or in no valid arrangement is decided.
+
+    Flags are trusted to be mines. Enumeration stops at MAX_NODES
+    search nodes per component, leaving larger components undecided.
+    Enumerated components are stored in `cache` when one is given,
+    keyed by their constraints, so solvers of later positions sharing
+    the cache skip every component a move left unchanged.
+
+    Attributes:
+        MAX_NODES (int): Search nodes allowed per enumerated component.
+        cache (dict | None): Enumerated components by constraints.
+        rows (int): Number of rows in the game grid.
+        cols (int): Number of columns in the game grid.
+        values (np.ndarray): Uncovered values, zero on covered cells.
+        revealed (np.ndarray): Boolean plane of uncovered cells.
+        flagged (np.ndarray): Boolean plane of flagged cells.
+        number_of_mines (int | None): Mines on the board, if known.
+    """
+
+    MAX_NODES = 5_000
+
+    def __init__(
+            self,
+            values: np.ndarray,
+            revealed: np.ndarray,
+            flagged: np.ndarray,
+            number_of_mines: Optional[int] = None,
+            cache: Optional[dict] = None
+    ):
+        """
+        Initializes the MinefieldSolver with the visible board state.
+
+        :param values: Board values; only uncovered ones are read.
+        :type values: np.ndarray
+        :param revealed: Boolean plane of uncovered cells.
+        :type revealed: np.ndarray
+        :param flagged: Boolean plane of flagged cells.
+        :type flagged: np.ndarray
+        :param number_of_mines: Mines on the board, if known.
+        :type number_of_mines: int, optional
+        :param cache: Enumerated components shared between solvers.
+        :type cache: dict, optional
+        :return: None
+        """
+
+        self.rows, self.cols = revealed.shape
+        self.revealed = revealed.astype(bool)
+        self.values = np.where(self.revealed, values, 0).astype(np.int16)
+        self.flagged = flagged.astype(bool) & ~self.revealed
+        self.number_of_mines = number_of_mines
+        self.cache = cache
+        self._padded = np.zeros((self.rows + 2, self.cols + 2), dtype=np.uint8)
+
+    @classmethod
+    def from_session(cls, session: GameSession) -> 'MinefieldSolver':
+        """
+        Creates a solver for the visible state of a game.
+
+        :param session: A game on a MinefieldLogic board.
+        :type session: GameSession
+        :return: Solver for the session's current position.
+        :rtype: MinefieldSolver
+        """
+
+        game = session.game
+        flagged = np.zeros_like(game.revealed)
+        if session.placed_flags:
+            flagged[tuple(np.array(list(session.placed_flags)).T)] = True
+
+        return cls(
+            game.game_matrix,
+            game.revealed,
+            flagged,
+            game.number_of_mines
+        )
+
+    def _neighbours(self, plane: np.ndarray) -> np.ndarray:
+        """
+        Counts the set cells in the 3x3 neighbourhood of every cell.
+
+        :param plane: Boolean plane of the board.
+        :type plane: np.ndarray
+        :return: Neighbourhood counts, the cell itself included.
+        :rtype: np.ndarray
+        """
+
+        self._padded[1:-1, 1:-1] = plane
+        return neighbour_sum(self._padded).astype(np.int16)
+
+    def solve(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds every covered cell that is certainly safe or a mine.
+
+        :return: Boolean planes of the safe cells and of the mines not
+                 flagged yet.
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+
+        mines, safe = self._propagate(enumerate_components=True)
+        return safe, mines & ~self.flagged
+
+    def _propagate(
+            self,
+            enumerate_components: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Applies the rules until none of them decides another cell.
+
+        :param enumerate_components: Whether to run the enumeration and
+                                     mine count stages.
+        :type enumerate_components: bool
+        :return: Boolean planes of the known mines and safe cells.
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+
+        numbers = self.revealed & (self.values < 9)
+        mines = self.flagged.copy()
+        safe = np.zeros_like(mines)
+
+        while True:
+            unknown = ~self.revealed & ~mines & ~safe
+            if not self._single_cell_rules(numbers, unknown, mines, safe):
+                constraints = self._constraints(numbers, mines, safe)
+                if not (
+                        self._subset_rules(constraints, mines, safe)
+                        or enumerate_components and (
+                            self._enumeration_rules(constraints, mines, safe)
+                            or self._mine_count_rule(mines, safe)
+                        )
+                ):
+                    break
+
+        return mines, safe
+
+    def probabilities(self) -> np.ndarray:
+        """
+        Computes the chance of every covered cell being a mine.
+
+        Cells the rules decide get 0 or 1. Every other frontier cell
+        gets the share of arrangements putting a mine on it, each
+        arrangement of the whole board weighted by the ways to place
+        the remaining mines on the cells away from the frontier, which
+        all share one probability. Cells of components too large to
+        enumerate count as away from the frontier.
+
+        :return: Probabilities, NaN on uncovered cells and, when the
+                 number of mines is unknown, away from the frontier.
+        :rtype: np.ndarray
+        """
+
+        mines, safe = self._propagate(enumerate_components=False)
+        numbers = self.revealed & (self.values < 9)
+        masks, cells = self._constraints(numbers, mines, safe)
+        chance = np.full((self.rows, self.cols), np.nan)
+        chance[mines] = 1
+        chance[safe] = 0
+
+        components = []
+        others = ~self.revealed & ~mines & ~safe
+        for component in self._components(masks):
+            enumerated = self._enumerate(component, cells)
+            if enumerated is not None:
+                components.append(enumerated)
+                others[tuple(np.array(enumerated[0]).T)] = False
+
+        if self.number_of_mines is None:
+            for positions, results in components:
+                solutions = sum(total for total, _ in results.values())
+                counts = np.sum([found for _, found in results.values()], 0)
+                chance[tuple(np.array(positions).T)] = counts / solutions
+            return chance
+
+        # Arrangements of each component by mine count, and the weight
+        # of each frontier total: the ways the leftover mines fit on the
+        # other cells. Both are scaled freely, as only ratios matter
+        remaining = self.number_of_mines - int(np.count_nonzero(mines))
+        free = int(np.count_nonzero(others))
+        distributions = []
+        for _, results in components:
+            distribution = np.zeros(max(results) + 1)
+            for placed, (total, _) in results.items():
+                distribution[placed] = total
+            distributions.append(distribution / distribution.max())
+
+        prefixes = [np.ones(1)]
+        for distribution in distributions:
+            prefix = np.convolve(prefixes[-1], distribution)
+            prefixes.append(prefix / prefix.max())
+        weights = _placement_weights(free, remaining, len(prefixes[-1]))
+        norm = prefixes[-1] @ weights
+        if not norm:  # The flags contradict the numbers
+            return chance
+
+        if free:
+            leftover = remaining - np.arange(len(weights))
+            chance[others] = prefixes[-1] @ (weights * leftover) / (
+                norm * free
+            )
+
+        suffix = np.ones(1)
+        for index in range(len(components) - 1, -1, -1):
+            positions, results = components[index]
+            rest = np.convolve(prefixes[index], suffix)
+            suffix = np.convolve(suffix, distributions[index])
+            suffix /= suffix.max()
+
+            placed = np.array(list(results))
+            totals = np.array([total for total, _ in results.values()])
+            counts = np.array([found for _, found in results.values()])
+            placed_weights = np.array([
+                rest @ weights[mine_count:mine_count + len(rest)]
+                for mine_count in placed
+            ])
+            component_norm = placed_weights @ totals
+            if component_norm:
+                chance[tuple(np.array(positions).T)] = (
+                    placed_weights @ counts / component_norm
+                )
+
+        return chance
+
+    def hint(
+            self,
+            near: Optional[Tuple[int, int]] = None
+    ) -> Optional[Tuple[Tuple[int, int], bool]]:
+        """
+        Finds one certain move, preferring safe cells to mines.
+
+        :param near: Position the move should be closest to.
+        :type near: Tuple[int, int], optional
+        :return: The cell and whether it is a mine, or None if every
+                 move is a guess.
+        :rtype: Tuple[Tuple[int, int], bool] or None
+        """
+
+        safe, mines = self.solve()
+        for plane, is_mine in ((safe, False), (mines, True)):
+            cells = np.argwhere(plane)
+            if len(cells):
+                if near is not None:
+                    distance = np.abs(cells - near).max(axis=1)
+                    cells = cells[np.argsort(distance, kind='stable')]
+                return tuple(cells[0].tolist()), is_mine
+
+        return None
+
+    def _single_cell_rules(
+            self,
+            numbers: np.ndarray,
+            unknown: np.ndarray,
+            mines: np.ndarray,
+            safe: np.ndarray
+    ) -> bool:
+        """
+        Applies the single-cell rules to every number at once.
+
+        :param numbers: Boolean plane of uncovered numbers.
+        :type numbers: np.ndarray
+        :param unknown: Boolean plane of undecided covered cells.
+        :type unknown: np.ndarray
+        :param mines: Plane of known mines, updated in place.
+        :type mines: np.ndarray
+        :param safe: Plane of known safe cells, updated in place.
+        :type safe: np.ndarray
+        :return: True if any cell was decided, otherwise False.
+        :rtype: bool
+        """
+
+        hidden = self._neighbours(unknown)
+        missing = self.values - self._neighbours(mines)
+        active = numbers & (hidden > 0)
+
+        new_mines = unknown & (
+            self._neighbours(active & (missing == hidden)) > 0
+        )
+        new_safe = unknown & ~new_mines & (
+            self._neighbours(active & (missing == 0)) > 0
+        )
+        mines |= new_mines
+        safe |= new_safe
+        return bool(new_mines.any() or new_safe.any())
+
+    def _constraints(
+            self,
+            numbers: np.ndarray,
+            mines: np.ndarray,
+            safe: np.ndarray
+    ) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """
+        Builds a constraint for every number touching undecided cells.
+
+        Undecided frontier cells are numbered, and each constraint is a
+        bit mask of the cells a number touches with the count of mines
+        among them.
+
+        :param numbers: Boolean plane of uncovered numbers.
+        :type numbers: np.ndarray
+        :param mines: Boolean plane of known mines.
+        :type mines: np.ndarray
+        :param safe: Boolean plane of known safe cells.
+        :type safe: np.ndarray
+        :return: Constraints as (mask, mines) and the frontier cells.
+        :rtype: Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]
+        """
+
+        unknown = ~self.revealed & ~mines & ~safe
+        missing = (self.values - self._neighbours(mines)).tolist()
+        unknown_rows = unknown.tolist()
+        active = numbers & (self._neighbours(unknown) > 0)
+
+        cell_ids: Dict[Tuple[int, int], int] = {}
+        constraints = {}
+        for row, col in np.argwhere(active).tolist():
+            mask = 0
+            for pos_y in range(max(row - 1, 0), min(row + 2, self.rows)):
+                for pos_x in range(max(col - 1, 0), min(col + 2, self.cols)):
+                    if unknown_rows[pos_y][pos_x]:
+                        cell = cell_ids.setdefault(
+                            (pos_y, pos_x), len(cell_ids)
+                        )
+                        mask |= 1 << cell
+            constraints[mask] = missing[row][col]
+
+        return list(constraints.items()), list(cell_ids)
+
+    @staticmethod
+    def _decide(
+            cells: List[Tuple[int, int]],
+            mask: int,
+            plane: np.ndarray
+    ) -> None:
+        """
+        Marks the frontier cells of a bit mask on a plane.
+
+        :param cells: Frontier cells by bit number.
+        :type cells: List[Tuple[int, int]]
+        :param mask: Bit mask of the cells to mark.
+        :type mask: int
+        :param plane: Plane to mark, updated in place.
+        :type plane: np.ndarray
+        :return: None
+        """
+
+        while mask:
+            bit = mask & -mask
+            plane[cells[bit.bit_length() - 1]] = True
+            mask ^= bit
+
+    def _subset_rules(
+            self,
+            constraints: Tuple[List[Tuple[int, int]], List[Tuple[int, int]]],
+            mines: np.ndarray,
+            safe: np.ndarray
+    ) -> bool:
+        """
+        Applies the subset rule to every pair of overlapping numbers.
+
+        :param constraints: Constraints and frontier cells.
+        :type constraints: Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]
+        :param mines: Plane of known mines, updated in place.
+        :type mines: np.ndarray
+        :param safe: Plane of known safe cells, updated in place.
+        :type safe: np.ndarray
+        :return: True if any cell was decided, otherwise False.
+        :rtype: bool
+        """
+
+        masks, cells = constraints
+        by_cell: Dict[int, List[int]] = {}
+        for index, (mask, _) in enumerate(masks):
+            remaining = mask
+            while remaining:
+                bit = remaining & -remaining
+                by_cell.setdefault(bit, []).append(index)
+                remaining ^= bit
+
+        decided = False
+        for mask, count in masks:
+            lowest = mask & -mask
+            for other in by_cell[lowest]:
+                other_mask, other_count = masks[other]
+                if other_mask == mask or mask & ~other_mask:
+                    continue
+
+                rest = other_mask & ~mask
+                rest_mines = other_count - count
+                if rest_mines == 0:
+                    self._decide(cells, rest, safe)
+                    decided = True
+                elif rest_mines == rest.bit_count():
+                    self._decide(cells, rest, mines)
+                    decided = True
+
+        return decided
+
+    def _components(
+            self,
+            masks: List[Tuple[int, int]]
+    ) -> List[List[Tuple[int, int]]]:
+        """
+        Groups constraints that share frontier cells.
+
+        :param masks: Constraints as (mask, mines).
+        :type masks: List[Tuple[int, int]]
+        :return: Constraints of every frontier component.
+        :rtype: List[List[Tuple[int, int]]]
+        """
+
+        components: List[Tuple[int, List[Tuple[int, int]]]] = []
+        for constraint in masks:
+            mask, merged = constraint[0], [constraint]
+            kept = []
+            for component in components:
+                if component[0] & mask:
+                    mask |= component[0]
+                    merged += component[1]
+                else:
+                    kept.append(component)
+            components = kept + [(mask, merged)]
+
+        return [component for _, component in components]
+
+    def enumerate_component(
+            self,
+            component: List[Tuple[int, int]]
+    ) -> Optional[Tuple[List[int], Dict[int, Tuple[int, List[int]]]]]:
+        """
+        Enumerates every valid mine arrangement of a frontier component.
+
+        Cells are assigned in the order the constraints reach them, and
+        a branch is cut as soon as a constraint can no longer be met.
+
+        :param component: Constraints as (mask, mines) of the component.
+        :type component: List[Tuple[int, int]]
+        :return: The component's cell bits, and for every number of
+                 mines the count of arrangements and how many of them
+                 put a mine on each cell; None if the search exceeded
+                 MAX_NODES.
+        :rtype: Tuple[List[int], Dict[int, Tuple[int, List[int]]]] or None
+        """
+
+        order: List[int] = []
+        seen = 0
+        for mask, _ in component:
+            remaining = mask & ~seen
+            seen |= mask
+            while remaining:
+                bit = remaining & -remaining
+                order.append(bit)
+                remaining ^= bit
+
+        size = len(order)
+        need = [count for _, count in component]
+        left = [mask.bit_count() for mask, _ in component]
+        touching = [
+            [index for index, (mask, _) in enumerate(component) if mask & bit]
+            for bit in order
+        ]
+        assignment = [0] * size
+        results: Dict[int, Tuple[int, List[int]]] = {}
+        nodes = 0
+
+        def search(position: int, placed: int) -> bool:
+            nonlocal nodes
+            nodes += 1
+            if nodes > self.MAX_NODES:
+                return False
+
+            if position == size:
+                solutions, counts = results.get(placed, (0, [0] * size))
+                for cell in range(size):
+                    counts[cell] += assignment[cell]
+                results[placed] = (solutions + 1, counts)
+                return True
+
+            # Every constraint keeps need <= left, so a cell can stay
+            # clear if none needs all its cells and be a mine if none is
+            # already satisfied
+            constraints = touching[position]
+            allowed = [True, True]
+            for index in constraints:
+                if need[index] == left[index]:
+                    allowed[0] = False
+                if not need[index]:
+                    allowed[1] = False
+
+            for value in (0, 1):
+                if allowed[value]:
+                    for index in constraints:
+                        need[index] -= value
+                        left[index] -= 1
+                    assignment[position] = value
+                    finished = search(position + 1, placed + value)
+                    for index in constraints:
+                        need[index] += value
+                        left[index] += 1
+                    if not finished:
+                        return False
+
+            return True
+
+        if not search(0, 0):
+            return None
+
+        return order, results
+
+    def _enumerate(
+            self,
+            component: List[Tuple[int, int]],
+            cells: List[Tuple[int, int]]
+    ) -> Optional[Tuple[List[Tuple[int, int]], dict]]:
+        """
+        Enumerates a component, reusing the cached result if any.
+
+        :param component: Constraints as (mask, mines) of the component.
+        :type component: List[Tuple[int, int]]
+        :param cells: Frontier cells by bit number.
+        :type cells: List[Tuple[int, int]]
+        :return: The component's positions with its arrangements as
+                 from enumerate_component, or None if it is too large.
+        :rtype: Tuple[List[Tuple[int, int]], dict] or None
+        """
+
+        def positions(mask: int) -> Tuple[Tuple[int, int], ...]:
+            found = []
+            while mask:
+                bit = mask & -mask
+                found.append(cells[bit.bit_length() - 1])
+                mask ^= bit
+            return tuple(sorted(found))
+
+        key = frozenset(
+            (positions(mask), count) for mask, count in component
+        )
+        if self.cache is not None and key in self.cache:
+            enumerated = self.cache[key]
+        else:
+            found = self.enumerate_component(component)
+            if found is None:  # Cached too, by cells, to skip the search
+                every_mask = 0
+                for mask, _ in component:
+                    every_mask |= mask
+                enumerated = (list(positions(every_mask)), None)
+            else:
+                order, results = found
+                enumerated = (
+                    [cells[bit.bit_length() - 1] for bit in order],
+                    results
+                )
+            if self.cache is not None:
+                self.cache[key] = enumerated
+
+        return enumerated if enumerated[1] is not None else None
+
+    def _enumeration_rules(
+            self,
+            constraints: Tuple[List[Tuple[int, int]], List[Tuple[int, int]]],
+            mines: np.ndarray,
+            safe: np.ndarray
+    ) -> bool:
+        """
+        Decides the cells fixed in every arrangement of their component.
+
+        :param constraints: Constraints and frontier cells.
+        :type constraints: Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]
+        :param mines: Plane of known mines, updated in place.
+        :type mines: np.ndarray
+        :param safe: Plane of known safe cells, updated in place.
+        :type safe: np.ndarray
+        :return: True if any cell was decided, otherwise False.
+        :rtype: bool
+        """
+
+        masks, cells = constraints
+        decided = False
+        for component in self._components(masks):
+            enumerated = self._enumerate(component, cells)
+            if enumerated is None:
+                continue
+
+            positions, results = enumerated
+            solutions = sum(total for total, _ in results.values())
+            for cell, position in enumerate(positions):
+                mine_count = sum(
+                    counts[cell] for _, counts in results.values()
+                )
+                if mine_count == 0:
+                    safe[position] = True
+                    decided = True
+                elif mine_count == solutions:
+                    mines[position] = True
+                    decided = True
+
+        return decided
+
+    def _mine_count_rule(self, mines: np.ndarray, safe: np.ndarray) -> bool:
+        """
+        Decides every undecided cell once the mine count settles them.
+
+        :param mines: Plane of known mines, updated in place.
+        :type mines: np.ndarray
+        :param safe: Plane of known safe cells, updated in place.
+        :type safe: np.ndarray
+        :return: True if any cell was decided, otherwise False.
+        :rtype: bool
+        """
+
+        if self.number_of_mines is None:
+            return False
+
+        unknown = ~self.revealed & ~mines & ~safe
+        undecided = int(np.count_nonzero(unknown))
+        remaining = self.number_of_mines - int(np.count_nonzero(mines))
+        if not undecided or remaining not in (0, undecided):
+            return False
+
+        if remaining:
+            mines |= unknown
+        else:
+            safe |= unknown
+        return True
+
+
+class MineProbabilities:
+    """
+    Keeps the mine probabilities of a board up to date between moves.
+
+    The enumerated frontier components are kept between moves. A move
+    can only change the components within two cells of the cells it
+    uncovered or flagged, through the numbers they touch, so only
+    those are dropped and enumerated again.
+
+    Attributes:
+        cache (dict): Enumerated components by constraints.
+    """
+
+    def __init__(self):
+        """
+        Initializes the MineProbabilities with an empty cache.
+
+        :return: None
+        """
+
+        self.cache = {}
+
+    def invalidate(self, positions: Iterable[Tuple[int, int]]) -> None:
+        """
+        Drops the components near the cells changed by a move.
+
+        :param positions: Cells uncovered or flagged by the move.
+        :type positions: Iterable[Tuple[int, int]]
+        :return: None
+        """
+
+        touched = {
+            (row + pos_y, col + pos_x)
+            for row, col in positions
+            for pos_y in range(-2, 3)
+            for pos_x in range(-2, 3)
+        }
+        if not touched:
+            return
+
+        for key in [
+                key for key, enumerated in self.cache.items()
+                if not touched.isdisjoint(enumerated[0])
+        ]:
+            del self.cache[key]
+
+    def update(
+            self,
+            solver: MinefieldSolver,
+            changed: Iterable[Tuple[int, int]] = ()
+    ) -> np.ndarray:
+        """
+        Computes the probabilities after a move.
+
+        :param solver: Solver for the position after the move.
+        :type solver: MinefieldSolver
+        :param changed: Cells uncovered or flagged by the move.
+        :type changed: Iterable[Tuple[int, int]]
+        :return: Mine probability of every covered cell.
+        :rtype: np.ndarray
+        """
+
+        self.invalidate(changed)
+        solver.cache = self.cache
+        return solver.probabilities()
+
+
+def _placement_weights(free: int, remaining: int, totals: int) -> np.ndarray:
+    """
+    Weighs every frontier mine total by the ways to place the rest.
+
+    The weight of a total is the binomial coefficient of the leftover
+    mines among the free cells, computed from log-gamma and scaled so
+    the largest weight is 1, as the coefficients overflow floats on
+    large boards.
+
+    :param free: Covered cells away from the frontier.
+    :type free: int
+    :param remaining: Mines not flagged or deduced.
+    :type remaining: int
+    :param totals: Number of frontier totals to weigh, from zero.
+    :type totals: int
+    :return: Weight of every frontier total.
+    :rtype: np.ndarray
+    """
+
+    leftover = remaining - np.arange(totals)
+    valid = (leftover >= 0) & (leftover <= free)
+    logs = np.full(totals, -np.inf)
+    logs[valid] = [
+        lgamma(free + 1) - lgamma(mines + 1) - lgamma(free - mines + 1)
+        for mines in leftover[valid].tolist()
+    ]
+    if not valid.any():
+        return np.zeros(totals)
+
+    return np.exp(logs - logs.max())
+
+
+def auto_play(session: GameSession) -> int:
+    """
+    Plays a game with the solver's certain moves until it has to guess.
+
+    Every round applies all the deductions of one solve: mines are
+    flagged and safe cells uncovered.
+
+    :param session: The game to play, already started.
+    :type session: GameSession
+    :return: Number of moves made.
+    :rtype: int
+    """
+
+    moves = 0
+    while not session.is_over:
+        safe, mines = MinefieldSolver.from_session(session).solve()
+        if not safe.any() and not mines.any():
+            break
+
+        for position in map(tuple, np.argwhere(mines).tolist()):
+            moves += session.toggle_flag(position)
+        for position in map(tuple, np.argwhere(safe).tolist()):
+            if session.is_over:
+                break
+            if not session.game.is_revealed(position):
+                session.reveal(position)
+                moves += 1
+
+    return moves
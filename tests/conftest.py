@@ -0,0 +1,28 @@
+"""
+Shared pytest configuration for the Minesweeper tests.
+
+The game modules live at the top of the repository rather than in a
+package, so the repository root is put on the import path.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_configure(config):
+    """
+    Registers the markers of the Minesweeper tests.
+
+    Tests marked slow load large data sets; skip them with
+    `pytest -m "not slow"`.
+
+    :param config: The pytest configuration.
+    :type config: pytest.Config
+    :return: None
+    """
+
+    config.addinivalue_line(
+        'markers', 'slow: loads a large data set, deselect with -m "not slow"'
+    )
@@ -0,0 +1,159 @@
+"""
+Tests for the boards that do not hold a dense matrix: the seeded mine
+placement of CompactMinefieldLogic and the lazily generated chunks of
+ChunkedMinefieldLogic.
+"""
+
+import numpy as np
+import pytest
+
+from game_logic import (
+    ChunkedMinefieldLogic,
+    CompactMinefieldLogic,
+    MinefieldLogic
+)
+
+
+class _SmallBands(CompactMinefieldLogic):
+    """
+    Compact board generated over many small bands.
+
+    Attributes:
+        BAND_CELLS (int): Number of cells generated per band.
+    """
+
+    BAND_CELLS = 256
+
+
+class _SmallReveal(ChunkedMinefieldLogic):
+    """
+    Endless board whose cascades stop after a few thousand cells.
+
+    Attributes:
+        MAX_ENDLESS_REVEAL (int): Cells revealed at most per click.
+    """
+
+    MAX_ENDLESS_REVEAL = 3_000
+
+
+def _chunked_mines(game: ChunkedMinefieldLogic, top: int, left: int,
+                   rows: int, cols: int) -> np.ndarray:
+    """
+    Reads the mines of a region of a chunked board into a matrix.
+
+    :param game: The board read.
+    :type game: ChunkedMinefieldLogic
+    :param top: First row of the region.
+    :type top: int
+    :param left: First column of the region.
+    :type left: int
+    :param rows: Number of rows of the region.
+    :type rows: int
+    :param cols: Number of columns of the region.
+    :type cols: int
+    :return: Mines of the region, one per cell.
+    :rtype: np.ndarray
+    """
+
+    return np.array([
+        [game.is_mine((row, col)) for col in range(left, left + cols)]
+        for row in range(top, top + rows)
+    ], dtype=np.uint8)
+
+
+@pytest.mark.parametrize('board_class', [CompactMinefieldLogic, _SmallBands])
+def test_same_seed_places_the_same_mines(board_class):
+    first = board_class(300, 200, 9_000, seed=42)
+    second = board_class(300, 200, 9_000, seed=42)
+    other = board_class(300, 200, 9_000, seed=43)
+
+    assert first.seed == 42
+    assert np.array_equal(first.mines, second.mines)
+    assert not np.array_equal(first.mines, other.mines)
+
+
+@pytest.mark.parametrize('board_class', [CompactMinefieldLogic, _SmallBands])
+def test_every_mine_is_placed(board_class):
+    game = board_class(301, 97, 4_321, seed=5)
+    mines = np.unpackbits(game.mines, axis=1)[:, :game.cols]
+
+    assert int(mines.sum()) == 4_321
+
+
+def test_unseeded_boards_record_their_seed():
+    game = CompactMinefieldLogic(64, 64, 500)
+    again = CompactMinefieldLogic(64, 64, 500, seed=game.seed)
+
+    assert np.array_equal(game.mines, again.mines)
+
+
+def test_values_match_a_dense_board():
+    game = _SmallBands(57, 41, 300, seed=9)
+    mines = np.unpackbits(game.mines, axis=1)[:, :game.cols]
+    padded = np.pad(mines, 1)
+
+    expected = MinefieldLogic.count_mines(padded)
+    assert np.array_equal(game.get_values(slice(None), slice(None)), expected)
+    assert game.get_value((20, 30)) == expected[20, 30]
+
+
+@pytest.mark.parametrize('size', [(100, 70), (32, 32), (33, 95)])
+def test_chunked_board_holds_every_mine(size):
+    cols, rows = size
+    mines = cols * rows // 6
+    game = ChunkedMinefieldLogic(cols, rows, mines, seed=11)
+
+    assert int(_chunked_mines(game, 0, 0, rows, cols).sum()) == mines
+    assert game.generated_chunks == -(-cols // 32) * -(-rows // 32)
+    assert not _chunked_mines(game, -1, -1, 1, cols + 2).any()
+
+
+def test_chunked_values_cross_chunk_borders():
+    game = ChunkedMinefieldLogic(100, 70, 1_200, seed=4)
+    padded = np.pad(_chunked_mines(game, 0, 0, 70, 100), 1)
+    expected = MinefieldLogic.count_mines(padded)
+
+    values = np.array([
+        [game.get_value((row, col)) for col in range(100)]
+        for row in range(70)
+    ])
+    assert np.array_equal(values, expected)
+
+
+def test_endless_values_cross_negative_chunk_borders():
+    game = ChunkedMinefieldLogic(density=0.2, seed=8)
+    padded = _chunked_mines(game, -41, -41, 82, 82)
+    expected = MinefieldLogic.count_mines(padded)
+
+    values = np.array([
+        [game.get_value((row, col)) for col in range(-40, 40)]
+        for row in range(-40, 40)
+    ])
+    assert np.array_equal(values, expected)
+
+
+def test_capped_cascade_leaves_its_frontier_covered():
+    game = _SmallReveal(density=0.05, seed=2)
+    start = next(
+        (0, col) for col in range(1_000) if game.get_value((0, col)) == 0
+    )
+    cells = game.reveal(start)
+    assert len(cells) < game.MAX_ENDLESS_REVEAL
+
+    # Every uncovered zero was opened; only zeros remain covered next
+    # to one, and they are the frontier of the stopped cascade
+    frontier = set()
+    for row, col in cells:
+        assert game.is_revealed((row, col))
+        if game.get_value((row, col)):
+            continue
+        for neighbour in [(row + y, col + x)
+                          for y in (-1, 0, 1) for x in (-1, 0, 1)]:
+            if not game.is_revealed(neighbour):
+                assert game.get_value(neighbour) == 0
+                frontier.add(neighbour)
+    assert frontier
+
+    more = game.reveal(min(frontier))
+    assert more and more[0] == min(frontier)
+    assert not set(more) & set(cells)
@@ -0,0 +1,74 @@
+"""
+Tests for the game screen's timer and the results it saves.
+"""
+
+import asyncio
+
+import numpy as np
+from textual.widgets import Button
+
+import leaderboard
+import replay
+from configurations import GameState
+from leaderboard import Leaderboard, ResultWriter
+from run import GameScreen, MinesweeperApp
+
+
+def _win_with_mouse(tmp_path, monkeypatch) -> tuple:
+    """
+    Plays an Easy game whose first move is a mouse click and wins it
+    by uncovering every safe cell.
+
+    :param tmp_path: Directory of the leaderboard and replay logs.
+    :type tmp_path: pathlib.Path
+    :param monkeypatch: Pytest monkeypatch fixture.
+    :type monkeypatch: pytest.MonkeyPatch
+    :return: The screen played, the writer of its results and the
+             path of the leaderboard.
+    :rtype: tuple
+    """
+
+    path = str(tmp_path / 'results.db')
+    writer = ResultWriter(lambda: Leaderboard(path))
+    monkeypatch.setattr(leaderboard, '_RESULT_WRITER', writer)
+    monkeypatch.setattr(replay, 'REPLAY_DIR', str(tmp_path / 'replays'))
+
+    async def play() -> GameScreen:
+        app = MinesweeperApp()
+        async with app.run_test(size=(80, 24)) as pilot:
+            await pilot.pause()
+            screen = GameScreen(game_mode='Easy', player_name='Tester')
+            app.push_screen(screen)
+            await pilot.pause()
+            assert screen.start_time is None
+
+            cell = screen.game_board.query(Button).first()
+            await pilot.click(offset=cell.region.offset + (1, 1))
+            await pilot.pause()
+            assert screen.start_time is not None
+
+            board = screen.game_board
+            safe = np.flatnonzero(board.session.game.game_matrix < 9)
+            for index in safe.tolist():
+                if board.is_game_over:
+                    break
+                if not board.cells.revealed.item(index):
+                    board.focused_button_index = index
+                    board.press_focused_cell()
+            await pilot.pause()
+            assert board.session.state is GameState.WON
+
+        return screen
+
+    return asyncio.run(play()), writer, path
+
+
+def test_game_started_by_mouse_is_timed_and_saved(tmp_path, monkeypatch):
+    screen, writer, path = _win_with_mouse(tmp_path, monkeypatch)
+
+    assert writer.flush(timeout=5)
+    assert (writer.submitted, writer.written, writer.dropped) == (1, 1, 0)
+    with Leaderboard(path) as board:
+        top, rank, best = board.standings(screen.leaderboard_mode, 'Tester')
+    assert rank == 1
+    assert top == [('Tester', best)]
@@ -0,0 +1,154 @@
+"""
+Tests for the two ways a GameSession is won: every safe cell
+uncovered, or every mine flagged.
+"""
+
+import numpy as np
+
+from configurations import GameState
+from game_logic import GameSession, MinefieldLogic
+
+# Mines of the 5x5 test board; the top left corner opens a cascade
+# over every safe cell except those next to the bottom right mines
+MINES = [(3, 4), (4, 3)]
+
+
+def _session(mines: list = None) -> GameSession:
+    """
+    Returns a session on a 5x5 board with the given mines.
+
+    :param mines: Positions of the mines, MINES by default.
+    :type mines: list, optional
+    :return: A new session.
+    :rtype: GameSession
+    """
+
+    padded = np.zeros((7, 7), dtype=np.uint8)
+    for row, col in mines or MINES:
+        padded[row + 1, col + 1] = 1
+    return GameSession(
+        game=MinefieldLogic(game_matrix=MinefieldLogic.count_mines(padded))
+    )
+
+
+def _safe_cells(session: GameSession) -> list:
+    """
+    Returns every safe cell of the board.
+
+    :param session: The session played.
+    :type session: GameSession
+    :return: Positions of the safe cells, row by row.
+    :rtype: list
+    """
+
+    return [tuple(cell) for cell in
+            np.argwhere(session.game.game_matrix < 9).tolist()]
+
+
+def test_revealing_every_safe_cell_wins():
+    session = _session()
+    for cell in _safe_cells(session)[::-1]:
+        if session.game.is_revealed(cell):
+            continue
+        assert session.state is not GameState.WON
+        session.reveal(cell)
+
+    assert session.state is GameState.WON
+    assert session.covered_safe == 0
+    assert not session.placed_flags
+
+
+def test_cascade_counts_every_uncovered_cell():
+    session = _session()
+    cells = session.reveal((0, 0))
+
+    assert session.covered_safe == 23 - len(cells)
+    assert session.state is GameState.PLAYING
+    session.reveal((4, 4))
+    assert session.state is GameState.WON
+
+
+def test_flagging_every_mine_wins():
+    session = _session()
+    session.reveal((0, 0))
+    session.toggle_flag(MINES[0])
+    assert session.state is GameState.PLAYING
+
+    session.toggle_flag(MINES[1])
+    assert session.state is GameState.WON
+    assert session.covered_safe == 1
+
+
+def test_wrong_flag_removed_later_still_wins():
+    session = _session()
+    session.reveal((0, 0))
+    assert session.toggle_flag((4, 4))  # Wrong, (4, 4) is safe
+    assert session.toggle_flag(MINES[0])
+    assert session.remaining_flags == 0
+
+    # Every flag is placed, but one is wrong and blocks the last mine
+    assert not session.toggle_flag(MINES[1])
+    assert session.state is GameState.PLAYING
+
+    assert session.toggle_flag((4, 4))
+    assert session.toggle_flag(MINES[1])
+    assert session.state is GameState.WON
+
+
+def test_unflagging_a_mine_takes_back_its_count():
+    session = _session()
+    session.reveal((0, 0))
+    session.toggle_flag(MINES[0])
+    session.toggle_flag(MINES[0])
+    session.toggle_flag(MINES[1])
+    assert session.state is GameState.PLAYING
+
+    session.toggle_flag(MINES[0])
+    assert session.state is GameState.WON
+
+
+def test_flag_on_a_revealed_cell_is_refused():
+    session = _session()
+    cells = session.reveal((0, 0))
+
+    assert not session.toggle_flag(cells[0])
+    assert not session.placed_flags
+    assert session.remaining_flags == len(MINES)
+    assert session.covered_safe == 23 - len(cells)
+
+    session.toggle_flag(MINES[0])
+    session.toggle_flag(MINES[1])
+    assert session.state is GameState.WON
+
+
+def test_flag_cleared_by_a_cascade_is_returned():
+    session = _session()
+    session.toggle_flag((1, 1))  # Wrong, uncovered by the cascade
+    cells = session.reveal((0, 0))
+
+    assert (1, 1) in cells
+    assert not session.placed_flags
+    assert session.remaining_flags == len(MINES)
+    if session.flagged is not None:
+        assert not session.flagged.any()
+
+    session.reveal((4, 4))
+    assert session.state is GameState.WON
+
+
+def test_flags_before_deferred_mines_are_counted():
+    session = GameSession(
+        game=MinefieldLogic(5, 5, 2, deferred=True, seed=1)
+    )
+    session.toggle_flag((4, 4))
+    session.reveal((0, 0))
+
+    mines = [tuple(cell) for cell in
+             np.argwhere(session.game.game_matrix >= 9).tolist()]
+    if (4, 4) not in mines:
+        session.toggle_flag((4, 4))
+    for mine in mines:
+        if mine not in session.placed_flags:
+            session.toggle_flag(mine)
+
+    assert session.state is GameState.WON
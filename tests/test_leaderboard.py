@@ -0,0 +1,391 @@
+"""
+Tests for the leaderboard's standings, its time_buckets counts and the
+ResultWriter that saves results in the background.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import leaderboard
+import no_guess
+import replay
+from configurations import GameState
+from game_logic import MinefieldLogic
+from leaderboard import BUCKET_MS, Leaderboard, ResultWriter
+from no_guess import BoardCache
+from run import GameOverScreen, GameScreen, MinesweeperApp
+
+MODES = ['Easy', 'Hard', 'Hard No guess']
+
+
+def _results(count: int, seed: int = 0) -> list:
+    """
+    Returns random results of a few players, with many equal times and
+    times on bucket edges.
+
+    :param count: Number of results.
+    :type count: int
+    :param seed: Seed of the results.
+    :type seed: int
+    :return: Tuples of player, game mode, time in milliseconds and
+             finish time.
+    :rtype: list
+    """
+
+    rng = random.Random(seed)
+    times = [0, 1, BUCKET_MS - 1, BUCKET_MS, BUCKET_MS + 1, 5 * BUCKET_MS]
+    return [
+        (
+            f'p{rng.randrange(12)}',
+            rng.choice(MODES),
+            rng.choice(times) if rng.random() < 0.2
+            else rng.randrange(30 * BUCKET_MS),
+            float(index)
+        )
+        for index in range(count)
+    ]
+
+
+def _rank(results: list, player: str, mode: str) -> tuple:
+    """
+    Ranks a player by counting every faster result of the mode.
+
+    :param results: The results stored.
+    :type results: list
+    :param player: Name of the player.
+    :type player: str
+    :param mode: The game mode.
+    :type mode: str
+    :return: The player's rank and best time, None if the player has
+             no result in the mode.
+    :rtype: tuple
+    """
+
+    times = [row[2] for row in results if row[1] == mode]
+    own = [row[2] for row in results if row[:2] == (player, mode)]
+    if not own:
+        return None, None
+
+    best = min(own)
+    return 1 + sum(time_ms < best for time_ms in times), best
+
+
+class _SlowLeaderboard(Leaderboard):
+    """
+    Leaderboard stand-in whose writes wait like a slow disk and which
+    records being closed.
+
+    Attributes:
+        DELAY (float): Seconds every write waits.
+        closed (threading.Event): Set when the leaderboard is closed.
+    """
+
+    DELAY = 0.2
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initializes the _SlowLeaderboard like a Leaderboard.
+
+        :param args: Arguments of Leaderboard.
+        :type args: tuple
+        :param kwargs: Keyword arguments of Leaderboard.
+        :type kwargs: dict
+        :return: None
+        """
+
+        super().__init__(*args, **kwargs)
+        self.closed = threading.Event()
+
+    def add_many(self, results) -> None:
+        """
+        Waits, then inserts many results in one transaction.
+
+        :param results: Tuples of player, game mode, time in
+                        milliseconds and finish time.
+        :type results: Iterable[Tuple[str, str, int, float]]
+        :return: None
+        """
+
+        time.sleep(self.DELAY)
+        super().add_many(results)
+
+    def close(self) -> None:
+        """
+        Closes the leaderboard and records it.
+
+        :return: None
+        """
+
+        super().close()
+        self.closed.set()
+
+
+def _slow_writer(path: str) -> tuple:
+    """
+    Returns a ResultWriter over a _SlowLeaderboard, and the
+    leaderboards it opens.
+
+    :param path: Path of the database.
+    :type path: str
+    :return: The writer and the list of leaderboards it opened.
+    :rtype: tuple
+    """
+
+    opened = []
+
+    def backend() -> _SlowLeaderboard:
+        opened.append(_SlowLeaderboard(path))
+        return opened[-1]
+
+    return ResultWriter(backend), opened
+
+
+@pytest.fixture(name='board')
+def _board(tmp_path):
+    with Leaderboard(str(tmp_path / 'results.db'), batch_size=7) as board:
+        yield board
+
+
+def test_standings_match_a_full_count(board):
+    results = _results(600)
+    for row in results:
+        board.add(*row)
+
+    for mode in MODES:
+        times = sorted(row[2] for row in results if row[1] == mode)
+        for player in [f'p{index}' for index in range(13)]:
+            top, rank, best = board.standings(mode, player, limit=5)
+            assert [time_ms for _, time_ms in top] == times[:5]
+            assert (rank, best) == _rank(results, player, mode)
+
+
+def test_players_with_equal_times_share_a_rank(board):
+    board.add_many([
+        ('Ada', 'Easy', 2500, 0.0),
+        ('Bob', 'Easy', 2500, 0.0),
+        ('Cy', 'Easy', 2499, 0.0),
+        ('Dee', 'Easy', 3000, 0.0)
+    ])
+
+    assert board.standings('Easy', 'Ada')[1:] == (2, 2500)
+    assert board.standings('Easy', 'Bob')[1:] == (2, 2500)
+    assert board.standings('Easy', 'Dee')[1:] == (4, 3000)
+
+
+def test_player_without_a_result_has_no_rank(board):
+    board.add('Ada', 'Easy', 1000)
+
+    assert board.standings('Easy', 'Bob') == ([('Ada', 1000)], None, None)
+    assert board.standings('Hard', 'Ada') == ([], None, None)
+
+
+def test_time_buckets_count_every_result(board, tmp_path):
+    results = _results(500, seed=1)
+    board.add_many(results[:200])
+    for row in results[200:]:
+        board.add(*row)
+    board.flush()
+
+    expected = Counter((row[1], row[2] // BUCKET_MS) for row in results)
+    buckets = board._db.execute(  # pylint: disable=W0212
+        'SELECT game_mode, bucket, results FROM time_buckets'
+    ).fetchall()
+    assert {(mode, bucket): count for mode, bucket, count in buckets} == \
+        expected
+
+    # The counts persist with the results, and grow with later games
+    board.close()
+    with Leaderboard(str(tmp_path / 'results.db')) as again:
+        again.add('Ada', 'Easy', BUCKET_MS)
+        again.flush()
+        count, = again._db.execute(  # pylint: disable=W0212
+            'SELECT results FROM time_buckets '
+            'WHERE game_mode = ? AND bucket = 1', ('Easy',)
+        ).fetchone()
+    assert count == expected['Easy', 1] + 1
+
+
+@pytest.mark.slow
+def test_standings_take_under_a_millisecond_at_a_million_results(tmp_path):
+    rng = np.random.default_rng(0)
+    modes = [f'{difficulty}{suffix}'
+             for difficulty in ('Easy', 'Medium', 'Hard', 'Huge')
+             for suffix in ('', ' No guess')]
+    count = 1_000_000
+    players = rng.integers(100_000, size=count)
+    rows = list(zip(
+        [f'Player{number}' for number in players.tolist()],
+        [modes[index] for index in rng.integers(8, size=count).tolist()],
+        rng.lognormal(11.5, 0.6, size=count).astype(int).tolist(),
+        [0.0] * count
+    ))
+
+    with Leaderboard(str(tmp_path / 'results.db')) as board:
+        for start in range(0, count, 100_000):
+            board.add_many(rows[start:start + 100_000])
+
+        lookups = []
+        for index in rng.integers(count, size=300).tolist():
+            player, game_mode = rows[index][:2]
+            start = time.perf_counter()
+            _, rank, best = board.standings(game_mode, player)
+            lookups.append(time.perf_counter() - start)
+            assert rank is not None and best <= rows[index][2]
+
+        # The rank still agrees with a full count
+        faster, = board._db.execute(  # pylint: disable=W0212
+            'SELECT COUNT(*) FROM results WHERE game_mode = ? '
+            'AND time_ms < ?', (game_mode, best)
+        ).fetchone()
+        assert rank == faster + 1
+
+    assert np.median(lookups) < 1e-3
+
+
+def test_close_writes_pending_results_first(tmp_path):
+    path = str(tmp_path / 'results.db')
+    writer, opened = _slow_writer(path)
+    start = time.perf_counter()
+    for index in range(20):
+        writer.submit(f'p{index}', 'Easy', 1000 + index)
+    assert time.perf_counter() - start < _SlowLeaderboard.DELAY
+    assert writer.written < 20
+
+    assert writer.close(timeout=10)
+    assert (writer.submitted, writer.written, writer.dropped) == (20, 20, 0)
+    assert writer.writes <= 2  # Results waiting on a write are coalesced
+    assert len(opened) == 1 and opened[0].closed.is_set()
+    with Leaderboard(path) as board:
+        assert len(board.standings('Easy', limit=50)[0]) == 20
+
+
+def test_close_times_out_on_a_stuck_write(tmp_path):
+    writer, _ = _slow_writer(str(tmp_path / 'results.db'))
+    writer.submit('Ada', 'Easy', 1000)
+
+    assert not writer.close(timeout=0.01)
+    assert writer.flush(timeout=10)
+    assert writer.written == 1
+
+
+def test_submit_after_close_starts_a_new_worker(tmp_path):
+    path = str(tmp_path / 'results.db')
+    writer, opened = _slow_writer(path)
+    assert writer.close()
+
+    writer.submit('Ada', 'Easy', 1000)
+    assert writer.close(timeout=10)
+    writer.submit('Bob', 'Easy', 2000)
+    assert writer.close(timeout=10)
+
+    assert writer.written == 2
+    assert len(opened) == 2
+    assert all(board.closed.is_set() for board in opened)
+    with Leaderboard(path) as board:
+        assert board.standings('Easy')[0] == [('Ada', 1000), ('Bob', 2000)]
+
+
+def test_app_exit_flushes_the_shared_writer(tmp_path, monkeypatch):
+    path = str(tmp_path / 'results.db')
+    writer, opened = _slow_writer(path)
+    monkeypatch.setattr(leaderboard, '_RESULT_WRITER', writer)
+
+    async def run(player: str) -> None:
+        app = MinesweeperApp()
+        async with app.run_test(size=(80, 24)) as pilot:
+            await pilot.pause()
+            for index in range(3):
+                writer.submit(player, 'Hard', 60_000 + index)
+
+    # Sessions that exit leave the worker running for the others
+    asyncio.run(run('Ada'))
+    assert writer.written == 3
+    asyncio.run(run('Bob'))
+    assert writer.written == 6
+    assert len(opened) == 1 and not opened[0].closed.is_set()
+
+    assert writer.close(timeout=10)
+    assert opened[0].closed.is_set()
+    with Leaderboard(path) as board:
+        top, rank, best = board.standings('Hard', 'Bob')
+    assert (len(top), rank, best) == (6, 1, 60_000)
+
+
+def test_shared_writer_is_closed_at_process_exit(monkeypatch):
+    registered = []
+    monkeypatch.setattr(leaderboard, '_RESULT_WRITER', None)
+    monkeypatch.setattr(leaderboard.atexit, 'register',
+                        lambda *call: registered.append(call))
+
+    writer = leaderboard.result_writer()
+    assert leaderboard.result_writer() is writer
+    assert registered == [(writer.close, leaderboard.EXIT_CLOSE_TIMEOUT)]
+
+
+def _walled_board() -> np.ndarray:
+    """
+    Returns an Easy board whose bottom right cell is walled in by
+    mines, so no cascade uncovers it.
+
+    :return: Values of the board.
+    :rtype: np.ndarray
+    """
+
+    padded = np.zeros((10, 13), dtype=np.uint8)
+    for row, col in [(6, 9), (6, 10), (7, 9)] + [(3, c) for c in range(7)]:
+        padded[row + 1, col + 1] = 1
+    return MinefieldLogic.count_mines(padded)
+
+
+def test_game_over_modal_does_not_wait_for_a_slow_leaderboard(
+        tmp_path, monkeypatch):
+    writer, _ = _slow_writer(str(tmp_path / 'results.db'))
+    cache = BoardCache()
+    cache._boards['EASY'].append(  # pylint: disable=W0212
+        (_walled_board(), (0, 0))
+    )
+    monkeypatch.setattr(BoardCache, 'fill', lambda self, mode: None)
+    monkeypatch.setattr(no_guess, '_BOARD_CACHE', cache)
+    monkeypatch.setattr(leaderboard, '_RESULT_WRITER', writer)
+    monkeypatch.setattr(replay, 'REPLAY_DIR', str(tmp_path / 'replays'))
+
+    async def win() -> float:
+        app = MinesweeperApp()
+        async with app.run_test(size=(80, 24)) as pilot:
+            await pilot.pause()
+            screen = GameScreen(
+                game_mode='Easy', player_name='Ada', no_guess=True
+            )
+            app.push_screen(screen)
+            await pilot.pause()
+
+            # Uncover every safe cell but the walled one, the last
+            board = screen.game_board
+            safe = np.flatnonzero(board.session.game.game_matrix < 9)
+            for index in safe.tolist()[:-1]:
+                if not board.cells.revealed.item(index):
+                    board.focused_button_index = index
+                    board.press_focused_cell()
+            await pilot.pause()
+            assert board.session.covered_safe == 1
+
+            start = time.perf_counter()
+            board.focused_button_index = int(safe[-1])
+            board.press_focused_cell()
+            while not isinstance(app.screen, GameOverScreen):
+                await pilot.pause()
+            latency = time.perf_counter() - start
+            assert board.session.state is GameState.WON
+
+        return latency
+
+    latency = asyncio.run(win())
+    assert latency < _SlowLeaderboard.DELAY / 2
+    assert writer.flush(timeout=10)
+    assert (writer.submitted, writer.written, writer.dropped) == (1, 1, 0)
@@ -0,0 +1,110 @@
+"""
+Tests for the no-guess board cache: cold takes that return at once,
+and one cache shared by forked sessions.
+"""
+
+import asyncio
+import os
+import time
+
+import numpy as np
+
+import no_guess
+import replay
+from no_guess import BoardCache
+from run import GameScreen, MinesweeperApp
+
+
+def _refuse(mode: str, count: int, seed) -> list:
+    """
+    Stands in for `_generate_mode` where no board may be generated.
+
+    :param mode: Name of the GameMode.
+    :type mode: str
+    :param count: Number of boards wanted.
+    :type count: int
+    :param seed: Seed of the generation.
+    :type seed: np.random.SeedSequence
+    :raise AssertionError: Always.
+    """
+
+    raise AssertionError(f'{mode} generated in the calling process')
+
+
+def test_cold_take_returns_none_and_fills(monkeypatch):
+    filled = []
+    monkeypatch.setattr(no_guess, '_generate_mode', _refuse)
+    monkeypatch.setattr(BoardCache, 'fill',
+                        lambda self, mode: filled.append(mode))
+
+    assert BoardCache().take('Huge') is None
+    assert filled == ['HUGE']
+
+
+def test_warm_take_returns_a_ready_board(monkeypatch):
+    monkeypatch.setattr(BoardCache, 'fill', lambda self, mode: None)
+    cache = BoardCache()
+    board = (np.zeros((9, 9), dtype=np.uint8), (4, 4))
+    cache._boards['EASY'].append(board)  # pylint: disable=W0212
+
+    assert cache.take('Easy') is board
+    assert cache.take('Easy') is None
+
+
+def test_game_falls_back_to_a_random_board(tmp_path, monkeypatch):
+    cache = BoardCache()
+    monkeypatch.setattr(no_guess, '_generate_mode', _refuse)
+    monkeypatch.setattr(BoardCache, 'fill', lambda self, mode: None)
+    monkeypatch.setattr(no_guess, '_BOARD_CACHE', cache)
+    monkeypatch.setattr(replay, 'REPLAY_DIR', str(tmp_path))
+
+    async def play() -> GameScreen:
+        app = MinesweeperApp()
+        async with app.run_test(size=(80, 24)) as pilot:
+            await pilot.pause()
+            screen = GameScreen(
+                game_mode='Easy', player_name='Tester', no_guess=True
+            )
+            app.push_screen(screen)
+            await pilot.pause()
+            board = screen.game_board
+            board.focused_button_index = 0
+            board.press_focused_cell()
+            await pilot.pause()
+            return screen
+
+    session = asyncio.run(play()).game_board.session
+    assert session.game.game_matrix is not None
+    assert session.game.is_revealed((0, 0))
+
+
+def test_forked_sessions_share_one_cache(monkeypatch):
+    monkeypatch.setattr(no_guess, '_BOARD_CACHE', None)
+    monkeypatch.setattr(no_guess, '_SHARED_CACHE_ADDRESS', None)
+    manager = no_guess.share_board_cache()
+    try:
+        # The first session finds the cache cold and starts its fill,
+        # the second waits for a board generated meanwhile
+        for wait, expected in [(0, b'\x01\x00'), (30, b'\x01\x01')]:
+            reader, writer = os.pipe()
+            pid = os.fork()
+            if pid == 0:  # A session, as forked by zygote.py
+                os.close(reader)
+                cache = no_guess.board_cache()
+                shared = not isinstance(cache, BoardCache)
+                board = cache.take('Easy')
+                deadline = time.monotonic() + wait
+                while board is None and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    board = cache.take('Easy')
+                os.write(writer, bytes([shared, board is not None]))
+                os._exit(0)
+
+            os.close(writer)
+            with os.fdopen(reader, 'rb') as result:
+                assert result.read() == expected
+            os.waitpid(pid, 0)
+    finally:
+        manager.shutdown()
+
+    assert no_guess._BOARD_CACHE is None  # pylint: disable=W0212
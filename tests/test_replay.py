@@ -0,0 +1,179 @@
+"""
+Tests for replay logs that are still being written, cut short or
+unreadable.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import replay
+from configurations import Move
+from game_logic import GameSession, MinefieldLogic
+from replay import MOVE_DTYPE, Replay, ReplayRecorder, summarize
+
+
+def _session(seed: int = 7) -> GameSession:
+    """
+    Returns a session on a deferred HARD-sized board.
+
+    :param seed: Seed of the board.
+    :type seed: int
+    :return: A new session.
+    :rtype: GameSession
+    """
+
+    return GameSession(game=MinefieldLogic(
+        25, 16, 60, deferred=True, seed=seed
+    ))
+
+
+def _play(session: GameSession, recorder: ReplayRecorder) -> list:
+    """
+    Reveals a start cell and flags a few covered cells.
+
+    :param session: The session played.
+    :type session: GameSession
+    :param recorder: The recorder of the session.
+    :type recorder: ReplayRecorder
+    :return: The moves played, as (move, position).
+    :rtype: list
+    """
+
+    moves = [(Move.REVEAL, (8, 12))]
+    session.reveal((8, 12))
+    covered = [
+        (row, col) for row in range(16) for col in range(25)
+        if not session.game.is_revealed((row, col))
+    ]
+    for position in covered[:4]:
+        session.toggle_flag(position)
+        moves.append((Move.FLAG, position))
+
+    for move, position in moves:
+        recorder.record(move, position)
+
+    return moves
+
+
+def test_header_is_written_when_recording_starts(tmp_path):
+    path = str(tmp_path / 'game.mlog')
+    with ReplayRecorder(path, _session().game):
+        with Replay(path) as log:
+            assert len(log.moves) == 0
+            assert (log.cols, log.rows, log.seed) == (25, 16, 7)
+
+
+def test_live_log_is_read_up_to_the_last_move(tmp_path):
+    path = str(tmp_path / 'game.mlog')
+    session = _session()
+    with ReplayRecorder(path, session.game) as recorder:
+        moves = _play(session, recorder)
+        with Replay(path) as log:
+            assert log.moves['move'].tolist() == [
+                move.value for move, _ in moves
+            ]
+            played = log.play()
+            assert played.covered_safe == session.covered_safe
+            assert played.remaining_flags == session.remaining_flags
+
+
+def test_flush_interval_bounds_buffered_moves(tmp_path):
+    path = str(tmp_path / 'game.mlog')
+    session = _session()
+    with ReplayRecorder(path, session.game, flush_interval=3600) as recorder:
+        _play(session, recorder)
+        with Replay(path) as log:
+            # Only the header is written out, the moves wait an hour
+            assert len(log.moves) == 0
+
+    with Replay(path) as log:
+        assert len(log.moves) == 5
+
+
+def test_truncated_log_is_read_up_to_its_last_whole_record(tmp_path):
+    path = str(tmp_path / 'game.mlog')
+    session = _session()
+    with ReplayRecorder(path, session.game) as recorder:
+        moves = _play(session, recorder)
+
+    with open(path, 'r+b') as file:
+        file.truncate(os.path.getsize(path) - MOVE_DTYPE.itemsize // 2)
+
+    with Replay(path) as log:
+        assert len(log.moves) == len(moves) - 1
+
+
+def test_killed_session_leaves_a_readable_log(tmp_path):
+    path = str(tmp_path / 'game.mlog')
+    script = textwrap.dedent(f'''
+        import os, signal
+        from configurations import Move
+        from game_logic import MinefieldLogic
+        from replay import ReplayRecorder
+        recorder = ReplayRecorder(
+            {path!r}, MinefieldLogic(25, 16, 60, deferred=True, seed=3)
+        )
+        recorder.record(Move.REVEAL, (8, 12))
+        recorder.record(Move.FLAG, (0, 0))
+        os.kill(os.getpid(), signal.SIGKILL)
+    ''')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, '-c', script], cwd=root, check=False
+    )
+    assert result.returncode != 0
+
+    with Replay(path) as log:
+        assert log.moves['move'].tolist() == [
+            Move.REVEAL.value, Move.FLAG.value
+        ]
+
+
+@pytest.mark.parametrize('content', [b'', b'MR\x01', b'not a replay log'])
+def test_unreadable_logs_raise_value_error(tmp_path, content):
+    path = tmp_path / 'bad.mlog'
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        Replay(str(path))
+
+
+def test_summarize_skips_unreadable_logs(tmp_path):
+    good = str(tmp_path / 'good.mlog')
+    session = _session()
+    with ReplayRecorder(good, session.game) as recorder:
+        _play(session, recorder)
+    (tmp_path / 'empty.mlog').write_bytes(b'')
+    (tmp_path / 'short.mlog').write_bytes(b'MR')
+
+    skipped = []
+    stats = summarize(
+        sorted(str(path) for path in tmp_path.iterdir()),
+        on_skip=lambda path, error: skipped.append(os.path.basename(path))
+    )
+
+    assert stats['games'] == 1
+    assert stats['skipped'] == 2
+    assert (stats['reveals'], stats['flags']) == (1, 4)
+    assert skipped == ['empty.mlog', 'short.mlog']
+
+
+@pytest.mark.parametrize('summary', [False, True])
+def test_main_skips_unreadable_logs(tmp_path, monkeypatch, capsys, summary):
+    session = _session()
+    with ReplayRecorder(str(tmp_path / 'b.mlog'), session.game) as recorder:
+        _play(session, recorder)
+    (tmp_path / 'a.mlog').write_bytes(b'')
+
+    monkeypatch.setattr(
+        sys, 'argv',
+        ['replay.py', str(tmp_path)] + (['--summary'] if summary else [])
+    )
+    replay.main()
+
+    output = capsys.readouterr()
+    assert 'a.mlog: skipped' in output.err
+    assert ('Games:         1' if summary else 'b.mlog') in output.out
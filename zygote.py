@@ -0,0 +1,210 @@
+"""
+Prefork server that starts Minesweeper sessions from a warm interpreter.
+
+The web terminal gateway used to spawn a fresh `python3 run.py` for
+every visitor, paying for the interpreter, Textual and NumPy each time.
+This server imports all of them once and then forks a ready process per
+connection, so a session only pays for the fork and its first frame.
+No-guess boards come from one cache hosted for every session, so its
+worker pool is started once rather than per session.
+
+Every connection on the Unix socket starts with a JSON header line
+holding the terminal size and environment, for example
+`{"cols": 80, "rows": 24, "env": {"TERM": "xterm-256color"}}`. After
+it, the connection carries raw terminal bytes in both directions.
+
+Functions:
+    serve: Listens on a Unix socket and forks a session per connection.
+
+Usage:
+    python zygote.py /tmp/minesweeper.sock
+"""
+
+import fcntl
+import json
+import os
+import pty
+import random
+import select
+import signal
+import socket
+import struct
+import sys
+import termios
+
+import numpy as np
+import game_logic  # pylint: disable=W0611  # Warm the deferred import
+import no_guess
+from leaderboard import EXIT_CLOSE_TIMEOUT, result_writer
+from run import MinesweeperApp
+
+READ_SIZE = 65536
+
+
+def _read_header(conn: socket.socket) -> tuple:
+    """
+    Reads the JSON header line that opens a connection.
+
+    :param conn: The client connection.
+    :type conn: socket.socket
+    :return: The decoded header and any bytes received after it.
+    :rtype: tuple
+    """
+
+    data = b''
+    while b'\n' not in data:
+        chunk = conn.recv(READ_SIZE)
+        if not chunk:
+            break
+        data += chunk
+
+    line, _, rest = data.partition(b'\n')
+    return json.loads(line or b'{}'), rest
+
+
+def _start_app(header: dict) -> None:
+    """
+    Runs the game in a forked child attached to its own terminal.
+
+    :param header: Terminal size and environment of the session.
+    :type header: dict
+    :return: None, the process exits when the game ends.
+    """
+
+    os.environ.update(header.get('env', {}))
+    fcntl.ioctl(
+        sys.stdin.fileno(),
+        termios.TIOCSWINSZ,
+        struct.pack('HHHH', header.get('rows', 24), header.get('cols', 80),
+                    0, 0)
+    )
+
+    # Forked children share the server's random state, reseed each one
+    random.seed()
+    np.random.seed()
+
+    MinesweeperApp().run()
+    # os._exit skips atexit, close the session's writer here instead
+    result_writer().close(EXIT_CLOSE_TIMEOUT)
+    os._exit(0)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """
+    Writes all the data to a file descriptor.
+
+    :param fd: The file descriptor.
+    :type fd: int
+    :param data: The bytes to write.
+    :type data: bytes
+    :return: None
+    """
+
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def _relay(conn: socket.socket, master: int, pending: bytes) -> None:
+    """
+    Copies bytes between the client and the game's terminal.
+
+    Returns when either side closes.
+
+    :param conn: The client connection.
+    :type conn: socket.socket
+    :param master: Master side of the game's pseudo-terminal.
+    :type master: int
+    :param pending: Client bytes already read with the header.
+    :type pending: bytes
+    :return: None
+    """
+
+    _write_all(master, pending)
+    while True:
+        readable, _, _ = select.select([conn, master], [], [])
+        if conn in readable:
+            data = conn.recv(READ_SIZE)
+            if not data:
+                return
+            _write_all(master, data)
+
+        if master in readable:
+            try:
+                data = os.read(master, READ_SIZE)
+            except OSError:  # The game exited and closed its terminal
+                return
+            if not data:
+                return
+            conn.sendall(data)
+
+
+def _run_session(conn: socket.socket) -> None:
+    """
+    Forks the game onto a new pseudo-terminal and serves the client.
+
+    The game is killed once the client goes away, as the gateway did
+    with the processes it spawned.
+
+    :param conn: The client connection.
+    :type conn: socket.socket
+    :return: None
+    """
+
+    header, pending = _read_header(conn)
+    pid, master = pty.fork()
+    if pid == 0:
+        conn.close()
+        _start_app(header)
+
+    try:
+        _relay(conn, master, pending)
+    finally:
+        conn.close()
+        os.close(master)
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        os.waitpid(pid, 0)
+
+
+def serve(path: str) -> None:
+    """
+    Listens on a Unix socket and forks a session per connection.
+
+    Each connection is handed to a forked relay process, which forks
+    the game itself; the server only accepts, so a slow session never
+    delays the next visitor. Finished relays are reaped by the kernel.
+    The shared board cache is started first, while the server has no
+    threads to fork with.
+
+    :param path: Path of the Unix socket.
+    :type path: str
+    :return: None
+    """
+
+    if os.path.exists(path):
+        os.unlink(path)
+
+    # Held for the life of the server, which stops the cache on exit
+    boards = no_guess.share_board_cache()  # pylint: disable=W0612
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(128)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    while True:
+        conn, _ = listener.accept()
+        if os.fork() == 0:
+            listener.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            try:
+                _run_session(conn)
+            finally:
+                os._exit(0)
+
+        conn.close()
+
+
+if __name__ == '__main__':
+    serve(sys.argv[1] if len(sys.argv) > 1 else '/tmp/minesweeper.sock')